@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from fastapi import Request, Response
+
+from backend.api.responses import BSONJSONResponse
+from backend.services.common import ResourceVersion
+
+
+async def conditional_response(
+    request: Request,
+    probe: Callable[[], Awaitable[ResourceVersion]],
+    load: Callable[[], Awaitable[Tuple[Any, ResourceVersion]]],
+) -> Response:
+    """Answer ``If-None-Match``/``If-Modified-Since`` with 304 when the resource is unchanged.
+
+    ``probe`` is only called when the client sent a validator and should be a cheap
+    projection-only lookup; otherwise the version is taken from the loaded documents.
+    """
+
+    if "if-none-match" in request.headers or "if-modified-since" in request.headers:
+        version = await probe()
+        if _not_modified(request, version):
+            return Response(status_code=304, headers=_validator_headers(version))
+
+    body, version = await load()
+    return BSONJSONResponse(body, headers=_validator_headers(version))
+
+
+def _validator_headers(version: ResourceVersion) -> Dict[str, str]:
+    headers = {"ETag": version.etag, "Cache-Control": "no-cache"}
+    if version.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(version.last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+
+def _not_modified(request: Request, version: ResourceVersion) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        # If-None-Match uses weak comparison, so W/"x" matches our strong "x".
+        return "*" in candidates or any((tag[2:] if tag.startswith("W/") else tag) == version.etag for tag in candidates)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and version.last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        last_modified = version.last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+        return last_modified <= since
+    return False
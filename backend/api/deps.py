@@ -12,6 +12,7 @@ from backend.services.audit import AuditService
 from backend.services.auth import AuthService
 from backend.services.availability import AvailabilityService
 from backend.services.care import CareService
+from backend.services.events import EventBroker
 
 
 def get_database(request: Request):
@@ -33,8 +34,8 @@ def get_scheduling_repository(db=Depends(get_database)) -> SchedulingRepository:
     return SchedulingRepository(db)
 
 
-def get_audit_service(db=Depends(get_database)) -> AuditService:
-    return AuditService(db)
+def get_audit_service(request: Request, db=Depends(get_database)) -> AuditService:
+    return AuditService(db, getattr(request.app.state, "audit_writer", None))
 
 
 def get_auth_service(
@@ -66,15 +67,23 @@ def get_optimized_availability_service(request: Request) -> OptimizedAvailabilit
         db = get_database(request)
         repository = SchedulingRepository(db)
         availability_service = AvailabilityService(repository)
-        audit_service = AuditService(db)
+        audit_service = AuditService(db, getattr(request.app.state, "audit_writer", None))
         ai_service = get_ai_service(request)
         service = OptimizedAvailabilityService(availability_service, ai_service, repository, audit_service)
         request.app.state.optimized_availability_service = service
     return service
 
 
+def get_event_broker(request: Request) -> EventBroker:
+    broker = getattr(request.app.state, "event_broker", None)
+    if broker is None:
+        raise RuntimeError("Event broker not initialised on application state")
+    return broker
+
+
 def get_care_service(
+    request: Request,
     repository: CareRepository = Depends(get_care_repository),
     audit_service: AuditService = Depends(get_audit_service),
 ) -> CareService:
-    return CareService(repository, audit_service)
+    return CareService(repository, audit_service, getattr(request.app.state, "event_broker", None))
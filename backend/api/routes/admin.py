@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from backend.db.monitoring import pool_monitor
+from backend.observability.loop_monitor import loop_monitor
+from backend.observability.memory import allocation_tracker, cache_items, cache_report, process_memory
+from backend.observability.profiler import profile_store
+from backend.observability.slow_queries import slow_query_log
+from backend.observability.tracing import get_tracer
+from backend.security import require_roles
+
+ADMIN_ROLES = ("admin",)
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/db/pool")
+async def connection_pool_stats(
+    current_user=Depends(require_roles(*ADMIN_ROLES)),  # noqa: ARG001 - used for dependency validation
+) -> dict:
+    """Connection pool checkout counters and wait-time histogram (cumulative buckets)."""
+
+    return pool_monitor.snapshot()
+
+
+@router.get("/db/slow-queries")
+async def slow_queries(
+    limit: int = Query(default=50, ge=1, le=500),
+    current_user=Depends(require_roles(*ADMIN_ROLES)),  # noqa: ARG001 - used for dependency validation
+) -> dict:
+    """Slow command shapes by total time, with the explained plan of slow reads."""
+
+    return {"threshold_ms": slow_query_log.threshold_ms, "shapes": slow_query_log.snapshot(limit)}
+
+
+@router.delete("/db/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_slow_queries(
+    current_user=Depends(require_roles(*ADMIN_ROLES)),  # noqa: ARG001 - used for dependency validation
+) -> Response:
+    slow_query_log.reset()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/loop")
+async def event_loop_stats(
+    current_user=Depends(require_roles(*ADMIN_ROLES)),  # noqa: ARG001 - used for dependency validation
+) -> dict:
+    """Event-loop lag and the stacks captured while the loop was blocked, newest first."""
+
+    return loop_monitor.snapshot()
+
+
+@router.get("/memory")
+async def memory_stats(
+    current_user=Depends(require_roles(*ADMIN_ROLES)),  # noqa: ARG001 - used for dependency validation
+) -> dict:
+    """Process RSS, approximate deep size of each named cache and tracemalloc status."""
+
+    # Entries are copied here, on the loop; the size walk runs on a worker thread.
+    items = cache_items()
+    return {
+        "process": process_memory(),
+        "caches": await run_in_threadpool(cache_report, items),
+        "tracemalloc": allocation_tracker.status(),
+    }
+
+
+@router.post("/memory/tracemalloc/start")
+async def start_tracemalloc(
+    frames: Optional[int] = Query(default=None, ge=1, le=100),
+    current_user=Depends(require_roles(*ADMIN_ROLES)),  # noqa: ARG001 - used for dependency validation
+) -> dict:
+    allocation_tracker.start(frames)
+    return allocation_tracker.status()
+
+
+@router.post("/memory/tracemalloc/stop")
+async def stop_tracemalloc(
+    current_user=Depends(require_roles(*ADMIN_ROLES)),  # noqa: ARG001 - used for dependency validation
+) -> dict:
+    """Stop tracing and drop every snapshot taken so far."""
+
+    allocation_tracker.stop()
+    return allocation_tracker.status()
+
+
+@router.post("/memory/snapshots", status_code=status.HTTP_201_CREATED)
+async def take_memory_snapshot(
+    limit: int = Query(default=20, ge=1, le=200),
+    current_user=Depends(require_roles(*ADMIN_ROLES)),  # noqa: ARG001 - used for dependency validation
+) -> dict:
+    """Take a tracemalloc snapshot and return its id with the largest allocation sites."""
+
+    if not allocation_tracker.tracing:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="tracemalloc is not running")
+    snapshot_id = await run_in_threadpool(allocation_tracker.take_snapshot)
+    return {"id": snapshot_id, "top": await run_in_threadpool(allocation_tracker.top, snapshot_id, limit)}
+
+
+@router.get("/memory/snapshots/{first_id}/diff/{second_id}")
+async def diff_memory_snapshots(
+    first_id: str,
+    second_id: str,
+    limit: int = Query(default=20, ge=1, le=200),
+    group_by: Literal["lineno", "filename", "traceback"] = Query(default="lineno"),
+    current_user=Depends(require_roles(*ADMIN_ROLES)),  # noqa: ARG001 - used for dependency validation
+) -> List[dict]:
+    """Allocation sites that grew the most between two snapshots."""
+
+    try:
+        return await run_in_threadpool(allocation_tracker.diff, first_id, second_id, limit, group_by)
+    except KeyError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Snapshot {exc.args[0]} not found") from exc
+
+
+@router.get("/profiles")
+async def list_profiles(
+    current_user=Depends(require_roles(*ADMIN_ROLES)),  # noqa: ARG001 - used for dependency validation
+) -> List[dict]:
+    """Request profiles kept by this worker, newest first."""
+
+    return profile_store.list()
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(
+    profile_id: str,
+    kind: Optional[Literal["cpu", "await"]] = Query(default=None, description="Only CPU or only await samples"),
+    current_user=Depends(require_roles(*ADMIN_ROLES)),  # noqa: ARG001 - used for dependency validation
+) -> PlainTextResponse:
+    """Collapsed stacks of one profile, ready for ``flamegraph.pl`` or speedscope."""
+
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return PlainTextResponse(profile.collapsed(kind))
+
+
+@router.get("/traces")
+async def list_traces(
+    limit: int = Query(default=50, ge=1, le=500),
+    min_duration_ms: float = Query(default=0.0, ge=0),
+    current_user=Depends(require_roles(*ADMIN_ROLES)),  # noqa: ARG001 - used for dependency validation
+) -> List[dict]:
+    """Recent traces kept by this worker's ring buffer, newest first."""
+
+    ring = get_tracer().ring_buffer()
+    if ring is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trace ring buffer is not enabled")
+    return ring.summaries(limit, min_duration_ms)
+
+
+@router.get("/traces/{trace_id}")
+async def get_trace(
+    trace_id: str,
+    current_user=Depends(require_roles(*ADMIN_ROLES)),  # noqa: ARG001 - used for dependency validation
+) -> List[dict]:
+    """Spans of one trace ordered by start time."""
+
+    ring = get_tracer().ring_buffer()
+    spans = ring.trace(trace_id) if ring is not None else []
+    if not spans:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trace not found")
+    return spans
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from backend.api.deps import get_audit_service
+from backend.security import require_roles
+from backend.services.common import decode_cursor
+from backend.services.audit import CURSOR_TYPES, EXPORT_FORMATS, AuditService
+
+AUDIT_ROLES = ("auditor", "admin")
+
+router = APIRouter(prefix="/audit", tags=["audit"])
+
+
+@router.get("/activity")
+async def query_activity(
+    performed_by: Optional[str] = None,
+    action: Optional[str] = None,
+    patient_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    current_user=Depends(require_roles(*AUDIT_ROLES)),  # noqa: ARG001 - used for dependency validation
+    service: AuditService = Depends(get_audit_service),
+) -> dict:
+    return await service.query_activity(
+        performed_by=performed_by,
+        action=action,
+        patient_id=patient_id,
+        since=since,
+        until=until,
+        cursor=cursor,
+        limit=limit,
+    )
+
+
+@router.get("/activity/export")
+async def export_activity(
+    format: str = Query("ndjson"),
+    performed_by: Optional[str] = None,
+    action: Optional[str] = None,
+    patient_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    current_user=Depends(require_roles(*AUDIT_ROLES)),  # noqa: ARG001 - used for dependency validation
+    service: AuditService = Depends(get_audit_service),
+) -> StreamingResponse:
+    export_format = format.lower()
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format. Use one of: {', '.join(EXPORT_FORMATS)}",
+        )
+    if cursor:
+        # Reject a malformed token before the response starts streaming.
+        decode_cursor(cursor, types=CURSOR_TYPES)
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        service.export_activity(
+            export_format,
+            performed_by=performed_by,
+            action=action,
+            patient_id=patient_id,
+            since=since,
+            until=until,
+            cursor=cursor,
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="activity_logs.{export_format}"'},
+    )
+
+
+@router.get("/auth")
+async def query_auth_events(
+    user_id: Optional[str] = None,
+    email: Optional[str] = None,
+    event: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    current_user=Depends(require_roles(*AUDIT_ROLES)),  # noqa: ARG001 - used for dependency validation
+    service: AuditService = Depends(get_audit_service),
+) -> dict:
+    return await service.query_auth_events(
+        user_id=user_id,
+        email=email,
+        event=event,
+        since=since,
+        until=until,
+        cursor=cursor,
+        limit=limit,
+    )
@@ -1,22 +1,34 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+
+from backend.api.conditional import conditional_response
 from backend.api.deps import get_care_service
+from backend.api.responses import BSONJSONResponse
 from backend.models import (
     CrewUpdatePayload,
     PublishPayload,
     SurgeryUpdatePayload,
+    TaskPatchPayload,
     TaskUpdatePayload,
+    TimelinePatchPayload,
     TimelineUpdatePayload,
     VitalsPayload,
 )
 from backend.security import require_roles
-from backend.services.care import CareService
+from backend.services.care import DEFAULT_PAGE_SIZE, CareService
 
 CLINICAL_ROLES = ("clinician", "admin")
+INGEST_ROLES = (*CLINICAL_ROLES, "device")
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+NDJSON_MAX_LINE_BYTES = 64 * 1024
+MAX_PAGE_SIZE = 200
 
-router = APIRouter(tags=["care"])
+# Routes return BSONJSONResponse themselves so FastAPI skips its jsonable_encoder pass.
+router = APIRouter(tags=["care"], default_response_class=BSONJSONResponse)
 
 
 @router.post("/tasks/update")
@@ -24,9 +36,19 @@ async def update_tasks(
     payload: TaskUpdatePayload,
     current_user=Depends(require_roles(*CLINICAL_ROLES)),
     service: CareService = Depends(get_care_service),
-) -> dict:
+) -> Response:
     performed_by = payload.performed_by or current_user.get("email")
-    return await service.update_tasks(payload, performed_by)
+    return BSONJSONResponse(await service.update_tasks(payload, performed_by))
+
+
+@router.patch("/tasks")
+async def patch_tasks(
+    payload: TaskPatchPayload,
+    current_user=Depends(require_roles(*CLINICAL_ROLES)),
+    service: CareService = Depends(get_care_service),
+) -> Response:
+    performed_by = payload.performed_by or current_user.get("email")
+    return BSONJSONResponse(await service.patch_tasks(payload, performed_by))
 
 
 @router.post("/crew/update")
@@ -34,9 +56,9 @@ async def update_crew(
     payload: CrewUpdatePayload,
     current_user=Depends(require_roles(*CLINICAL_ROLES)),
     service: CareService = Depends(get_care_service),
-) -> dict:
+) -> Response:
     performed_by = payload.performed_by or current_user.get("email")
-    return await service.update_crew(payload, performed_by)
+    return BSONJSONResponse(await service.update_crew(payload, performed_by))
 
 
 @router.post("/timeline/update")
@@ -44,9 +66,19 @@ async def update_timeline(
     payload: TimelineUpdatePayload,
     current_user=Depends(require_roles(*CLINICAL_ROLES)),
     service: CareService = Depends(get_care_service),
-) -> dict:
+) -> Response:
+    performed_by = payload.performed_by or current_user.get("email")
+    return BSONJSONResponse(await service.update_timeline(payload, performed_by))
+
+
+@router.patch("/timeline")
+async def patch_timeline(
+    payload: TimelinePatchPayload,
+    current_user=Depends(require_roles(*CLINICAL_ROLES)),
+    service: CareService = Depends(get_care_service),
+) -> Response:
     performed_by = payload.performed_by or current_user.get("email")
-    return await service.update_timeline(payload, performed_by)
+    return BSONJSONResponse(await service.patch_timeline(payload, performed_by))
 
 
 @router.post("/vitals/update")
@@ -54,54 +86,147 @@ async def update_vitals(
     payload: VitalsPayload,
     current_user=Depends(require_roles(*CLINICAL_ROLES)),
     service: CareService = Depends(get_care_service),
-) -> dict:
+) -> Response:
     performed_by = payload.performed_by or current_user.get("email")
-    return await service.record_vitals(payload, performed_by)
+    return BSONJSONResponse(await service.record_vitals(payload, performed_by))
+
+
+@router.post("/vitals/bulk")
+async def ingest_vitals(
+    request: Request,
+    current_user=Depends(require_roles(*INGEST_ROLES)),
+    service: CareService = Depends(get_care_service),
+) -> Response:
+    """Accept a JSON list (or ``{"readings": [...]}``) or a streamed NDJSON body of vitals."""
+
+    performed_by = current_user.get("email")
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_MEDIA_TYPES:
+        return BSONJSONResponse(await service.ingest_vitals(_ndjson_lines(request), performed_by))
+
+    try:
+        body = await request.json()
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be JSON or NDJSON") from exc
+    readings = body.get("readings") if isinstance(body, dict) else body
+    if not isinstance(readings, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a list of readings")
+    return BSONJSONResponse(await service.ingest_vitals(_iterate(readings), performed_by))
+
+
+async def _ndjson_lines(request: Request) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+        if len(buffer) > NDJSON_MAX_LINE_BYTES:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="NDJSON line too long")
+    if buffer.strip():
+        yield buffer
+
+
+async def _iterate(items: list) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
 
 
 @router.get("/tasks/{patient_id}")
 async def fetch_tasks(
     patient_id: str,
+    request: Request,
     current_user=Depends(require_roles(*CLINICAL_ROLES)),
     service: CareService = Depends(get_care_service),
-) -> dict:
-    return await service.fetch_tasks(patient_id)
+) -> Response:
+    return await conditional_response(
+        request,
+        lambda: service.tasks_version(patient_id),
+        lambda: service.fetch_tasks_versioned(patient_id),
+    )
 
 
 @router.get("/crew/{patient_id}")
 async def fetch_crew(
     patient_id: str,
+    request: Request,
     current_user=Depends(require_roles(*CLINICAL_ROLES)),
     service: CareService = Depends(get_care_service),
-) -> dict:
-    return await service.fetch_crew(patient_id)
+) -> Response:
+    return await conditional_response(
+        request,
+        lambda: service.crew_version(patient_id),
+        lambda: service.fetch_crew_versioned(patient_id),
+    )
 
 
 @router.get("/timeline/{patient_id}")
 async def fetch_timeline(
     patient_id: str,
+    request: Request,
     current_user=Depends(require_roles(*CLINICAL_ROLES)),
     service: CareService = Depends(get_care_service),
-) -> dict:
-    return await service.fetch_timeline(patient_id)
+) -> Response:
+    return await conditional_response(
+        request,
+        lambda: service.timeline_version(patient_id),
+        lambda: service.fetch_timeline_versioned(patient_id),
+    )
 
 
 @router.get("/vitals/{patient_id}/latest")
 async def fetch_latest_vitals(
     patient_id: str,
+    request: Request,
+    current_user=Depends(require_roles(*CLINICAL_ROLES)),
+    service: CareService = Depends(get_care_service),
+) -> Response:
+    return await conditional_response(
+        request,
+        lambda: service.latest_vitals_version(patient_id),
+        lambda: service.fetch_latest_vitals_versioned(patient_id),
+    )
+
+
+@router.get("/patients/{patient_id}/dashboard")
+async def fetch_patient_dashboard(
+    patient_id: str,
+    sections: Optional[str] = None,
+    current_user=Depends(require_roles(*CLINICAL_ROLES)),
+    service: CareService = Depends(get_care_service),
+) -> Response:
+    requested = [section.strip() for section in sections.split(",") if section.strip()] if sections else None
+    return BSONJSONResponse(await service.fetch_dashboard(patient_id, requested))
+
+
+@router.get("/vitals/{patient_id}/series")
+async def fetch_vitals_series(
+    patient_id: str,
+    since: Optional[datetime] = Query(None, alias="from"),
+    until: Optional[datetime] = Query(None, alias="to"),
+    bucket_seconds: Optional[int] = Query(None, ge=1),
+    limit: int = Query(5000, ge=1, le=20000),
     current_user=Depends(require_roles(*CLINICAL_ROLES)),
     service: CareService = Depends(get_care_service),
-) -> dict:
-    return await service.fetch_latest_vitals(patient_id)
+) -> Response:
+    return BSONJSONResponse(await service.fetch_vitals_series(patient_id, since, until, bucket_seconds, limit))
 
 
 @router.get("/surgeries/{doctor_id}")
 async def fetch_surgeries_for_doctor(
     doctor_id: str,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_user=Depends(require_roles(*CLINICAL_ROLES)),
     service: CareService = Depends(get_care_service),
-) -> dict:
-    return await service.fetch_surgeries_for_doctor(doctor_id)
+) -> Response:
+    surgeries = await service.fetch_surgeries_for_doctor(
+        doctor_id, date_from=date_from, date_to=date_to, cursor=cursor, limit=limit
+    )
+    return BSONJSONResponse(surgeries)
 
 
 @router.put("/surgeries/update/{surgery_id}")
@@ -110,18 +235,28 @@ async def update_surgery(
     payload: SurgeryUpdatePayload,
     current_user=Depends(require_roles(*CLINICAL_ROLES)),
     service: CareService = Depends(get_care_service),
-) -> dict:
+) -> Response:
     performed_by = payload.performed_by or current_user.get("email")
-    return await service.update_surgery(surgery_id, payload, performed_by)
+    return BSONJSONResponse(await service.update_surgery(surgery_id, payload, performed_by))
 
 
 @router.get("/published/{patient_id}")
 async def fetch_published_plans(
     patient_id: str,
+    request: Request,
+    since: Optional[datetime] = Query(None, alias="from"),
+    until: Optional[datetime] = Query(None, alias="to"),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     current_user=Depends(require_roles(*CLINICAL_ROLES)),
     service: CareService = Depends(get_care_service),
-) -> dict:
-    return await service.fetch_published_plans(patient_id)
+) -> Response:
+    page = {"since": since, "until": until, "cursor": cursor, "limit": limit}
+    return await conditional_response(
+        request,
+        lambda: service.published_plans_version(patient_id, **page),
+        lambda: service.fetch_published_plans_versioned(patient_id, **page),
+    )
 
 
 @router.post("/publish")
@@ -129,9 +264,9 @@ async def publish_plan(
     payload: PublishPayload,
     current_user=Depends(require_roles(*CLINICAL_ROLES)),
     service: CareService = Depends(get_care_service),
-) -> dict:
+) -> Response:
     performed_by = current_user.get("email")
-    return await service.publish_plan(payload, performed_by)
+    return BSONJSONResponse(await service.publish_plan(payload, performed_by))
 
 
 @router.get("/publish/{record_id}")
@@ -139,5 +274,15 @@ async def fetch_published_plan(
     record_id: str,
     current_user=Depends(require_roles(*CLINICAL_ROLES)),
     service: CareService = Depends(get_care_service),
-) -> dict:
-    return await service.fetch_published_plan(record_id)
+) -> Response:
+    return BSONJSONResponse(await service.fetch_published_plan(record_id))
+
+
+@router.get("/publish/{record_id}/diff/{other_id}")
+async def diff_published_plans(
+    record_id: str,
+    other_id: str,
+    current_user=Depends(require_roles(*CLINICAL_ROLES)),
+    service: CareService = Depends(get_care_service),
+) -> Response:
+    return BSONJSONResponse(await service.diff_published_plans(record_id, other_id))
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import AsyncIterator, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from backend.api.deps import get_event_broker
+from backend.security import require_roles
+from backend.services.common import json_default
+from backend.services.events import EventBroker, Subscription, doctor_topic, patient_topic
+
+EVENT_ROLES = ("clinician", "admin")
+HEARTBEAT_SECONDS = 15.0
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    patient_id: Optional[List[str]] = Query(None),
+    doctor_id: Optional[List[str]] = Query(None),
+    current_user=Depends(require_roles(*EVENT_ROLES)),  # noqa: ARG001 - used for dependency validation
+    broker: EventBroker = Depends(get_event_broker),
+) -> StreamingResponse:
+    """Server-Sent Events stream of care changes for the given patients and/or doctors."""
+
+    topics = [patient_topic(value) for value in patient_id or []] + [doctor_topic(value) for value in doctor_id or []]
+    if not topics:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Subscribe to at least one patient_id or doctor_id",
+        )
+    subscription = broker.subscribe(topics)
+    return StreamingResponse(
+        _event_stream(request, broker, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _event_stream(request: Request, broker: EventBroker, subscription: Subscription) -> AsyncIterator[str]:
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            data = json.dumps(
+                {"data": event["data"], "timestamp": event["timestamp"], "dropped": subscription.dropped},
+                default=json_default,
+            )
+            yield f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+    finally:
+        broker.unsubscribe(subscription)
@@ -1,19 +1,39 @@
 from __future__ import annotations
 
+import asyncio
+
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from jose import JWTError
 
-from backend.api.routes import auth, care, scheduling
+from backend.api.routes import admin, audit, auth, care, events, metrics, scheduling
 from backend.db.manager import db_manager
+from backend.db.migrations import ensure_constraints, migrate_indexes
+from backend.observability.loop_monitor import loop_monitor
+from backend.observability.middleware import MetricsMiddleware
+from backend.observability.profiler import ProfilingMiddleware
+from backend.observability.slow_queries import slow_query_log
+from backend.observability.tracing import TracingMiddleware, get_tracer
+from backend.repositories import audit_repository, care_repository, scheduling_repository, user_repository
+from backend.repositories.audit_repository import AuditRepository
+from backend.repositories.care_repository import CareRepository
 from backend.repositories.scheduling_repository import SchedulingRepository
 from backend.repositories.user_repository import UserRepository
 from backend.services.ai import AIOptimizationService, OptimizedAvailabilityService, OptimizationScheduler
-from backend.services.audit import AuditService
+from backend.services.audit import AuditRetentionScheduler, AuditService, AuditWriter
 from backend.services.auth import AuthService
 from backend.services.availability import AvailabilityService
+from backend.services.events import EventBroker, build_event_bus
+
+# Every index the repositories' queries rely on; monthly audit partitions manage their own.
+INDEXES = [
+    *user_repository.INDEXES,
+    *care_repository.INDEXES,
+    *scheduling_repository.INDEXES,
+    *audit_repository.INDEXES,
+]
 
 
 def create_app() -> FastAPI:
@@ -26,6 +46,9 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(TracingMiddleware)
+    app.add_middleware(ProfilingMiddleware)
 
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:  # noqa: ANN001
@@ -57,14 +80,27 @@ def create_app() -> FastAPI:
 
     @app.on_event("startup")
     async def startup_db_client() -> None:
+        loop_monitor.start()
         database = await db_manager.connect()
         app.state.db = database
-        # Ensure email uniqueness is enforced at the database level.
-        await database.users.create_index("email", unique=True)
+        slow_query_log.start(database)
         user_repo = UserRepository(database)
-        audit_service = AuditService(database)
+        audit_writer = AuditWriter(AuditRepository(database))
+        audit_writer.start()
+        app.state.audit_writer = audit_writer
+        audit_service = AuditService(database, audit_writer)
         auth_service = AuthService(user_repo, audit_service)
         await auth_service.ensure_default_roles()
+        care_repo = CareRepository(database)
+        # The time-series collection must exist before the registry indexes it.
+        await care_repo.ensure_vitals_series()
+        await ensure_constraints(database, INDEXES)
+        app.state.index_migration = asyncio.get_event_loop().create_task(
+            migrate_indexes(database, [spec for spec in INDEXES if not spec.constraint])
+        )
+        event_broker = EventBroker(build_event_bus(database))
+        await event_broker.start()
+        app.state.event_broker = event_broker
 
         scheduling_repo = SchedulingRepository(database)
         availability_service = AvailabilityService(scheduling_repo)
@@ -77,20 +113,43 @@ def create_app() -> FastAPI:
         )
         scheduler = OptimizationScheduler(ai_service)
         scheduler.start()
+        retention_scheduler = AuditRetentionScheduler(audit_service)
+        retention_scheduler.start()
 
         app.state.ai_service = ai_service
         app.state.optimized_availability_service = optimized_service
         app.state.optimization_scheduler = scheduler
+        app.state.audit_retention_scheduler = retention_scheduler
 
     @app.on_event("shutdown")
     async def shutdown_db_client() -> None:
+        index_migration = getattr(app.state, "index_migration", None)
+        if index_migration is not None and not index_migration.done():
+            index_migration.cancel()
         scheduler = getattr(app.state, "optimization_scheduler", None)
         if scheduler is not None:
             await scheduler.stop()
+        retention_scheduler = getattr(app.state, "audit_retention_scheduler", None)
+        if retention_scheduler is not None:
+            await retention_scheduler.stop()
+        event_broker = getattr(app.state, "event_broker", None)
+        if event_broker is not None:
+            await event_broker.stop()
+        audit_writer = getattr(app.state, "audit_writer", None)
+        if audit_writer is not None:
+            # Drain buffered audit events before the client goes away.
+            await audit_writer.stop()
+        await slow_query_log.stop()
         await db_manager.close()
+        get_tracer().shutdown()
+        await loop_monitor.stop()
 
+    app.include_router(admin.router)
+    app.include_router(audit.router)
     app.include_router(auth.router)
     app.include_router(care.router)
+    app.include_router(events.router)
+    app.include_router(metrics.router)
     app.include_router(scheduling.router)
 
     return app
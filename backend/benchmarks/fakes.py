@@ -0,0 +1,79 @@
+"""In-memory stand-ins for the Motor objects the benchmarked code paths touch.
+
+Lookups go through a per-field index so the fake adds next to no time of its own, even
+with 100k documents; only single-field equality filters are supported.
+"""
+
+from __future__ import annotations
+
+import copy
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class FakeCursor:
+    def __init__(self, documents: List[Dict[str, Any]]) -> None:
+        self._documents = documents
+
+    def sort(self, key: str, direction: int = 1) -> "FakeCursor":
+        self._documents = sorted(self._documents, key=lambda doc: doc.get(key), reverse=direction < 0)
+        return self
+
+    def limit(self, count: int) -> "FakeCursor":
+        if count:
+            self._documents = self._documents[:count]
+        return self
+
+    def __aiter__(self) -> "FakeCursor":
+        self._iterator = iter(self._documents)
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+class FakeCollection:
+    def __init__(self, documents: Iterable[Dict[str, Any]] = ()) -> None:
+        self._documents: List[Dict[str, Any]] = list(documents)
+        self._indexes: Dict[str, Dict[Any, List[Dict[str, Any]]]] = {}
+        self.updates: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+
+    def _matching(self, filter_doc: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not filter_doc:
+            return self._documents
+        if len(filter_doc) != 1:
+            raise NotImplementedError("FakeCollection only supports single-field equality filters")
+        field, value = next(iter(filter_doc.items()))
+        index = self._indexes.get(field)
+        if index is None:
+            index = defaultdict(list)
+            for document in self._documents:
+                index[document.get(field)].append(document)
+            self._indexes[field] = index
+        return index.get(value, [])
+
+    def find(self, filter_doc: Optional[Dict[str, Any]] = None, *args: Any, **kwargs: Any) -> FakeCursor:
+        return FakeCursor(self._matching(filter_doc))
+
+    async def find_one(self, filter_doc: Optional[Dict[str, Any]] = None, *args: Any, **kwargs: Any) -> Optional[Dict[str, Any]]:
+        matches = self._matching(filter_doc)
+        return copy.deepcopy(matches[0]) if matches else None
+
+    async def update_one(self, filter_doc: Dict[str, Any], update: Dict[str, Any], **kwargs: Any) -> None:
+        self.updates.append((filter_doc, update))
+
+
+class FakeDatabase:
+    def __init__(self, collections: Optional[Dict[str, Iterable[Dict[str, Any]]]] = None) -> None:
+        self._collections = {name: FakeCollection(documents) for name, documents in (collections or {}).items()}
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        return self._collections.setdefault(name, FakeCollection())
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
@@ -0,0 +1,395 @@
+"""Open-loop load generator for the API, in-process or over HTTP.
+
+Drives a weighted mix of logins, availability checks, optimized availability, dashboard
+reads, vitals writes and publishes at a fixed arrival rate per stage, and steps the rate
+up until a stage breaks the latency or error-rate SLO:
+
+    python -m backend.benchmarks.load --rates 10 25 50 100 --duration 30
+    python -m backend.benchmarks.load --base-url http://localhost:8000 --mix dashboard=8,vitals=2
+
+Without ``--base-url`` the app is built with ``create_app()`` and driven through
+``httpx.ASGITransport`` after running its startup handlers, so it needs the MongoDB from
+``MONGODB_URL``, seeded with ``python -m backend.seed_db``. The generator then shares the
+event loop with the app; use ``--base-url`` against a separate server for numbers that
+exclude it.
+
+Arrivals are Poisson and are not held back by slow responses, and latency is measured
+from each request's scheduled arrival time, so queueing in the server shows up in the
+percentiles instead of silently lowering the offered rate.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import httpx
+
+from backend.config import SYNTHETIC_DOCTOR_ID_FORMAT, SYNTHETIC_PATIENT_ID_FORMAT, SYNTHETIC_START_DATE
+
+DEFAULT_MIX = "login=1,availability=3,optimized=2,dashboard=6,vitals=4,publish=1"
+DEFAULT_RATES = (10.0, 25.0, 50.0, 100.0, 200.0)
+DEFAULT_EMAIL = "Johndoe@mail.com"
+DEFAULT_PASSWORD = "password"
+
+
+@dataclass
+class LoadContext:
+    token: str = ""
+    emails: Sequence[str] = (DEFAULT_EMAIL,)
+    password: str = DEFAULT_PASSWORD
+    patients: int = 1_000
+    doctors: int = 100
+    days: int = 1
+    start_date: date = SYNTHETIC_START_DATE
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+    def patient_id(self, rng: random.Random) -> str:
+        return SYNTHETIC_PATIENT_ID_FORMAT.format(rng.randrange(self.patients))
+
+    def doctor_id(self, rng: random.Random) -> str:
+        return SYNTHETIC_DOCTOR_ID_FORMAT.format(rng.randrange(self.doctors))
+
+    def requested_date(self, rng: random.Random) -> str:
+        return (self.start_date + timedelta(days=rng.randrange(self.days))).isoformat()
+
+
+Operation = Callable[[httpx.AsyncClient, LoadContext, random.Random], Awaitable[httpx.Response]]
+
+
+async def login(client: httpx.AsyncClient, context: LoadContext, rng: random.Random) -> httpx.Response:
+    return await client.post("/auth/login", json={"email": rng.choice(context.emails), "password": context.password})
+
+
+def _availability_request(context: LoadContext, rng: random.Random) -> Dict[str, Any]:
+    start = rng.randrange(7, 16)
+    return {
+        "patient_id": context.patient_id(rng),
+        "requested_date": context.requested_date(rng),
+        "requested_start": f"{start:02d}:00",
+        "requested_end": f"{start + rng.choice((1, 2, 3)):02d}:00",
+        "required_test_type": "MRI",
+        "required_radiologists": rng.randint(1, 2),
+        "required_assistant_doctors": rng.randint(1, 2),
+        "required_nurses": rng.randint(1, 3),
+        "required_operation_rooms": 1,
+        "required_equipment": "MRI Scanner",
+        "time_constraint_type": rng.choice(("overlap", "exact")),
+    }
+
+
+async def availability(client: httpx.AsyncClient, context: LoadContext, rng: random.Random) -> httpx.Response:
+    return await client.post("/availability", json=_availability_request(context, rng), headers=context.headers)
+
+
+async def optimized(client: httpx.AsyncClient, context: LoadContext, rng: random.Random) -> httpx.Response:
+    return await client.post(
+        "/availability/optimized", json=_availability_request(context, rng), headers=context.headers
+    )
+
+
+async def dashboard(client: httpx.AsyncClient, context: LoadContext, rng: random.Random) -> httpx.Response:
+    return await client.get(f"/patients/{context.patient_id(rng)}/dashboard", headers=context.headers)
+
+
+async def vitals(client: httpx.AsyncClient, context: LoadContext, rng: random.Random) -> httpx.Response:
+    payload = {
+        "patient_id": context.patient_id(rng),
+        "heart_rate": str(rng.randint(55, 120)),
+        "blood_pressure": f"{rng.randint(100, 150)}/{rng.randint(60, 95)}",
+        "spo2": str(rng.randint(90, 100)),
+        "captured_at": datetime.utcnow().isoformat(),
+    }
+    return await client.post("/vitals/update", json=payload, headers=context.headers)
+
+
+async def publish(client: httpx.AsyncClient, context: LoadContext, rng: random.Random) -> httpx.Response:
+    steps = ("pre-op", "induction", "procedure", "recovery")
+    payload = {
+        "plan_id": f"LOAD-{rng.getrandbits(48):012x}",
+        "doctor_id": context.doctor_id(rng),
+        "patient_id": context.patient_id(rng),
+        "timeline": [
+            {"id": step, "time": f"{8 + index:02d}:00", "status": "upcoming"} for index, step in enumerate(steps)
+        ],
+        "crew": [{"id": context.doctor_id(rng), "role": "surgeon"}],
+        "tasks": [{"label": f"Task {index}", "status": "pending"} for index in range(rng.randint(3, 10))],
+        "vitals": {"heart_rate": rng.randint(55, 120), "spo2": rng.randint(90, 100)},
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+    return await client.post("/publish", json=payload, headers=context.headers)
+
+
+OPERATIONS: Dict[str, Operation] = {
+    "login": login,
+    "availability": availability,
+    "optimized": optimized,
+    "dashboard": dashboard,
+    "vitals": vitals,
+    "publish": publish,
+}
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """``name=weight,...`` into weights; unknown names and non-positive totals are errors."""
+
+    mix: Dict[str, float] = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name!r}; expected one of {', '.join(OPERATIONS)}")
+        mix[name] = float(weight) if weight else 1.0
+        if mix[name] < 0:
+            raise ValueError(f"Negative weight for {name!r}")
+    if sum(mix.values()) <= 0:
+        raise ValueError("The mix needs at least one positive weight")
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def percentile(ordered: Sequence[float], quantile: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(quantile * len(ordered)), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+@dataclass
+class RouteStats:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+
+    def record(self, latency: float, status: Optional[int]) -> None:
+        self.latencies.append(latency)
+        self.statuses[str(status) if status is not None else "exception"] += 1
+        # Client errors are the workload's fault (bad ids, expired logins), not the server's.
+        if status is None or status >= 500:
+            self.errors += 1
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        return {
+            "requests": len(ordered),
+            "errors": self.errors,
+            "statuses": dict(self.statuses),
+            "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        }
+
+
+async def run_stage(
+    client: httpx.AsyncClient,
+    context: LoadContext,
+    mix: Dict[str, float],
+    rate: float,
+    duration: float,
+    *,
+    max_inflight: int = 1_000,
+    rng: Optional[random.Random] = None,
+) -> Dict[str, Any]:
+    """Offer ``rate`` requests per second for ``duration`` seconds and summarise per route.
+
+    Arrivals that find ``max_inflight`` requests already outstanding are dropped and
+    counted, rather than queued in the generator.
+    """
+
+    rng = rng or random.Random()
+    names, weights = list(mix), list(mix.values())
+    stats: Dict[str, RouteStats] = {name: RouteStats() for name in names}
+    inflight: set = set()
+    dropped = 0
+
+    async def issue(name: str, scheduled: float) -> None:
+        status: Optional[int] = None
+        try:
+            response = await OPERATIONS[name](client, context, rng)
+            status = response.status_code
+        except Exception:  # noqa: BLE001 - transport errors and, in-process, app exceptions
+            pass
+        stats[name].record(time.perf_counter() - scheduled, status)
+
+    started = time.perf_counter()
+    deadline = started + duration
+    scheduled = started
+    while True:
+        scheduled += rng.expovariate(rate)
+        if scheduled >= deadline:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(inflight) >= max_inflight:
+            dropped += 1
+            continue
+        task = asyncio.ensure_future(issue(rng.choices(names, weights)[0], scheduled))
+        inflight.add(task)
+        task.add_done_callback(inflight.discard)
+    if inflight:
+        await asyncio.wait(inflight)
+    elapsed = time.perf_counter() - started
+
+    routes = {name: route.summary() for name, route in stats.items()}
+    completed = sum(route["requests"] for route in routes.values())
+    errors = sum(route["errors"] for route in routes.values()) + dropped
+    overall = RouteStats(latencies=[latency for route in stats.values() for latency in route.latencies])
+    return {
+        "offered_rate": rate,
+        "duration_seconds": round(elapsed, 3),
+        "completed": completed,
+        "dropped": dropped,
+        "throughput_rps": round(completed / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(errors / (completed + dropped), 4) if completed + dropped else 0.0,
+        "overall": {key: value for key, value in overall.summary().items() if key.endswith("_ms")},
+        "routes": routes,
+    }
+
+
+def slo_violations(stage: Dict[str, Any], p99_ms: float, max_error_rate: float) -> List[str]:
+    violations = [
+        f"{name} p99 {route['p99_ms']:.1f} ms > {p99_ms:g} ms"
+        for name, route in stage["routes"].items()
+        if route["requests"] and route["p99_ms"] > p99_ms
+    ]
+    if stage["error_rate"] > max_error_rate:
+        violations.append(f"error rate {stage['error_rate']:.2%} > {max_error_rate:.2%}")
+    return violations
+
+
+def _print_stage(stage: Dict[str, Any]) -> None:
+    print(
+        f"\n== {stage['offered_rate']:g} req/s offered: {stage['throughput_rps']:.1f} req/s completed, "
+        f"{stage['dropped']} dropped, error rate {stage['error_rate']:.2%}"
+    )
+    print(f"{'route':<14}{'requests':>10}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, route in stage["routes"].items():
+        print(
+            f"{name:<14}{route['requests']:>10}{route['errors']:>8}{route['p50_ms']:>10.1f}"
+            f"{route['p95_ms']:>10.1f}{route['p99_ms']:>10.1f}{route['max_ms']:>10.1f}"
+        )
+    for violation in stage["violations"]:
+        print(f"  SLO BREACH: {violation}")
+
+
+async def _login(client: httpx.AsyncClient, context: LoadContext) -> str:
+    response = await client.post("/auth/login", json={"email": context.emails[0], "password": context.password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    mix = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    emails = [args.email.format(index) for index in range(args.accounts)] if "{" in args.email else [args.email]
+    context = LoadContext(
+        emails=emails,
+        password=args.password,
+        patients=args.patients,
+        doctors=args.doctors,
+        days=args.days,
+        start_date=date.fromisoformat(args.start_date),
+    )
+    limits = httpx.Limits(max_connections=args.max_inflight, max_keepalive_connections=args.max_inflight)
+    app = None
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout)
+    else:
+        from backend.app import create_app
+
+        app = create_app()
+        await app.router.startup()
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+            base_url="http://load",
+            limits=limits,
+            timeout=args.timeout,
+        )
+
+    stages: List[Dict[str, Any]] = []
+    sustained: Optional[float] = None
+    try:
+        context.token = await _login(client, context)
+        for rate in args.rates:
+            if args.warmup:
+                await run_stage(client, context, mix, rate, args.warmup, max_inflight=args.max_inflight, rng=rng)
+            stage = await run_stage(client, context, mix, rate, args.duration, max_inflight=args.max_inflight, rng=rng)
+            stage["violations"] = slo_violations(stage, args.slo_p99_ms, args.max_error_rate)
+            stages.append(stage)
+            _print_stage(stage)
+            if not stage["violations"]:
+                sustained = rate
+            elif not args.keep_going:
+                break
+    finally:
+        await client.aclose()
+        if app is not None:
+            await app.router.shutdown()
+
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "target": args.base_url or "in-process",
+            "mix": mix,
+            "seed": args.seed,
+            "slo": {"p99_ms": args.slo_p99_ms, "max_error_rate": args.max_error_rate},
+        },
+        "max_sustained_rate": sustained,
+        "stages": stages,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", help="drive a running server instead of the app in-process")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation weights, e.g. dashboard=6,vitals=4")
+    parser.add_argument("--rates", type=float, nargs="+", default=list(DEFAULT_RATES), help="arrival rates per stage")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per stage")
+    parser.add_argument("--warmup", type=float, default=0.0, help="unreported seconds before each stage")
+    parser.add_argument("--slo-p99-ms", type=float, default=500.0, help="per-route p99 latency limit")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="5xx, exceptions and drops")
+    parser.add_argument("--keep-going", action="store_true", help="run every stage even after an SLO breach")
+    parser.add_argument("--max-inflight", type=int, default=1_000)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--email", default=DEFAULT_EMAIL, help="login email; '{}' is replaced by an account index")
+    parser.add_argument("--accounts", type=int, default=1, help="account indexes used with a '{}' email")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--patients", type=int, default=1_000, help="patient ids P-000000.. to spread load over")
+    parser.add_argument("--doctors", type=int, default=100, help="doctor ids D-00000.. used in publishes")
+    parser.add_argument("--days", type=int, default=1, help="requested dates from --start-date")
+    parser.add_argument("--start-date", default=SYNTHETIC_START_DATE.isoformat())
+    parser.add_argument("--seed", type=int, default=None, help="make the request sequence reproducible")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    args = parser.parse_args()
+
+    try:
+        parse_mix(args.mix)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    result = asyncio.run(run(args))
+    print(f"\nMax sustained rate within SLO: {result['max_sustained_rate'] or 'none'} req/s")
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+    if result["max_sustained_rate"] is None:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Compare BSONJSONResponse with FastAPI's jsonable_encoder + JSONResponse on published plans.
+
+    python -m backend.benchmarks.serialization --plans 50 --steps 200 --iterations 50
+
+The legacy path cannot encode nested ObjectIds at all, so the documents here only nest
+datetimes; ``serialize_doc`` has already converted the top-level fields, as in the routes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from backend.api.responses import BSONJSONResponse
+from backend.services.common import serialize_doc
+
+
+def published_plans(plans: int, steps: int) -> Dict[str, Any]:
+    started = datetime(2025, 4, 2, 7, 0)
+    docs: List[Dict[str, Any]] = []
+    for plan in range(plans):
+        docs.append(
+            serialize_doc(
+                {
+                    "_id": ObjectId(),
+                    "plan_id": f"PLAN-{plan}",
+                    "doctor_id": "D-1",
+                    "patient_id": "P-1",
+                    "created_at": started + timedelta(minutes=plan),
+                    "timestamp": started,
+                    "timeline": [
+                        {
+                            "id": f"step-{step}",
+                            "title": "Anaesthesia check",
+                            "time": "08:00",
+                            "owner": "Nurse Patel",
+                            "status": "upcoming",
+                            "updated_at": started + timedelta(seconds=step),
+                        }
+                        for step in range(steps)
+                    ],
+                    "tasks": [
+                        {"label": f"Task {task}", "status": "pending", "due_at": started + timedelta(hours=task)}
+                        for task in range(steps // 4)
+                    ],
+                    "crew": [{"name": "Dr. Rao", "role": "surgeon"}, {"name": "Nurse Patel", "role": "nurse"}],
+                    "vitals": {"heart_rate": "72 bpm", "blood_pressure": "120/80", "captured_at": started},
+                }
+            )
+        )
+    return {"plans": docs, "next_cursor": None}
+
+
+def legacy_render(body: Dict[str, Any]) -> bytes:
+    return JSONResponse(jsonable_encoder(body)).body
+
+
+def bson_render(body: Dict[str, Any]) -> bytes:
+    return BSONJSONResponse(body).body
+
+
+def _measure(iterations: int, render: Callable[[Dict[str, Any]], bytes], body: Dict[str, Any]) -> Dict[str, float]:
+    timings: List[float] = []
+    size = 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        size = len(render(body))
+        timings.append((time.perf_counter() - started) * 1000)
+    return {"mean_ms": statistics.mean(timings), "min_ms": min(timings), "bytes": size}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plans", type=int, default=50)
+    parser.add_argument("--steps", type=int, default=200, help="timeline steps per plan")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    body = published_plans(args.plans, args.steps)
+    results = {
+        "jsonable_encoder": _measure(args.iterations, legacy_render, body),
+        "BSONJSONResponse": _measure(args.iterations, bson_render, body),
+    }
+    print(f"{'encoder':<20}{'mean ms':>10}{'min ms':>10}{'bytes':>12}")
+    for name, result in results.items():
+        print(f"{name:<20}{result['mean_ms']:>10.2f}{result['min_ms']:>10.2f}{result['bytes']:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""Offline micro-benchmarks for the availability, optimisation, serialisation and auth hot paths.
+
+Runs against the in-memory fakes in ``backend.benchmarks.fakes``; no MongoDB needed:
+
+    python -m backend.benchmarks.suite --output baseline.json
+    python -m backend.benchmarks.suite --compare baseline.json --threshold 0.15
+
+``--compare`` exits with status 1 when any case's median got slower than the baseline by
+more than ``--threshold``. Tracing is disabled unless ``--with-tracing`` is given, so
+the numbers describe the code itself.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from bson import ObjectId
+from starlette.requests import Request
+
+from backend.benchmarks.fakes import FakeDatabase
+from backend.models import AvailabilityRequest, AvailabilityResponse, Resource, TestScore
+from backend.observability import tracing
+from backend.repositories.scheduling_repository import SchedulingRepository
+from backend.security import decode_access_token, get_current_user, hash_session_identifier
+from backend.services.ai import AIOptimizationService
+from backend.services.auth import create_access_token
+from backend.services.availability import AvailabilityService, TTLCache
+from backend.services.common import serialize_doc
+
+DEFAULT_SIZES = (10, 1_000, 100_000)
+TARGET_DATE = date(2025, 4, 2)
+
+
+@dataclass
+class Case:
+    name: str
+    func: Callable[[], Any]
+    is_async: bool = False
+
+
+class _NoCache(TTLCache):
+    """Always misses, so every call does the full fetch."""
+
+    def get(self, key: str) -> Optional[object]:
+        return None
+
+
+def staff_roster(size: int) -> List[Dict[str, Any]]:
+    roles = ("radiologist", "assistant_doctor")
+    return [
+        {
+            "_id": f"staff-{index}",
+            "name": f"Dr. Staff {index}",
+            "role": roles[index % 2],
+            "email": f"staff{index}@example.com",
+            "working_hours": [
+                {"day_of_week": day, "start": f"{7 + index % 4:02d}:00", "end": f"{15 + index % 4:02d}:00"}
+                for day in range(7)
+            ],
+        }
+        for index in range(size)
+    ]
+
+
+def nurse_roster(size: int) -> List[Dict[str, Any]]:
+    day = datetime(TARGET_DATE.year, TARGET_DATE.month, TARGET_DATE.day)
+    return [
+        {
+            "nurse_id": f"N-{index}",
+            "nurse_name": f"Nurse {index}",
+            "nurse_email": f"nurse{index}@example.com",
+            "date": day,
+            "start": f"{6 + index % 6:02d}:00",
+            "end": f"{14 + index % 6:02d}:00",
+        }
+        for index in range(size)
+    ]
+
+
+def availability_request() -> AvailabilityRequest:
+    return AvailabilityRequest(
+        patient_id="P-1",
+        requested_date=TARGET_DATE.isoformat(),
+        requested_start="09:00",
+        requested_end="11:00",
+        required_test_type="MRI",
+        required_radiologists=2,
+        required_assistant_doctors=2,
+        required_nurses=3,
+        required_operation_rooms=1,
+        required_equipment="MRI Scanner",
+    )
+
+
+def availability_response(per_role: int) -> AvailabilityResponse:
+    def resources(prefix: str) -> List[Resource]:
+        return [Resource(id=f"{prefix}-{index}", name=f"{prefix} {index}") for index in range(per_role)]
+
+    return AvailabilityResponse(
+        date=TARGET_DATE.isoformat(),
+        start="09:00",
+        end="11:00",
+        radiologists_available=resources("rad"),
+        assistant_doctors_available=resources("asst"),
+        nurses_available=resources("nurse"),
+        equipment_available=[Resource(id="MRI Scanner", name="MRI Scanner")],
+        operation_theatres_available=resources("ot"),
+        latest_test_scores=[TestScore(patient_id="P-1", score=0.9, date=TARGET_DATE)],
+        match_status="Requirements matched",
+    )
+
+
+def published_plan_document() -> Dict[str, Any]:
+    started = datetime(2025, 4, 2, 7, 0)
+    return {
+        "_id": ObjectId(),
+        "plan_id": "PLAN-1",
+        "doctor_id": "D-1",
+        "patient_id": "P-1",
+        "created_at": started,
+        "updated_at": started,
+        "timestamp": started,
+        "timeline": [{"id": f"step-{step}", "time": "08:00", "status": "upcoming"} for step in range(50)],
+        "tasks": [{"label": f"Task {task}", "status": "pending"} for task in range(20)],
+    }
+
+
+def _session_request(user_id: ObjectId, session_id: str) -> Request:
+    user_doc = {
+        "_id": user_id,
+        "email": "bench@example.com",
+        "roles": ["Clinician"],
+        "active_sessions": [
+            {
+                "fingerprint": hash_session_identifier(session_id),
+                "created_at": datetime.utcnow(),
+                "expires_at": datetime.utcnow() + timedelta(days=1),
+            }
+        ],
+    }
+    app = SimpleNamespace(state=SimpleNamespace(db=FakeDatabase({"users": [user_doc]})))
+    return Request({"type": "http", "headers": [], "app": app}, receive=lambda: None)
+
+
+def build_cases(sizes: Sequence[int]) -> List[Case]:
+    request = availability_request()
+    window_match = AvailabilityService._time_window_match
+    cases = [
+        Case("time_window_match.overlap", lambda: window_match("08:00", "16:00", "09:00", "11:00", "overlap")),
+        Case("time_window_match.exact", lambda: window_match("08:00", "16:00", "09:00", "11:00", "exact")),
+        Case("request_signature", lambda: AIOptimizationService.request_signature(request)),
+    ]
+
+    for size in sizes:
+        database = FakeDatabase({"staff": staff_roster(size), "nurse_availability": nurse_roster(size)})
+        service = AvailabilityService(SchedulingRepository(database), _NoCache(name="benchmark"))  # type: ignore[arg-type]
+        cases.append(
+            Case(
+                f"fetch_staff[{size}]",
+                lambda service=service: service._fetch_staff("radiologist", TARGET_DATE, "09:00", "11:00", "overlap"),
+                is_async=True,
+            )
+        )
+        cases.append(
+            Case(
+                f"fetch_generic[{size}]",
+                lambda service=service: service._fetch_generic(
+                    "nurse_availability", TARGET_DATE, "09:00", "11:00", "overlap", "nurse_id", "nurse_name", "nurse_email"
+                ),
+                is_async=True,
+            )
+        )
+
+    ai_service = AIOptimizationService(SchedulingRepository(FakeDatabase()))  # type: ignore[arg-type]
+    for per_role in (10, 100):
+        availability = availability_response(per_role)
+        cases.append(
+            Case(
+                f"generate_scenarios[{per_role}]",
+                lambda availability=availability: ai_service.generate_scenarios(request, availability),
+                is_async=True,
+            )
+        )
+
+    document = published_plan_document()
+    cases.append(Case("serialize_doc", lambda: serialize_doc(document)))
+
+    user_id, session_id = ObjectId(), "benchmark-session"
+    token = create_access_token(str(user_id), session_id)
+    session_request = _session_request(user_id, session_id)
+    cases.append(Case("jwt.encode", lambda: create_access_token(str(user_id), session_id)))
+    cases.append(Case("jwt.decode", lambda: decode_access_token(token)))
+    cases.append(Case("get_current_user", lambda: get_current_user(session_request, token), is_async=True))
+    return cases
+
+
+def _timer(case: Case, loop: asyncio.AbstractEventLoop) -> Callable[[int], float]:
+    if case.is_async:
+
+        async def run_async(number: int) -> float:
+            started = time.perf_counter()
+            for _ in range(number):
+                await case.func()
+            return time.perf_counter() - started
+
+        return lambda number: loop.run_until_complete(run_async(number))
+
+    def run_sync(number: int) -> float:
+        func = case.func
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        return time.perf_counter() - started
+
+    return run_sync
+
+
+def measure(case: Case, loop: asyncio.AbstractEventLoop, repeats: int, min_time: float) -> Dict[str, Any]:
+    """Per-call timings in microseconds, ``timeit.autorange`` style."""
+
+    timer = _timer(case, loop)
+    number = 1
+    while True:
+        elapsed = timer(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.1))
+    per_call = [timer(number) / number * 1_000_000 for _ in range(repeats)]
+    return {
+        "median_us": statistics.median(per_call),
+        "min_us": min(per_call),
+        "mean_us": statistics.mean(per_call),
+        "stdev_us": statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        "loops": number,
+        "repeats": repeats,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        output = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def run(sizes: Sequence[int], repeats: int, min_time: float, pattern: Optional[str] = None) -> Dict[str, Any]:
+    cases = [case for case in build_cases(sizes) if pattern is None or re.search(pattern, case.name)]
+    loop = asyncio.new_event_loop()
+    try:
+        results = {case.name: measure(case, loop, repeats, min_time) for case in cases}
+    finally:
+        loop.close()
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "repeats": repeats,
+            "min_time": min_time,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Median change per case present in both runs; ``regression`` when slower than ``threshold``."""
+
+    rows: List[Dict[str, Any]] = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        change = result["median_us"] / before["median_us"] - 1 if before["median_us"] else 0.0
+        rows.append(
+            {
+                "case": name,
+                "baseline_us": before["median_us"],
+                "current_us": result["median_us"],
+                "change": change,
+                "regression": change > threshold,
+            }
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="roster sizes")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing run")
+    parser.add_argument("--filter", help="only run cases matching this regular expression")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--compare", type=Path, help="baseline JSON written by --output")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before failing")
+    parser.add_argument("--with-tracing", action="store_true", help="keep span recording enabled")
+    args = parser.parse_args()
+
+    if not args.with_tracing:
+        tracing.tracer = tracing.Tracer([])
+
+    current = run(args.sizes, args.repeat, args.min_time, args.filter)
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+
+    if not args.compare:
+        print(f"{'case':<28}{'median us':>14}{'min us':>14}{'stdev us':>12}{'loops':>10}")
+        for name, result in current["results"].items():
+            print(
+                f"{name:<28}{result['median_us']:>14.2f}{result['min_us']:>14.2f}"
+                f"{result['stdev_us']:>12.2f}{result['loops']:>10}"
+            )
+        return
+
+    rows = compare(json.loads(args.compare.read_text(encoding="utf-8")), current, args.threshold)
+    print(f"{'case':<28}{'baseline us':>14}{'current us':>14}{'change':>10}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['case']:<28}{row['baseline_us']:>14.2f}{row['current_us']:>14.2f}{row['change']:>+10.1%}{flag}")
+    if any(row["regression"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Compare CareService write paths against the legacy write-then-read implementations.
+
+Runs against an in-memory database that sleeps ``--latency-ms`` per command, so the
+difference is the round trips saved per write:
+
+    python -m backend.benchmarks.write_paths --latency-ms 3 --iterations 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import statistics
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from backend.models import PublishPayload, SurgeryUpdatePayload
+from backend.repositories.care_repository import CareRepository
+from backend.services.care import CareService
+
+
+class _InsertResult:
+    def __init__(self, inserted_id: Any) -> None:
+        self.inserted_id = inserted_id
+
+
+class _UpdateResult:
+    def __init__(self, matched_count: int) -> None:
+        self.matched_count = matched_count
+
+
+class LatencyCollection:
+    """Just enough of a Motor collection for the write paths, keyed by ``_id``."""
+
+    def __init__(self, database: "LatencyDatabase") -> None:
+        self._database = database
+        self._docs: Dict[Any, Dict[str, Any]] = {}
+        self.bulk_writes: List[List[Any]] = []
+
+    async def insert_one(self, document: Dict[str, Any]) -> _InsertResult:
+        await self._database.round_trip()
+        document.setdefault("_id", ObjectId())
+        self._docs[document["_id"]] = copy.deepcopy(document)
+        return _InsertResult(document["_id"])
+
+    async def find_one(self, filter_doc: Dict[str, Any], *args: Any, **kwargs: Any) -> Optional[Dict[str, Any]]:
+        await self._database.round_trip()
+        doc = self._docs.get(filter_doc.get("_id"))
+        return copy.deepcopy(doc) if doc is not None else None
+
+    async def update_one(self, filter_doc: Dict[str, Any], update: Dict[str, Any], **kwargs: Any) -> _UpdateResult:
+        await self._database.round_trip()
+        doc = self._docs.get(filter_doc.get("_id"))
+        if doc is None:
+            return _UpdateResult(0)
+        doc.update(update.get("$set", {}))
+        return _UpdateResult(1)
+
+    async def find_one_and_update(self, filter_doc: Dict[str, Any], update: Dict[str, Any], **kwargs: Any) -> Optional[Dict[str, Any]]:
+        await self._database.round_trip()
+        doc = self._docs.get(filter_doc.get("_id"))
+        if doc is None:
+            return None
+        before = copy.deepcopy(doc)
+        doc.update(update.get("$set", {}))
+        return copy.deepcopy(doc if kwargs.get("return_document") == ReturnDocument.AFTER else before)
+
+    async def bulk_write(self, operations: List[Any], ordered: bool = True) -> None:
+        # Only the round trip matters here; nothing reads the written sections back.
+        await self._database.round_trip()
+        self.bulk_writes.append(list(operations))
+
+
+class LatencyDatabase:
+    def __init__(self, latency_seconds: float) -> None:
+        self.latency_seconds = latency_seconds
+        self.round_trips = 0
+        self._collections: Dict[str, LatencyCollection] = {}
+
+    async def round_trip(self) -> None:
+        self.round_trips += 1
+        await asyncio.sleep(self.latency_seconds)
+
+    def __getitem__(self, name: str) -> LatencyCollection:
+        return self._collections.setdefault(name, LatencyCollection(self))
+
+    def __getattr__(self, name: str) -> LatencyCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+
+class _QueuedAudit:
+    """Stands in for AuditService with async durability: entries are only queued."""
+
+    async def log_activity(self, *args: Any, **kwargs: Any) -> None:
+        return None
+
+
+async def legacy_update_surgery(database: LatencyDatabase, surgery_id: ObjectId, updates: Dict[str, Any]) -> Dict[str, Any]:
+    await database.surgeries.update_one({"_id": surgery_id}, {"$set": updates})
+    return await database.surgeries.find_one({"_id": surgery_id})
+
+
+async def legacy_publish_plan(database: LatencyDatabase, record: Dict[str, Any]) -> Dict[str, Any]:
+    result = await database.published_plans.insert_one(record)
+    return await database.published_plans.find_one({"_id": result.inserted_id})
+
+
+def _plan_payload() -> PublishPayload:
+    return PublishPayload(
+        plan_id="PLAN-1",
+        doctor_id="D-1",
+        patient_id="P-1",
+        timeline=[{"id": "prep", "title": "Prep", "time": "08:00", "owner": "Nurse", "status": "done"}],
+        crew=[{"name": "Dr. Rao", "role": "surgeon"}],
+        tasks=[{"label": "Consent", "status": "completed"}],
+        vitals={"heart_rate": "72 bpm"},
+        timestamp=datetime(2025, 4, 2, 8, 0),
+    )
+
+
+async def _measure(database: LatencyDatabase, iterations: int, call: Callable[[], Awaitable[Any]]) -> Dict[str, float]:
+    timings: List[float] = []
+    database.round_trips = 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "mean_ms": statistics.mean(timings),
+        "p95_ms": sorted(timings)[int(len(timings) * 0.95) - 1],
+        "commands": database.round_trips / iterations,
+    }
+
+
+async def run(latency_ms: float, iterations: int) -> Dict[str, Dict[str, float]]:
+    database = LatencyDatabase(latency_ms / 1000)
+    service = CareService(CareRepository(database), _QueuedAudit())  # type: ignore[arg-type]
+    surgery_id = ObjectId()
+    database.surgeries._docs[surgery_id] = {"_id": surgery_id, "doctor_id": "D-1", "status": "scheduled"}
+    update = SurgeryUpdatePayload(status="in_progress")
+    payload = _plan_payload()
+
+    return {
+        "update_surgery.legacy": await _measure(
+            database, iterations, lambda: legacy_update_surgery(database, surgery_id, {"status": "in_progress"})
+        ),
+        "update_surgery": await _measure(
+            database, iterations, lambda: service.update_surgery(str(surgery_id), update, "bench@example.com")
+        ),
+        "publish_plan.legacy": await _measure(
+            database, iterations, lambda: legacy_publish_plan(database, payload.model_dump())
+        ),
+        "publish_plan": await _measure(database, iterations, lambda: service.publish_plan(payload, "bench@example.com")),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=3.0, help="simulated latency per database command")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.latency_ms, args.iterations))
+    print(f"{'case':<24}{'mean ms':>10}{'p95 ms':>10}{'commands':>10}")
+    for name, result in results.items():
+        print(f"{name:<24}{result['mean_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['commands']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
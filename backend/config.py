@@ -1,5 +1,6 @@
 import os
-from typing import Tuple
+from datetime import date
+from typing import Dict, Tuple
 
 from dotenv import load_dotenv
 
@@ -7,6 +8,29 @@ load_dotenv()
 
 MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
 MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME", "hospital1")
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "0"))
+# 0 keeps idle connections and waits for a free connection indefinitely (driver defaults).
+MONGODB_MAX_IDLE_TIME_MS = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "0"))
+MONGODB_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "0"))
+# Wire compression in order of preference, e.g. "zstd,snappy"; needs the matching python package.
+MONGODB_COMPRESSORS: Tuple[str, ...] = tuple(
+    compressor.strip().lower()
+    for compressor in os.getenv("MONGODB_COMPRESSORS", "").split(",")
+    if compressor.strip()
+)
+# Read preference per read group ("audit", "published_plans", "surgeries", ...) as
+# "group=mode" pairs; groups not listed read from the primary.
+MONGODB_READ_PREFERENCES: Dict[str, str] = dict(
+    (name.strip(), mode.strip())
+    for name, _, mode in (
+        pair.partition("=")
+        for pair in os.getenv("MONGODB_READ_PREFERENCES", "audit=secondaryPreferred").split(",")
+    )
+    if name.strip() and mode.strip()
+)
+# Secondaries lagging further behind than this are not read from; MongoDB's minimum is 90.
+MONGODB_MAX_STALENESS_SECONDS = int(os.getenv("MONGODB_MAX_STALENESS_SECONDS", "90"))
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "change-me")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
 SESSION_TTL_MINUTES = int(os.getenv("SESSION_TTL_MINUTES", "4320"))
@@ -16,3 +40,57 @@ DEFAULT_USER_ROLES: Tuple[str, ...] = tuple(
     if role.strip()
 ) or ("clinician",)
 ALGORITHM = "HS256"
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "100"))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1.0"))
+AUDIT_QUEUE_MAX_SIZE = int(os.getenv("AUDIT_QUEUE_MAX_SIZE", "10000"))
+# "async" returns as soon as an event is queued; "sync" waits for every event to be flushed.
+AUDIT_DURABILITY = os.getenv("AUDIT_DURABILITY", "async").strip().lower()
+# Events/actions that always wait for their batch to be written, whatever the durability mode.
+AUDIT_SYNC_EVENTS: Tuple[str, ...] = tuple(
+    event.strip()
+    for event in os.getenv("AUDIT_SYNC_EVENTS", "password_change").split(",")
+    if event.strip()
+)
+# Audit partitions older than this many months are archived or dropped; 0 keeps them forever.
+AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", "0"))
+# When set, expired audit partitions are moved into this database instead of being dropped.
+AUDIT_ARCHIVE_DB_NAME = os.getenv("AUDIT_ARCHIVE_DB_NAME", "")
+VITALS_INGEST_BATCH_SIZE = int(os.getenv("VITALS_INGEST_BATCH_SIZE", "1000"))
+# "local" delivers care events within one worker; "mongo" fans them out to every worker
+# through a capped collection.
+EVENT_BUS = os.getenv("EVENT_BUS", "local").strip().lower()
+EVENT_BUS_CAPPED_SIZE_BYTES = int(os.getenv("EVENT_BUS_CAPPED_SIZE_BYTES", str(16 * 1024 * 1024)))
+EVENT_SUBSCRIBER_QUEUE_SIZE = int(os.getenv("EVENT_SUBSCRIBER_QUEUE_SIZE", "100"))
+# Sampling profiler for requests sent with "X-Profile: 1" by an admin.
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "30"))
+PROFILER_MAX_STORED = int(os.getenv("PROFILER_MAX_STORED", "50"))
+# Commands slower than this are logged with their redacted shape; 0 disables the slow-query log.
+MONGODB_SLOW_QUERY_MS = float(os.getenv("MONGODB_SLOW_QUERY_MS", "100"))
+# Verbosity of the background explain run for slow reads ("queryPlanner", "executionStats") or "off".
+MONGODB_SLOW_QUERY_EXPLAIN = os.getenv("MONGODB_SLOW_QUERY_EXPLAIN", "queryPlanner").strip()
+# A shape is explained again at most this often.
+MONGODB_SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS = float(os.getenv("MONGODB_SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS", "600"))
+MONGODB_SLOW_QUERY_MAX_SHAPES = int(os.getenv("MONGODB_SLOW_QUERY_MAX_SHAPES", "500"))
+# Span exporters: "ring" keeps recent traces in memory for /admin/traces, "file" appends
+# OTLP-style JSON lines to TRACING_FILE; comma-separate to use both, "off" disables tracing.
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "ring").strip().lower()
+TRACING_FILE = os.getenv("TRACING_FILE", "traces.jsonl")
+TRACING_RING_SIZE = int(os.getenv("TRACING_RING_SIZE", "200"))
+# Share of new traces recorded; an incoming traceparent's sampled flag takes precedence.
+TRACING_SAMPLE_RATIO = float(os.getenv("TRACING_SAMPLE_RATIO", "1.0"))
+# Event-loop watchdog: a heartbeat measures loop lag every LOOP_LAG_INTERVAL_SECONDS and the
+# loop thread's stack is captured when it has been blocked for LOOP_BLOCK_THRESHOLD_SECONDS.
+LOOP_LAG_INTERVAL_SECONDS = float(os.getenv("LOOP_LAG_INTERVAL_SECONDS", "0.25"))
+LOOP_BLOCK_THRESHOLD_SECONDS = float(os.getenv("LOOP_BLOCK_THRESHOLD_SECONDS", "0.2"))
+# asyncio debug mode: logs every callback running longer than the block threshold, with its
+# coroutine's location. Adds overhead to every callback; meant for staging or short sessions.
+LOOP_DEBUG = os.getenv("LOOP_DEBUG", "false").strip().lower() in ("1", "true", "yes")
+# Frames recorded per allocation while tracemalloc runs (started from /admin/memory).
+TRACEMALLOC_FRAMES = int(os.getenv("TRACEMALLOC_FRAMES", "10"))
+TRACEMALLOC_MAX_SNAPSHOTS = int(os.getenv("TRACEMALLOC_MAX_SNAPSHOTS", "10"))
+# Synthetic capacity-testing dataset (``python -m backend.seed_db --synthetic``): its id
+# formats and first day, shared with the load generator so its requests hit seeded documents.
+SYNTHETIC_PATIENT_ID_FORMAT = "P-{:06d}"
+SYNTHETIC_DOCTOR_ID_FORMAT = "D-{:05d}"
+SYNTHETIC_START_DATE = date(2025, 4, 2)
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pymongo import IndexModel
+
+IndexKey = Tuple[str, int]
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """An index a repository's queries rely on, declared next to those queries."""
+
+    collection: str
+    keys: Tuple[IndexKey, ...]
+    unique: bool = False
+    sparse: bool = False
+    partial_filter: Optional[Dict[str, Any]] = field(default=None, hash=False, compare=False)
+    reason: str = field(default="", hash=False, compare=False)
+
+    @property
+    def constraint(self) -> bool:
+        """Unique indexes enforce correctness, so they must exist before requests are served."""
+
+        return self.unique
+
+    @property
+    def name(self) -> str:
+        # Same naming as pymongo, so indexes created earlier by ``create_index`` are reused.
+        return "_".join(f"{key}_{direction}" for key, direction in self.keys)
+
+    def model(self) -> IndexModel:
+        options: Dict[str, Any] = {"name": self.name}
+        if self.unique:
+            options["unique"] = True
+        if self.sparse:
+            options["sparse"] = True
+        if self.partial_filter:
+            options["partialFilterExpression"] = self.partial_filter
+        return IndexModel(list(self.keys), **options)
+
+
+def index(collection: str, *keys: IndexKey, reason: str = "", **options: Any) -> IndexSpec:
+    return IndexSpec(collection, tuple(keys), reason=reason, **options)
+
+
+def by_collection(specs: Iterable[IndexSpec]) -> Dict[str, List[IndexSpec]]:
+    grouped: Dict[str, List[IndexSpec]] = {}
+    for spec in specs:
+        grouped.setdefault(spec.collection, []).append(spec)
+    return grouped
+
+
+def registry_fingerprint(specs: Sequence[IndexSpec]) -> str:
+    """Short digest of the declared indexes; changes whenever the registry does."""
+
+    described = sorted(
+        f"{spec.collection}:{spec.name}:{spec.unique}:{spec.sparse}:{sorted((spec.partial_filter or {}).items())}"
+        for spec in specs
+    )
+    return hashlib.sha256("|".join(described).encode("utf-8")).hexdigest()[:16]
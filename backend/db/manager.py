@@ -1,13 +1,89 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Any, Dict, Optional, Union
 
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+
+from backend.db.monitoring import pool_monitor
+from backend.observability.mongo import command_metrics
 
 try:  # pragma: no cover - support running as module or package
-    from config import MONGODB_DB_NAME, MONGODB_URL
+    from config import (
+        MONGODB_COMPRESSORS,
+        MONGODB_DB_NAME,
+        MONGODB_MAX_IDLE_TIME_MS,
+        MONGODB_MAX_POOL_SIZE,
+        MONGODB_MAX_STALENESS_SECONDS,
+        MONGODB_MIN_POOL_SIZE,
+        MONGODB_READ_PREFERENCES,
+        MONGODB_URL,
+        MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+    )
 except ImportError:  # pragma: no cover - fallback for package imports
-    from backend.config import MONGODB_DB_NAME, MONGODB_URL  # type: ignore
+    from backend.config import (  # type: ignore
+        MONGODB_COMPRESSORS,
+        MONGODB_DB_NAME,
+        MONGODB_MAX_IDLE_TIME_MS,
+        MONGODB_MAX_POOL_SIZE,
+        MONGODB_MAX_STALENESS_SECONDS,
+        MONGODB_MIN_POOL_SIZE,
+        MONGODB_READ_PREFERENCES,
+        MONGODB_URL,
+        MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+    )
+
+ReadPreference = Union[Primary, PrimaryPreferred, Secondary, SecondaryPreferred, Nearest]
+
+# The driver rejects a smaller maxStalenessSeconds, but only when it selects a server.
+MIN_MAX_STALENESS_SECONDS = 90
+
+_READ_MODES = {
+    "primary": Primary,
+    "primarypreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondarypreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+def client_options() -> Dict[str, Any]:
+    options: Dict[str, Any] = {
+        "maxPoolSize": MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": MONGODB_MIN_POOL_SIZE,
+        "event_listeners": [pool_monitor, command_metrics],
+    }
+    if MONGODB_MAX_IDLE_TIME_MS > 0:
+        options["maxIdleTimeMS"] = MONGODB_MAX_IDLE_TIME_MS
+    if MONGODB_WAIT_QUEUE_TIMEOUT_MS > 0:
+        options["waitQueueTimeoutMS"] = MONGODB_WAIT_QUEUE_TIMEOUT_MS
+    if MONGODB_COMPRESSORS:
+        options["compressors"] = ",".join(MONGODB_COMPRESSORS)
+    return options
+
+
+def read_preference(group: str) -> ReadPreference:
+    """Read preference configured for ``group`` in ``MONGODB_READ_PREFERENCES``.
+
+    Secondary reads are bounded by ``MONGODB_MAX_STALENESS_SECONDS`` so a lagging
+    member is skipped instead of serving very old history.
+    """
+
+    mode = MONGODB_READ_PREFERENCES.get(group, "primary").replace("_", "").lower()
+    if mode not in _READ_MODES:
+        raise ValueError(f"Unknown read preference {MONGODB_READ_PREFERENCES[group]!r} for {group!r}")
+    if mode == "primary":
+        return Primary()
+    return _READ_MODES[mode](max_staleness=MONGODB_MAX_STALENESS_SECONDS if MONGODB_MAX_STALENESS_SECONDS > 0 else -1)
+
+
+def validate_read_preferences() -> None:
+    """Raise ``ValueError`` for read preference settings that would only fail at query time."""
+
+    if 0 < MONGODB_MAX_STALENESS_SECONDS < MIN_MAX_STALENESS_SECONDS:
+        raise ValueError(f"MONGODB_MAX_STALENESS_SECONDS must be at least {MIN_MAX_STALENESS_SECONDS} or 0")
+    for group in MONGODB_READ_PREFERENCES:
+        read_preference(group)
 
 
 class MongoConnectionManager:
@@ -25,7 +101,8 @@ class MongoConnectionManager:
 
     async def connect(self) -> AsyncIOMotorDatabase:
         if self._client is None:
-            self._client = AsyncIOMotorClient(MONGODB_URL)
+            validate_read_preferences()
+            self._client = AsyncIOMotorClient(MONGODB_URL, **client_options())
             self._database = self._client[MONGODB_DB_NAME]
             await self._database.command("ping")
         return self.database
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List, Sequence
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+from backend.db.indexes import IndexSpec, by_collection, registry_fingerprint
+from backend.services.common import current_timestamp
+
+LOGGER = logging.getLogger(__name__)
+
+MIGRATIONS_COLLECTION = "migrations"
+
+
+async def run_once(
+    database: AsyncIOMotorDatabase,
+    name: str,
+    operation: Callable[[], Awaitable[object]],
+    *,
+    lease_seconds: int = 300,
+) -> bool:
+    """Run ``operation`` once per deployment, coordinated through a marker document.
+
+    The first worker to insert the marker owns the migration; everyone else skips it.
+    A marker left in ``running`` state past its lease (for example by a crashed worker)
+    or in ``failed`` state may be claimed again. Returns ``True`` when this worker ran it.
+    """
+
+    collection = database[MIGRATIONS_COLLECTION]
+    now = current_timestamp()
+    lease_expires_at = now + timedelta(seconds=lease_seconds)
+    try:
+        await collection.insert_one(
+            {
+                "_id": name,
+                "status": "running",
+                "started_at": now,
+                "lease_expires_at": lease_expires_at,
+            }
+        )
+    except DuplicateKeyError:
+        claimed = await collection.find_one_and_update(
+            {
+                "_id": name,
+                "$or": [
+                    {"status": "failed"},
+                    {"status": "running", "lease_expires_at": {"$lt": now}},
+                ],
+            },
+            {"$set": {"status": "running", "started_at": now, "lease_expires_at": lease_expires_at}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if claimed is None:
+            return False
+
+    try:
+        await operation()
+    except BaseException:  # includes cancellation at shutdown, so the marker is not held until the lease expires
+        await collection.update_one(
+            {"_id": name},
+            {"$set": {"status": "failed", "failed_at": current_timestamp()}},
+        )
+        LOGGER.exception("Migration %s failed", name)
+        raise
+
+    await collection.update_one(
+        {"_id": name},
+        {"$set": {"status": "done", "completed_at": current_timestamp()}, "$unset": {"lease_expires_at": ""}},
+    )
+    LOGGER.info("Migration %s completed", name)
+    return True
+
+
+async def ensure_indexes(database: AsyncIOMotorDatabase, specs: Sequence[IndexSpec]) -> bool:
+    """Build the declared indexes once per registry version across all workers.
+
+    MongoDB builds indexes without blocking reads or writes on the collection, and
+    ``createIndexes`` is a no-op for indexes that already exist, so a rerun after a
+    failure only builds what is still missing.
+    """
+
+    async def build() -> None:
+        for collection, collection_specs in sorted(by_collection(specs).items()):
+            await database[collection].create_indexes([spec.model() for spec in collection_specs])
+            LOGGER.info("Ensured %d index(es) on %s", len(collection_specs), collection)
+
+    return await run_once(database, f"indexes:{registry_fingerprint(specs)}", build, lease_seconds=3600)
+
+
+async def ensure_constraints(database: AsyncIOMotorDatabase, specs: Sequence[IndexSpec]) -> None:
+    """Build the constraint (unique) indexes in the foreground, on every worker.
+
+    Code such as signup relies on ``DuplicateKeyError`` from these indexes, so serving
+    without them is not safe: any failure, for example duplicates that already violate
+    the constraint, is raised so startup fails. Existing indexes make this a no-op.
+    """
+
+    constraints = [spec for spec in specs if spec.constraint]
+    for collection, collection_specs in sorted(by_collection(constraints).items()):
+        try:
+            await database[collection].create_indexes([spec.model() for spec in collection_specs])
+        except Exception:
+            LOGGER.exception("Could not build constraint index(es) on %s", collection)
+            raise
+        LOGGER.info("Ensured %d constraint index(es) on %s", len(collection_specs), collection)
+
+
+async def index_report(database: AsyncIOMotorDatabase, specs: Sequence[IndexSpec]) -> Dict[str, List[str]]:
+    """List declared indexes that do not exist yet and indexes with no recorded use.
+
+    ``$indexStats`` counters reset when a server restarts, so ``unused`` is only
+    meaningful on a server that has been serving traffic for a while.
+    """
+
+    missing: List[str] = []
+    unused: List[str] = []
+    for collection, collection_specs in sorted(by_collection(specs).items()):
+        existing = {index["name"] async for index in database[collection].list_indexes()}
+        missing.extend(f"{collection}.{spec.name}" for spec in collection_specs if spec.name not in existing)
+        try:
+            stats = [stat async for stat in database[collection].aggregate([{"$indexStats": {}}])]
+        except OperationFailure:
+            continue  # e.g. views or servers without $indexStats access
+        unused.extend(
+            f"{collection}.{stat['name']}"
+            for stat in stats
+            if stat["name"] != "_id_" and not stat.get("accesses", {}).get("ops")
+        )
+    return {"missing": missing, "unused": sorted(set(unused))}
+
+
+async def migrate_indexes(database: AsyncIOMotorDatabase, specs: Sequence[IndexSpec]) -> Dict[str, List[str]]:
+    """Startup task: build the registry's indexes, then log what is still missing or unused.
+
+    Runs in the background, so it is meant for indexes that only speed queries up;
+    constraint indexes are built by ``ensure_constraints`` before serving.
+    """
+
+    try:
+        await ensure_indexes(database, specs)
+        report = await index_report(database, specs)
+    except Exception:
+        LOGGER.exception("Index migration failed")
+        return {"missing": [], "unused": []}
+    if report["missing"]:
+        LOGGER.warning("Missing indexes: %s", ", ".join(report["missing"]))
+    if report["unused"]:
+        LOGGER.info("Indexes without recorded use: %s", ", ".join(report["unused"]))
+    return report
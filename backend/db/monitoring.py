@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Tuple
+
+from pymongo import monitoring
+
+# Upper bounds (seconds) of the checkout wait histogram buckets; the last bucket is +Inf.
+CHECKOUT_WAIT_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Measures how long operations wait to check a connection out of the pool.
+
+    Motor runs each operation on an executor thread, and the driver reports the start
+    and end of a checkout on that same thread, so the start time is kept per thread.
+    Callbacks arrive from many threads at once; counters are guarded by a lock.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._bucket_counts: List[int] = [0] * (len(CHECKOUT_WAIT_BUCKETS) + 1)
+        self.checkouts = 0
+        self.failures: Dict[str, int] = {}
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.checked_out = 0
+        self.pools_cleared = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            cumulative = 0
+            buckets: Dict[str, int] = {}
+            for bound, count in zip((*CHECKOUT_WAIT_BUCKETS, float("inf")), self._bucket_counts):
+                cumulative += count
+                buckets["+Inf" if bound == float("inf") else repr(bound)] = cumulative
+            return {
+                "checkouts": self.checkouts,
+                "failures": dict(self.failures),
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+                "wait_seconds_buckets": buckets,
+                "checked_out": self.checked_out,
+                "pools_cleared": self.pools_cleared,
+            }
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        waited = self._waited()
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            self._bucket_counts[bisect_left(CHECKOUT_WAIT_BUCKETS, waited)] += 1
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        self._waited()
+        with self._lock:
+            self.failures[str(event.reason)] = self.failures.get(str(event.reason), 0) + 1
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        with self._lock:
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        with self._lock:
+            self.pools_cleared += 1
+
+    def _waited(self) -> float:
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        return time.perf_counter() - started if started is not None else 0.0
+
+    # The remaining pool events carry nothing we report.
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        return None
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        return None
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        return None
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        return None
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        return None
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        return None
+
+
+pool_monitor = PoolMonitor()
@@ -116,6 +116,7 @@ class Contact(BaseModel):
 class PublishPayload(BaseModel):
     plan_id: str
     doctor_id: str
+    patient_id: Optional[str] = None
     timeline: List[Dict[str, Any]]
     crew: List[Dict[str, Any]]
     tasks: List[Dict[str, Any]]
@@ -189,6 +190,58 @@ class TaskUpdatePayload(BaseModel):
     performed_by: Optional[str] = None
 
 
+PatchOp = Literal["set", "insert", "remove", "move"]
+
+
+def _check_patch_operation(
+    op: str,
+    target: Optional[str],
+    changes: Optional[BaseModel],
+    item: Optional[BaseModel],
+    position: Optional[int],
+) -> None:
+    if op == "insert":
+        if item is None:
+            raise ValueError("insert requires the item to insert")
+        return
+    if not target:
+        raise ValueError(f"{op} requires the target identifier")
+    if op == "set" and (changes is None or not changes.model_dump(exclude_none=True)):
+        raise ValueError("set requires at least one field to change")
+    if op == "move" and position is None:
+        raise ValueError("move requires a position")
+
+
+class TaskChanges(BaseModel):
+    status: Optional[Literal["pending", "in_progress", "completed"]] = None
+    note: Optional[str] = None
+    time: Optional[str] = None
+    priority: Optional[str] = None
+
+
+class TaskPatchOperation(BaseModel):
+    op: PatchOp
+    label: Optional[str] = None
+    changes: Optional[TaskChanges] = None
+    task: Optional[TaskEntry] = None
+    position: Optional[int] = Field(default=None, ge=0)
+
+    @model_validator(mode="after")
+    def ensure_operation_fields(self):
+        _check_patch_operation(self.op, self.label, self.changes, self.task, self.position)
+        return self
+
+
+class TaskPatchPayload(BaseModel):
+    patient_id: str
+    scope: Literal["preop", "surgery", "postop"]
+    staff_name: str
+    staff_role: Literal["doctor", "nurse"]
+    expected_version: int = Field(ge=0)
+    operations: List[TaskPatchOperation] = Field(min_length=1)
+    performed_by: Optional[str] = None
+
+
 class CrewUpdatePayload(BaseModel):
     patient_id: str
     doctors: List[str]
@@ -210,6 +263,33 @@ class TimelineUpdatePayload(BaseModel):
     performed_by: Optional[str] = None
 
 
+class TimelineStepChanges(BaseModel):
+    title: Optional[str] = None
+    time: Optional[str] = None
+    owner: Optional[str] = None
+    status: Optional[Literal["done", "active", "upcoming"]] = None
+
+
+class TimelinePatchOperation(BaseModel):
+    op: PatchOp
+    step_id: Optional[str] = None
+    changes: Optional[TimelineStepChanges] = None
+    step: Optional[TimelineStep] = None
+    position: Optional[int] = Field(default=None, ge=0)
+
+    @model_validator(mode="after")
+    def ensure_operation_fields(self):
+        _check_patch_operation(self.op, self.step_id, self.changes, self.step, self.position)
+        return self
+
+
+class TimelinePatchPayload(BaseModel):
+    patient_id: str
+    expected_version: int = Field(ge=0)
+    operations: List[TimelinePatchOperation] = Field(min_length=1)
+    performed_by: Optional[str] = None
+
+
 class VitalsPayload(BaseModel):
     patient_id: str
     heart_rate: str
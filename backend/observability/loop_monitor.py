@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from backend.config import LOOP_BLOCK_THRESHOLD_SECONDS, LOOP_DEBUG, LOOP_LAG_INTERVAL_SECONDS
+from backend.observability.metrics import EVENT_LOOP_LAG_SECONDS, EVENT_LOOP_STALLS
+from backend.observability.tasks import running_task
+
+LOGGER = logging.getLogger(__name__)
+
+MAX_STACK_FRAMES = 30
+
+class LoopMonitor:
+    """Measures event-loop lag and captures what is blocking the loop.
+
+    A heartbeat task sleeps for ``interval`` seconds and records how late it woke up.
+    A watchdog thread notices when the heartbeat has been silent for ``threshold``
+    seconds past its due time and captures the loop thread's stack and running task
+    while the blocking code is still on it. One capture is taken per stall.
+    """
+
+    def __init__(
+        self,
+        *,
+        interval: float = LOOP_LAG_INTERVAL_SECONDS,
+        threshold: float = LOOP_BLOCK_THRESHOLD_SECONDS,
+        debug: bool = LOOP_DEBUG,
+        max_stalls: int = 50,
+    ) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.debug = debug
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._lock = threading.Lock()
+        self._stalls: Deque[Dict[str, Any]] = deque(maxlen=max_stalls)
+        self._stall: Optional[Dict[str, Any]] = None
+        self._last_beat = time.monotonic()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread = 0
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        loop = asyncio.get_event_loop()
+        if self.debug:
+            # Debug mode logs each callback slower than this with its coroutine's location,
+            # and records where every task was created.
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.threshold
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = loop.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="event-loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stalls = list(reversed(self._stalls))
+        return {
+            "interval_seconds": self.interval,
+            "threshold_seconds": self.threshold,
+            "debug": self.debug,
+            "last_lag_ms": round(self.last_lag * 1000, 3),
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+            "stalls": stalls,
+        }
+
+    async def _heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            due = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - due, 0.0)
+            EVENT_LOOP_LAG_SECONDS.observe(lag)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            with self._lock:
+                self._last_beat = time.monotonic()
+                stall, self._stall = self._stall, None
+                if stall is not None:
+                    # The heartbeat's lag is how long the loop was blocked in total.
+                    stall["blocked_ms"] = round(lag * 1000, 3)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.threshold / 2):
+            with self._lock:
+                silent = time.monotonic() - self._last_beat - self.interval
+                if silent < self.threshold or self._stall is not None:
+                    continue
+                stall = self._stall = self._capture(silent)
+                self._stalls.append(stall)
+            EVENT_LOOP_STALLS.inc()
+            LOGGER.warning(
+                "Event loop blocked for %.0f ms by %s:\n%s",
+                silent * 1000,
+                stall["coroutine"] or stall["task"] or "a callback",
+                "".join(stall["stack"]),
+            )
+
+    def _capture(self, silent: float) -> Dict[str, Any]:
+        task = running_task(self._loop) if self._loop is not None else None
+        coroutine = task.get_coro() if task is not None else None
+        frame = sys._current_frames().get(self._loop_thread)
+        stack: List[str] = traceback.format_stack(frame)[-MAX_STACK_FRAMES:] if frame is not None else []
+        return {
+            "detected_at": datetime.utcnow(),
+            "blocked_ms_at_capture": round(silent * 1000, 3),
+            "blocked_ms": None,
+            "task": task.get_name() if task is not None else None,
+            "coroutine": getattr(coroutine, "__qualname__", None),
+            "stack": stack,
+        }
+
+
+loop_monitor = LoopMonitor()
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+import weakref
+from collections import OrderedDict
+from datetime import datetime
+from types import BuiltinFunctionType, FunctionType, ModuleType
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from backend.config import TRACEMALLOC_FRAMES, TRACEMALLOC_MAX_SNAPSHOTS
+
+try:  # pragma: no cover - not available on Windows
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # type: ignore[assignment]
+
+# Shared by everything, so never attributed to one cache.
+_SKIPPED_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType)
+# Bounds the walk over one cache; anything beyond is reported as truncated.
+MAX_SIZED_OBJECTS = 2_000_000
+
+_caches: "weakref.WeakSet[Any]" = weakref.WeakSet()
+_caches_lock = threading.Lock()
+
+
+def register_cache(cache: Any) -> None:
+    """Track ``cache`` (anything with ``name`` and ``memory_items()``) for memory reports."""
+
+    with _caches_lock:
+        _caches.add(cache)
+
+
+def registered_caches() -> List[Any]:
+    with _caches_lock:
+        return sorted(_caches, key=lambda cache: cache.name)
+
+
+def deep_size(roots: Iterable[Any], limit: int = MAX_SIZED_OBJECTS) -> Tuple[int, bool]:
+    """Approximate bytes reachable from ``roots``, counting shared objects once.
+
+    Follows containers, instance ``__dict__`` and ``__slots__`` (which covers pydantic
+    models). Returns the size and whether ``limit`` objects were reached first.
+    """
+
+    seen = set()
+    stack = list(roots)
+    size = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SKIPPED_TYPES):
+            continue
+        if len(seen) >= limit:
+            return size, True
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, (str, bytes, bytearray, int, float, bool)) or obj is None:
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        else:
+            attributes = getattr(obj, "__dict__", None)
+            if attributes is not None:
+                stack.append(attributes)
+            for slot in getattr(type(obj), "__slots__", ()):
+                value = getattr(obj, slot, None)
+                if value is not None:
+                    stack.append(value)
+    return size, False
+
+
+def cache_report(items_by_cache: Dict[str, List[Tuple[Any, Any, float]]]) -> List[Dict[str, Any]]:
+    """Entry counts and deep size per cache name, from ``(key, value, expires_at)`` items.
+
+    Entries are copied on the event loop first, so the walk itself can run on a thread.
+    """
+
+    now = time.monotonic()
+    report: List[Dict[str, Any]] = []
+    for name, items in sorted(items_by_cache.items()):
+        size, truncated = deep_size([[(key, value) for key, value, _ in items]])
+        report.append(
+            {
+                "name": name,
+                "entries": len(items),
+                "expired_entries": sum(1 for _, _, expires_at in items if expires_at < now),
+                "approx_bytes": size,
+                "truncated": truncated,
+            }
+        )
+    return report
+
+
+def cache_items() -> Dict[str, List[Tuple[Any, Any, float]]]:
+    items: Dict[str, List[Tuple[Any, Any, float]]] = {}
+    for cache in registered_caches():
+        items.setdefault(cache.name, []).extend(cache.memory_items())
+    return items
+
+
+def process_memory() -> Dict[str, Any]:
+    report: Dict[str, Any] = {}
+    if resource is None:  # pragma: no cover
+        return report
+    # ru_maxrss is in kilobytes on Linux.
+    report["max_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            report["rss_bytes"] = int(statm.read().split()[1]) * resource.getpagesize()
+    except (OSError, IndexError, ValueError):  # pragma: no cover - no procfs
+        pass
+    return report
+
+
+class AllocationTracker:
+    """Named ``tracemalloc`` snapshots that can be compared with each other.
+
+    Tracing costs memory and CPU on every allocation, so it only runs between
+    ``start`` and ``stop``; at most ``max_snapshots`` are kept, oldest dropped first.
+    """
+
+    def __init__(self, frames: int = TRACEMALLOC_FRAMES, max_snapshots: int = TRACEMALLOC_MAX_SNAPSHOTS) -> None:
+        self.frames = frames
+        self.max_snapshots = max(2, max_snapshots)
+        self._snapshots: "OrderedDict[str, Tuple[datetime, tracemalloc.Snapshot]]" = OrderedDict()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: Optional[int] = None) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames or self.frames)
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self._snapshots.clear()
+
+    def status(self) -> Dict[str, Any]:
+        status: Dict[str, Any] = {
+            "tracing": self.tracing,
+            "snapshots": [
+                {"id": snapshot_id, "taken_at": taken_at} for snapshot_id, (taken_at, _) in self._snapshots.items()
+            ],
+        }
+        if self.tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            status.update(
+                frames=tracemalloc.get_traceback_limit(),
+                traced_bytes=current,
+                traced_peak_bytes=peak,
+                overhead_bytes=tracemalloc.get_tracemalloc_memory(),
+            )
+        return status
+
+    def take_snapshot(self) -> str:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing")
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            )
+        )
+        snapshot_id = uuid.uuid4().hex[:12]
+        self._snapshots[snapshot_id] = (datetime.utcnow(), snapshot)
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def top(self, snapshot_id: str, limit: int = 20, group_by: str = "lineno") -> List[Dict[str, Any]]:
+        snapshot = self._get(snapshot_id)
+        return [
+            {"site": self._site(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+            for stat in snapshot.statistics(group_by)[:limit]
+        ]
+
+    def diff(self, first_id: str, second_id: str, limit: int = 20, group_by: str = "lineno") -> List[Dict[str, Any]]:
+        """Allocation sites that grew the most from ``first_id`` to ``second_id``."""
+
+        first, second = self._get(first_id), self._get(second_id)
+        return [
+            {
+                "site": self._site(stat.traceback),
+                "size_diff_bytes": stat.size_diff,
+                "size_bytes": stat.size,
+                "count_diff": stat.count_diff,
+                "count": stat.count,
+            }
+            for stat in second.compare_to(first, group_by)[:limit]
+        ]
+
+    def _get(self, snapshot_id: str) -> tracemalloc.Snapshot:
+        entry = self._snapshots.get(snapshot_id)
+        if entry is None:
+            raise KeyError(snapshot_id)
+        return entry[1]
+
+    @staticmethod
+    def _site(trace: tracemalloc.Traceback) -> List[str]:
+        # Most recent call first, as in tracemalloc's own output.
+        return [f"{frame.filename}:{frame.lineno}" for frame in reversed(trace)]
+
+
+allocation_tracker = AllocationTracker()
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.observability.metrics import HTTP_REQUEST_SECONDS
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RouteTemplates:
+    """Maps the endpoint the router matched to its path template (``/tasks/{patient_id}``)."""
+
+    def __init__(self) -> None:
+        self._templates: Dict[Callable[..., Any], str] = {}
+
+    def __call__(self, scope: Scope) -> str:
+        # The router stores the matched endpoint in the shared scope while dispatching.
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        template = self._templates.get(endpoint)
+        if template is None:
+            for route in getattr(scope.get("app"), "routes", ()):
+                if getattr(route, "endpoint", None) is not None:
+                    self._templates.setdefault(route.endpoint, route.path)
+            template = self._templates.setdefault(endpoint, UNMATCHED_ROUTE)
+        return template
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request latency per route template.
+
+    Routes are labelled by their path template (``/tasks/{patient_id}``), never the raw
+    path, so the number of series stays bounded. Unlike ``BaseHTTPMiddleware`` it does
+    not wrap the response in an extra task and stream.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._route = RouteTemplates()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                self._route(scope),
+                str(status_code),
+            )
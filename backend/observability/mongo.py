@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import threading
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, TypeVar
+
+from pymongo import monitoring
+
+from backend.db.monitoring import pool_monitor
+from backend.observability.metrics import MONGO_COMMAND_FAILURES, MONGO_COMMAND_SECONDS, REGISTRY
+from backend.observability.slow_queries import SlowQueryLog, slow_query_log
+from backend.observability.tracing import traced, traced_generator
+
+# "<Repository>.<method>" currently issuing commands. Motor copies the context into
+# its executor threads, so the command listener sees the value of the calling task.
+current_operation: ContextVar[str] = ContextVar("current_operation", default="unknown")
+
+T = TypeVar("T", bound=type)
+
+_SPAN_ATTRIBUTES = {"db.system": "mongodb"}
+
+
+def _wrap_coroutine(label: str, method: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(method)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        token = current_operation.set(label)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            current_operation.reset(token)
+
+    return wrapper
+
+
+def _wrap_async_generator(label: str, method: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(method)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        generator = method(*args, **kwargs)
+        try:
+            while True:
+                # Set around each step only: the generator is suspended in between.
+                token = current_operation.set(label)
+                try:
+                    item = await generator.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    current_operation.reset(token)
+                yield item
+        finally:
+            await generator.aclose()
+
+    return wrapper
+
+
+def instrument_repository(cls: T) -> T:
+    """Label the Mongo commands issued by each public async method of ``cls``.
+
+    Each call is also recorded as a span, so repository calls show up in traces.
+    """
+
+    for name, member in list(vars(cls).items()):
+        if name.startswith("_"):
+            continue
+        label = f"{cls.__name__}.{name}"
+        if inspect.iscoroutinefunction(member):
+            setattr(cls, name, traced(label, _SPAN_ATTRIBUTES)(_wrap_coroutine(label, member)))
+        elif inspect.isasyncgenfunction(member):
+            setattr(cls, name, traced_generator(label, _SPAN_ATTRIBUTES)(_wrap_async_generator(label, member)))
+    return cls
+
+
+def command_collection(command_name: str, command: Dict[str, Any]) -> str:
+    if command_name == "getMore":
+        return str(command.get("collection", ""))
+    value = command.get(command_name)
+    return value if isinstance(value, str) else ""
+
+
+class _Inflight(NamedTuple):
+    operation: str
+    collection: str
+    command: Optional[Dict[str, Any]]
+    database_name: str
+
+
+_UNKNOWN = _Inflight("unknown", "", None, "")
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Times every command and attributes it to the repository method that issued it.
+
+    Commands slower than the slow-query threshold are also handed to ``slow_queries``
+    together with the command document, which is only kept while the command runs.
+    """
+
+    def __init__(self, slow_queries: Optional[SlowQueryLog] = None) -> None:
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple[int, Any], _Inflight] = {}
+        self._slow_queries = slow_queries if slow_queries is not None and slow_queries.enabled else None
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        inflight = _Inflight(
+            current_operation.get(),
+            command_collection(event.command_name, event.command),
+            event.command if self._slow_queries is not None else None,
+            event.database_name,
+        )
+        with self._lock:
+            self._inflight[(event.request_id, event.connection_id)] = inflight
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        inflight = self._finish(event)
+        MONGO_COMMAND_SECONDS.observe(
+            event.duration_micros / 1_000_000, inflight.operation, inflight.collection, event.command_name
+        )
+        slow_queries = self._slow_queries
+        if slow_queries is not None and inflight.command is not None:
+            duration_ms = event.duration_micros / 1000
+            if duration_ms >= slow_queries.threshold_ms:
+                slow_queries.record(
+                    inflight.operation,
+                    inflight.collection,
+                    event.command_name,
+                    inflight.command,
+                    inflight.database_name,
+                    duration_ms,
+                )
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        inflight = self._finish(event)
+        MONGO_COMMAND_SECONDS.observe(
+            event.duration_micros / 1_000_000, inflight.operation, inflight.collection, event.command_name
+        )
+        MONGO_COMMAND_FAILURES.inc(inflight.operation, inflight.collection, event.command_name)
+
+    def _finish(self, event: Any) -> _Inflight:
+        with self._lock:
+            return self._inflight.pop((event.request_id, event.connection_id), _UNKNOWN)
+
+
+def pool_metric_lines() -> Iterable[str]:
+    snapshot = pool_monitor.snapshot()
+    name = "mongo_pool_checkout_wait_seconds"
+    lines: List[str] = [
+        f"# HELP {name} Time spent waiting to check a connection out of the pool.",
+        f"# TYPE {name} histogram",
+    ]
+    for bound, count in snapshot["wait_seconds_buckets"].items():
+        lines.append(f'{name}_bucket{{le="{bound}"}} {count}')
+    lines.append(f"{name}_sum {snapshot['wait_seconds_total']}")
+    lines.append(f"{name}_count {snapshot['checkouts']}")
+    lines.append("# HELP mongo_pool_checked_out_connections Connections currently checked out.")
+    lines.append("# TYPE mongo_pool_checked_out_connections gauge")
+    lines.append(f"mongo_pool_checked_out_connections {snapshot['checked_out']}")
+    lines.append("# HELP mongo_pool_checkout_failures_total Failed connection checkouts by reason.")
+    lines.append("# TYPE mongo_pool_checkout_failures_total counter")
+    for reason, count in sorted(snapshot["failures"].items()):
+        lines.append(f'mongo_pool_checkout_failures_total{{reason="{reason}"}} {count}')
+    return lines
+
+
+command_metrics = CommandMetrics(slow_query_log)
+REGISTRY.register_collector(pool_metric_lines)
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import FrameType
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from jose import JWTError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.config import PROFILER_INTERVAL_MS, PROFILER_MAX_SECONDS, PROFILER_MAX_STORED
+from backend.observability.tasks import running_task, task_attribution_available
+from backend.security import _normalize_roles, decode_access_token, session_is_active
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+PROFILE_ROLES = ("admin",)
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+@dataclass
+class Profile:
+    id: str
+    method: str
+    path: str
+    started_at: datetime
+    interval_seconds: float
+    duration_seconds: float = 0.0
+    user_id: Optional[str] = None
+    # Collapsed stack -> sampled microseconds, rooted at "cpu" or "await".
+    stacks: Counter = field(default_factory=Counter)
+
+    def summary(self) -> Dict[str, Any]:
+        cpu = sum(micros for stack, micros in self.stacks.items() if stack.startswith("cpu;"))
+        waiting = sum(self.stacks.values()) - cpu
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at,
+            "duration_seconds": round(self.duration_seconds, 6),
+            "interval_seconds": self.interval_seconds,
+            "user_id": self.user_id,
+            "sampled_seconds": {"cpu": cpu / 1_000_000, "await": waiting / 1_000_000},
+        }
+
+    def collapsed(self, kind: Optional[str] = None) -> str:
+        """Brendan Gregg's collapsed format, one ``frame;frame;... microseconds`` line per stack."""
+
+        prefix = f"{kind};" if kind else ""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()) if stack.startswith(prefix)
+        )
+
+
+class ProfileStore:
+    """Keeps the most recent profiles of this worker; the oldest are dropped first."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._profiles: "OrderedDict[str, Profile]" = OrderedDict()
+
+    def add(self, profile: Profile) -> None:
+        self._profiles[profile.id] = profile
+        while len(self._profiles) > self.capacity:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [profile.summary() for profile in reversed(self._profiles.values())]
+
+
+class TaskSampler:
+    """Samples one asyncio task from a background thread at a fixed interval.
+
+    When the task is the one running on the loop thread, the sample is that thread's
+    Python stack (``cpu``). Otherwise the task is suspended and the sample is its chain
+    of awaiting coroutines, ending with what the innermost one waits on (``await``).
+    Samples are only taken while the sampler runs, so requests without the flag pay
+    nothing.
+    """
+
+    def __init__(self, task: asyncio.Task, interval: float, max_seconds: float) -> None:
+        self.task = task
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.stacks: Counter = Counter()
+        self._loop = task.get_loop()
+        self._loop_thread = threading.get_ident()
+        self._root_code = task.get_coro().cr_code  # type: ignore[union-attr]
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        previous = time.perf_counter()
+        deadline = previous + self.max_seconds
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            if now > deadline:
+                break
+            self.sample(now - previous)
+            previous = now
+
+    def sample(self, elapsed: float) -> None:
+        # The sampler needs the GIL to wake up, so it runs late while the loop is busy;
+        # weighting each sample by the time since the previous one keeps CPU time honest.
+        if self._is_running():
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                return
+            stack = ["cpu", *self._running_frames(frame)]
+        else:
+            stack = ["await", *self._awaiting_frames()]
+        self.stacks[";".join(stack)] += max(int(elapsed * 1_000_000), 1)
+
+    def _is_running(self) -> bool:
+        if task_attribution_available():
+            return running_task(self._loop) is self.task
+        # Without asyncio's task mapping, the task is running when its coroutine is on
+        # the loop thread's stack.
+        frame = sys._current_frames().get(self._loop_thread)
+        while frame is not None:
+            if frame.f_code is self._root_code:
+                return True
+            frame = frame.f_back
+        return False
+
+    def _running_frames(self, frame: Optional[FrameType]) -> List[str]:
+        # Innermost first; stop at the task's own coroutine so event loop frames are left out.
+        names: List[str] = []
+        while frame is not None:
+            names.append(_frame_name(frame))
+            if frame.f_code is self._root_code:
+                break
+            frame = frame.f_back
+        names.reverse()
+        return names
+
+    def _awaiting_frames(self) -> List[str]:
+        names: List[str] = []
+        awaitable: Any = self.task.get_coro()
+        while awaitable is not None:
+            frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "ag_frame", None)
+            if frame is None:
+                frame = getattr(awaitable, "gi_frame", None)
+            if frame is None:
+                # A future, task or other awaitable object; name what the stack is blocked on.
+                names.append(f"<{type(awaitable).__name__}>")
+                break
+            names.append(_frame_name(frame))
+            awaitable = (
+                getattr(awaitable, "cr_await", None)
+                or getattr(awaitable, "ag_await", None)
+                or getattr(awaitable, "gi_yieldfrom", None)
+            )
+        return names
+
+
+def _profile_token(scope: Scope) -> Optional[str]:
+    """Bearer token of a request flagged for profiling; ``None`` when not flagged."""
+
+    headers = scope["headers"]
+    if not any(name == PROFILE_HEADER and value not in (b"", b"0", b"false") for name, value in headers):
+        return None
+    for name, value in headers:
+        if name == b"authorization":
+            scheme, _, credentials = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and credentials.strip():
+                return credentials.strip()
+    return None
+
+
+async def _may_profile(scope: Scope, token_data: Dict[str, Any]) -> bool:
+    # The session and role checks of ``get_current_user``/``require_roles``, so only an
+    # admin with a live session can start the sampler or take the per-worker slot.
+    db = getattr(scope["app"].state, "db", None)
+    if db is None or not ObjectId.is_valid(token_data["sub"]):
+        return False
+    user = await db.users.find_one({"_id": ObjectId(token_data["sub"])}, {"active_sessions": 1, "roles": 1})
+    if user is None or not session_is_active(user.get("active_sessions", []), token_data["sid"]):
+        return False
+    return bool(set(_normalize_roles(user.get("roles"))).intersection(PROFILE_ROLES))
+
+
+def _profiling_user(scope: Scope) -> Optional[Dict[str, Any]]:
+    # ``get_current_user`` leaves the authenticated user on ``request.state``.
+    user = scope.get("state", {}).get("current_user")
+    if user and set(user.get("roles") or []).intersection(PROFILE_ROLES):
+        return user
+    return None
+
+
+class ProfilingMiddleware:
+    """Profiles a single request when an admin sends ``X-Profile: 1``.
+
+    The flag is only honoured for a valid access token of an admin's active session,
+    and the profile is only kept, and its id returned in ``X-Profile-Id``, when the
+    route authenticated that admin too. One request per worker is profiled at a time;
+    concurrent flagged requests run unprofiled.
+    """
+
+    def __init__(self, app: ASGIApp, store: Optional[ProfileStore] = None) -> None:
+        self.app = app
+        self.store = store or profile_store
+        self._active = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _profile_token(scope)
+        if token is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            token_data = decode_access_token(token)
+        except JWTError:
+            await self.app(scope, receive, send)
+            return
+        if not await _may_profile(scope, token_data) or not self._active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            self._active.release()
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        profile = Profile(
+            id=uuid.uuid4().hex,
+            method=scope["method"],
+            path=scope["path"],
+            started_at=datetime.utcnow(),
+            interval_seconds=PROFILER_INTERVAL_MS / 1000,
+        )
+        sampler = TaskSampler(task, profile.interval_seconds, PROFILER_MAX_SECONDS)
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start" and _profiling_user(scope) is not None:
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER, profile.id.encode("ascii")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.stacks = sampler.stop()
+            profile.duration_seconds = time.perf_counter() - started
+            user = _profiling_user(scope)
+            if user is not None:
+                profile.user_id = str(user.get("_id"))
+                self.store.add(profile)
+
+
+profile_store = ProfileStore(PROFILER_MAX_STORED)
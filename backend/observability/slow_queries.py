@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from backend.config import (
+    MONGODB_SLOW_QUERY_EXPLAIN,
+    MONGODB_SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS,
+    MONGODB_SLOW_QUERY_MAX_SHAPES,
+    MONGODB_SLOW_QUERY_MS,
+)
+from backend.observability.metrics import REGISTRY, Counter
+
+LOGGER = logging.getLogger(__name__)
+
+REDACTED = "?"
+EXPLAINABLE_COMMANDS = frozenset({"find", "aggregate", "count", "distinct"})
+# Session, transaction and routing fields the driver adds; explain rejects or ignores them.
+_DRIVER_FIELDS = frozenset({"lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern"})
+_WRITE_STAGES = frozenset({"$out", "$merge"})
+_EXPLAIN_QUEUE_SIZE = 100
+_EXECUTION_COUNTERS = (
+    ("totalDocsExamined", "docs_examined"),
+    ("totalKeysExamined", "keys_examined"),
+    ("nReturned", "returned"),
+)
+
+MONGO_SLOW_COMMANDS = REGISTRY.register(
+    Counter(
+        "mongo_slow_commands_total",
+        "MongoDB commands slower than MONGODB_SLOW_QUERY_MS.",
+        ("operation", "collection", "command"),
+    )
+)
+
+ShapeKey = Tuple[str, str, str, str]
+
+
+def redact(value: Any, keep_paths: bool = False) -> Any:
+    """Replace every literal in ``value`` with ``"?"``, keeping keys and operators.
+
+    Lists collapse to their distinct element shapes, so ``{"$in": [1, 2, 3]}`` and
+    ``{"$in": [4]}`` share one shape. With ``keep_paths`` strings such as ``"$field"``
+    are kept, as they are field references in aggregation expressions.
+    """
+
+    if isinstance(value, Mapping):
+        return {key: redact(item, keep_paths) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes: List[Any] = []
+        for item in value:
+            shape = redact(item, keep_paths)
+            if shape not in shapes:
+                shapes.append(shape)
+        return shapes
+    if keep_paths and isinstance(value, str) and value.startswith("$"):
+        return value
+    return REDACTED
+
+
+def _pipeline_shape(pipeline: Any) -> List[Any]:
+    shapes: List[Any] = []
+    for stage in pipeline or []:
+        if not isinstance(stage, Mapping) or len(stage) != 1:
+            shapes.append(redact(stage))
+            continue
+        name, body = next(iter(stage.items()))
+        if name == "$match":
+            shapes.append({name: redact(body)})
+        elif name == "$sort":
+            shapes.append({name: dict(body)})
+        else:
+            shapes.append({name: redact(body, keep_paths=True)})
+    return shapes
+
+
+def command_shape(command_name: str, command: Mapping[str, Any]) -> Dict[str, Any]:
+    """The parts of ``command`` that decide its query plan, with values redacted."""
+
+    if command_name == "find":
+        shape: Dict[str, Any] = {"filter": redact(command.get("filter", {}))}
+        if command.get("sort"):
+            shape["sort"] = dict(command["sort"])
+        if command.get("projection"):
+            shape["projection"] = sorted(command["projection"])
+        return shape
+    if command_name == "aggregate":
+        return {"pipeline": _pipeline_shape(command.get("pipeline"))}
+    if command_name in ("count", "distinct"):
+        shape = {"query": redact(command.get("query", {}))}
+        if command_name == "distinct":
+            shape["key"] = command.get("key")
+        return shape
+    if command_name == "findAndModify":
+        shape = {"query": redact(command.get("query", {}))}
+        if command.get("sort"):
+            shape["sort"] = dict(command["sort"])
+        return shape
+    if command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes") or []
+        return {"q": redact([statement.get("q", {}) for statement in statements])}
+    return {}
+
+
+def explain_command(command_name: str, command: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+    """``command`` stripped of driver fields, or ``None`` when it should not be explained."""
+
+    if command_name not in EXPLAINABLE_COMMANDS:
+        return None
+    if command_name == "aggregate" and any(
+        isinstance(stage, Mapping) and _WRITE_STAGES.intersection(stage) for stage in command.get("pipeline") or []
+    ):
+        return None
+    return {key: value for key, value in command.items() if not key.startswith("$") and key not in _DRIVER_FIELDS}
+
+
+def plan_summary(explain: Mapping[str, Any]) -> Dict[str, Any]:
+    """Stages and indexes of the winning plan, plus execution counters when present."""
+
+    stages: List[str] = []
+    indexes: List[str] = []
+    counters: Dict[str, int] = {}
+
+    def walk(node: Any) -> None:
+        if isinstance(node, Mapping):
+            stage = node.get("stage")
+            if isinstance(stage, str) and stage not in stages:
+                stages.append(stage)
+            index_name = node.get("indexName")
+            if isinstance(index_name, str) and index_name not in indexes:
+                indexes.append(index_name)
+            if "executionTimeMillis" in node:
+                # executionStats (one per $cursor stage of an aggregate); absent for queryPlanner.
+                for field, name in _EXECUTION_COUNTERS:
+                    if isinstance(node.get(field), int):
+                        counters[name] = counters.get(name, 0) + node[field]
+            for key, value in node.items():
+                if key not in ("rejectedPlans", "allPlansExecution"):
+                    walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(explain)
+    return {
+        "stages": stages,
+        "indexes": indexes,
+        "collection_scan": "COLLSCAN" in stages,
+        **counters,
+        "explained_at": datetime.utcnow(),
+    }
+
+
+@dataclass
+class SlowQueryShape:
+    operation: str
+    collection: str
+    command: str
+    shape: Dict[str, Any]
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_seen: Optional[datetime] = None
+    plan: Optional[Dict[str, Any]] = None
+    explain_requested: float = float("-inf")
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "operation": self.operation,
+            "collection": self.collection,
+            "command": self.command,
+            "shape": self.shape,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "last_seen": self.last_seen,
+            "plan": self.plan,
+        }
+
+
+class SlowQueryLog:
+    """Aggregates commands slower than ``threshold_ms`` by repository method and shape.
+
+    ``record`` runs on driver threads. When explain is enabled, slow reads are handed to
+    a task on the event loop that runs ``explain`` for each shape at most once per
+    ``explain_interval`` seconds; plans doing a collection scan are logged.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold_ms: float = MONGODB_SLOW_QUERY_MS,
+        explain_verbosity: str = MONGODB_SLOW_QUERY_EXPLAIN,
+        explain_interval: float = MONGODB_SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS,
+        max_shapes: int = MONGODB_SLOW_QUERY_MAX_SHAPES,
+    ) -> None:
+        self.threshold_ms = threshold_ms
+        self.explain_verbosity = "" if explain_verbosity.lower() in ("", "off", "none") else explain_verbosity
+        self.explain_interval = explain_interval
+        self.max_shapes = max(1, max_shapes)
+        self._lock = threading.Lock()
+        self._shapes: "OrderedDict[ShapeKey, SlowQueryShape]" = OrderedDict()
+        self._database: Any = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def start(self, database: Any) -> None:
+        """Start explaining slow reads against ``database``'s client."""
+
+        if not self.enabled or not self.explain_verbosity or self._task is not None:
+            return
+        self._database = database
+        self._loop = asyncio.get_event_loop()
+        self._queue = asyncio.Queue(maxsize=_EXPLAIN_QUEUE_SIZE)
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        self._loop = None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._queue = None
+        self._database = None
+
+    def record(
+        self,
+        operation: str,
+        collection: str,
+        command_name: str,
+        command: Mapping[str, Any],
+        database_name: str,
+        duration_ms: float,
+    ) -> None:
+        shape = command_shape(command_name, command)
+        key = (operation, collection, command_name, json.dumps(shape, default=str))
+        now = time.monotonic()
+        explain = None
+        with self._lock:
+            entry = self._shapes.get(key)
+            if entry is None:
+                entry = self._shapes[key] = SlowQueryShape(operation, collection, command_name, shape)
+                while len(self._shapes) > self.max_shapes:
+                    self._shapes.popitem(last=False)
+            else:
+                self._shapes.move_to_end(key)
+            entry.count += 1
+            entry.total_ms += duration_ms
+            entry.max_ms = max(entry.max_ms, duration_ms)
+            entry.last_seen = datetime.utcnow()
+            if self._loop is not None and now - entry.explain_requested >= self.explain_interval:
+                explain = explain_command(command_name, command)
+                if explain is not None:
+                    entry.explain_requested = now
+        MONGO_SLOW_COMMANDS.inc(operation, collection, command_name)
+        LOGGER.warning(
+            "Slow MongoDB %s on %s by %s took %.1f ms; shape %s",
+            command_name,
+            collection,
+            operation,
+            duration_ms,
+            key[3],
+        )
+        if explain is not None:
+            self._schedule(key, database_name, explain)
+
+    def snapshot(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = sorted(self._shapes.values(), key=lambda entry: entry.total_ms, reverse=True)
+            return [entry.as_dict() for entry in entries[:limit]]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+
+    def _schedule(self, key: ShapeKey, database_name: str, command: Dict[str, Any]) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self._enqueue, key, database_name, command)
+        except RuntimeError:  # pragma: no cover - loop closed during shutdown
+            pass
+
+    def _enqueue(self, key: ShapeKey, database_name: str, command: Dict[str, Any]) -> None:
+        if self._queue is None:
+            return
+        try:
+            self._queue.put_nowait((key, database_name, command))
+        except asyncio.QueueFull:
+            # Dropped; the shape is explained again after the next interval.
+            pass
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            key, database_name, command = await queue.get()
+            try:
+                database = self._database
+                if database_name and database_name != database.name:
+                    database = database.client[database_name]
+                result = await database.command({"explain": command, "verbosity": self.explain_verbosity})
+            except Exception as exc:  # pragma: no cover - logged and suppressed
+                LOGGER.info("Explain of slow %s on %s failed: %s", key[2], key[1], exc)
+                continue
+            summary = plan_summary(result)
+            with self._lock:
+                entry = self._shapes.get(key)
+                if entry is not None:
+                    entry.plan = summary
+            if summary["collection_scan"]:
+                LOGGER.warning("Slow MongoDB %s on %s by %s scans the whole collection", key[2], key[1], key[0])
+
+
+slow_query_log = SlowQueryLog()
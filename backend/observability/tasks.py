@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Dict, Optional
+
+# asyncio's loop -> running task mapping. It is private, so a Python version without it
+# leaves task attribution off instead of failing at import time.
+_current_tasks: Optional[Dict[asyncio.AbstractEventLoop, asyncio.Task]] = getattr(asyncio.tasks, "_current_tasks", None)
+
+
+def task_attribution_available() -> bool:
+    return _current_tasks is not None
+
+
+def running_task(loop: asyncio.AbstractEventLoop) -> Optional[asyncio.Task]:
+    """Task ``loop`` is running right now; safe to call from another thread.
+
+    ``asyncio.current_task`` only answers for the calling thread's loop. Returns
+    ``None`` when the loop is between tasks or task attribution is unavailable.
+    """
+
+    if _current_tasks is None:
+        return None
+    return _current_tasks.get(loop)
@@ -0,0 +1,446 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import queue
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.config import TRACING_EXPORTER, TRACING_FILE, TRACING_RING_SIZE, TRACING_SAMPLE_RATIO
+from backend.observability.middleware import RouteTemplates
+
+TRACEPARENT_HEADER = b"traceparent"
+TRACE_ID_HEADER = b"x-trace-id"
+_TRACEPARENT = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+T = TypeVar("T", bound=type)
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    trace_id: str
+    span_id: str
+    sampled: bool = True
+
+    @classmethod
+    def from_traceparent(cls, value: str) -> Optional["SpanContext"]:
+        """Parse a W3C ``traceparent`` header; ``None`` when it is absent or malformed."""
+
+        match = _TRACEPARENT.match(value.strip().lower())
+        if match is None:
+            return None
+        version, trace_id, span_id, flags = match.groups()
+        if version == "ff" or trace_id == _INVALID_TRACE_ID or span_id == _INVALID_SPAN_ID:
+            return None
+        return cls(trace_id, span_id, bool(int(flags, 16) & 0x01))
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+@dataclass
+class Span:
+    """One timed operation; field names follow the OTLP JSON encoding when exported."""
+
+    name: str
+    context: SpanContext
+    parent_id: Optional[str] = None
+    kind: str = "INTERNAL"
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    status: str = "UNSET"
+    status_message: str = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append({"name": name, "timeUnixNano": time.time_ns(), "attributes": attributes})
+
+    def record_exception(self, exc: BaseException) -> None:
+        # Only the type: messages can carry query values or patient data into the export.
+        self.add_event("exception", **{"exception.type": type(exc).__name__})
+        self.status = "ERROR"
+        self.status_message = type(exc).__name__
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": f"SPAN_KIND_{self.kind}",
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "events": self.events,
+            "status": {"code": f"STATUS_CODE_{self.status}", "message": self.status_message},
+        }
+
+
+# The span operations running in this task belong to; tasks started by asyncio.gather
+# copy the context, so concurrent repository calls become children of the caller.
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+# Set while an unsampled trace is in progress, so its operations do not start traces.
+_unsampled: ContextVar[bool] = ContextVar("unsampled_trace", default=False)
+
+
+def add_span_event(name: str, **attributes: Any) -> None:
+    """Attach an event to the current span, if one is being recorded."""
+
+    span = current_span.get()
+    if span is not None:
+        span.add_event(name, **attributes)
+
+
+def set_span_attribute(key: str, value: Any) -> None:
+    span = current_span.get()
+    if span is not None:
+        span.set_attribute(key, value)
+
+
+class RingBufferExporter:
+    """Keeps the spans of the most recent ``max_traces`` traces in memory."""
+
+    def __init__(self, max_traces: int) -> None:
+        self.max_traces = max(1, max_traces)
+        self._lock = threading.Lock()
+        self._traces: "OrderedDict[str, List[Span]]" = OrderedDict()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            spans = self._traces.get(span.context.trace_id)
+            if spans is None:
+                spans = self._traces[span.context.trace_id] = []
+                while len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)
+            spans.append(span)
+
+    def trace(self, trace_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            spans = list(self._traces.get(trace_id, ()))
+        return [span.to_dict() for span in sorted(spans, key=lambda span: span.start_ns)]
+
+    def summaries(self, limit: int = 50, min_duration_ms: float = 0.0) -> List[Dict[str, Any]]:
+        with self._lock:
+            traces = [(trace_id, list(spans)) for trace_id, spans in reversed(self._traces.items())]
+        summaries: List[Dict[str, Any]] = []
+        for trace_id, spans in traces:
+            root = min(spans, key=lambda span: span.start_ns)
+            duration_ms = (max(span.end_ns or span.start_ns for span in spans) - root.start_ns) / 1_000_000
+            if duration_ms < min_duration_ms:
+                continue
+            summaries.append(
+                {
+                    "trace_id": trace_id,
+                    "root": root.name,
+                    "duration_ms": round(duration_ms, 3),
+                    "spans": len(spans),
+                    "errors": sum(1 for span in spans if span.status == "ERROR"),
+                }
+            )
+            if len(summaries) >= limit:
+                break
+        return summaries
+
+
+class FileExporter:
+    """Appends each finished span as one JSON line to ``path``.
+
+    ``export`` only queues the span; a writer thread serializes and writes them, so the
+    event loop never waits on the file. When the writer falls ``max_pending`` spans
+    behind, new spans are dropped and counted in ``dropped``.
+    """
+
+    def __init__(self, path: str, max_pending: int = 10_000) -> None:
+        self.path = path
+        self.dropped = 0
+        self._pending: "queue.Queue[Optional[Span]]" = queue.Queue(max_pending)
+        self._lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+
+    def export(self, span: Span) -> None:
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write, name="span-file-exporter", daemon=True)
+                    self._writer.start()
+        try:
+            self._pending.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def shutdown(self) -> None:
+        """Write the spans still queued and close the file."""
+
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._pending.put(None)
+            writer.join()
+
+    def _write(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            while True:
+                batch = [self._pending.get()]
+                while batch[-1] is not None:
+                    try:
+                        batch.append(self._pending.get_nowait())
+                    except queue.Empty:
+                        break
+                spans = [span for span in batch if span is not None]
+                file.writelines(json.dumps(span.to_dict(), default=str, separators=(",", ":")) + "\n" for span in spans)
+                file.flush()
+                if batch[-1] is None:
+                    return
+
+
+class Tracer:
+    def __init__(self, exporters: Sequence[Any] = (), sample_ratio: float = 1.0) -> None:
+        self.exporters = list(exporters)
+        self.sample_ratio = sample_ratio
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    def start_span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        *,
+        kind: str = "INTERNAL",
+        parent: Optional[SpanContext] = None,
+    ) -> Optional[Span]:
+        """A new span under ``parent`` or the current span, without making it current.
+
+        ``None`` when tracing is off or the trace is not sampled. A new trace is sampled
+        with probability ``sample_ratio``; an incoming parent's sampled flag is honoured.
+        """
+
+        if not self.exporters:
+            return None
+        if parent is None:
+            parent_span = current_span.get()
+            if parent_span is not None:
+                parent = parent_span.context
+            elif _unsampled.get() or random.random() >= self.sample_ratio:
+                return None
+        if parent is not None and not parent.sampled:
+            return None
+        return Span(
+            name,
+            SpanContext(parent.trace_id if parent else _new_trace_id(), _new_span_id()),
+            parent.span_id if parent else None,
+            kind,
+            attributes=dict(attributes or {}),
+        )
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        *,
+        kind: str = "INTERNAL",
+        parent: Optional[SpanContext] = None,
+    ) -> Iterator[Optional[Span]]:
+        """Record the body as a span and make it the parent of spans started inside."""
+
+        span = self.start_span(name, attributes, kind=kind, parent=parent)
+        if span is None:
+            # Operations inside an unsampled trace are not sampled on their own either.
+            token = _unsampled.set(bool(self.exporters))
+            try:
+                yield None
+            finally:
+                _unsampled.reset(token)
+            return
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.record_exception(exc)
+            raise
+        finally:
+            current_span.reset(token)
+            self.end(span)
+
+    def end(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        for exporter in self.exporters:
+            exporter.export(span)
+
+    def ring_buffer(self) -> Optional[RingBufferExporter]:
+        return next((exporter for exporter in self.exporters if isinstance(exporter, RingBufferExporter)), None)
+
+    def shutdown(self) -> None:
+        for exporter in self.exporters:
+            if hasattr(exporter, "shutdown"):
+                exporter.shutdown()
+
+
+def _new_trace_id() -> str:
+    return f"{random.getrandbits(128) or 1:032x}"
+
+
+def _new_span_id() -> str:
+    return f"{random.getrandbits(64) or 1:016x}"
+
+
+def build_tracer(exporter: str = TRACING_EXPORTER) -> Tracer:
+    exporters: List[Any] = []
+    names = {name.strip() for name in exporter.split(",")}
+    if "ring" in names:
+        exporters.append(RingBufferExporter(TRACING_RING_SIZE))
+    if "file" in names:
+        exporters.append(FileExporter(TRACING_FILE))
+    return Tracer(exporters, TRACING_SAMPLE_RATIO)
+
+
+tracer = build_tracer()
+
+
+def get_tracer() -> Tracer:
+    return tracer
+
+
+def traced(name: str, attributes: Optional[Dict[str, Any]] = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Record each call of the decorated coroutine function as a span called ``name``."""
+
+    def decorator(method: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(method)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with tracer.span(name, attributes):
+                return await method(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def traced_generator(
+    name: str, attributes: Optional[Dict[str, Any]] = None
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Record an async generator's whole iteration as one span.
+
+    The span is only current while the generator runs a step: in between, the consumer
+    runs in the same context and its own spans must not become children of it.
+    """
+
+    def decorator(method: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(method)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            active = tracer.start_span(name, attributes)
+            generator = method(*args, **kwargs)
+            try:
+                while True:
+                    token = current_span.set(active) if active is not None else None
+                    try:
+                        item = await generator.__anext__()
+                    except StopAsyncIteration:
+                        return
+                    finally:
+                        if token is not None:
+                            current_span.reset(token)
+                    yield item
+            except BaseException as exc:
+                if active is not None and not isinstance(exc, GeneratorExit):
+                    active.record_exception(exc)
+                raise
+            finally:
+                await generator.aclose()
+                if active is not None:
+                    tracer.end(active)
+
+        return wrapper
+
+    return decorator
+
+
+def trace_methods(cls: T) -> T:
+    """Wrap every public coroutine and async generator method of ``cls`` in a span."""
+
+    for name, member in list(vars(cls).items()):
+        if name.startswith("_"):
+            continue
+        label = f"{cls.__name__}.{name}"
+        if inspect.iscoroutinefunction(member):
+            setattr(cls, name, traced(label)(member))
+        elif inspect.isasyncgenfunction(member):
+            setattr(cls, name, traced_generator(label)(member))
+    return cls
+
+
+def _incoming_context(scope: Scope) -> Optional[SpanContext]:
+    for name, value in scope["headers"]:
+        if name == TRACEPARENT_HEADER:
+            return SpanContext.from_traceparent(value.decode("latin-1"))
+    return None
+
+
+class TracingMiddleware:
+    """Opens a server span per HTTP request, continuing an incoming ``traceparent``.
+
+    The trace id is returned in ``X-Trace-Id`` so a slow response can be looked up
+    under ``/admin/traces``.
+    """
+
+    def __init__(self, app: ASGIApp, tracer: Optional[Tracer] = None) -> None:
+        self.app = app
+        self.tracer = tracer if tracer is not None else get_tracer()
+        self._routes = RouteTemplates()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        attributes = {"http.method": scope["method"], "http.target": scope["path"]}
+        with self.tracer.span(
+            f"{scope['method']} {scope['path']}",
+            attributes,
+            kind="SERVER",
+            parent=_incoming_context(scope),
+        ) as span:
+            if span is None:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_with_trace_id(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    span.set_attribute("http.status_code", status_code)
+                    if status_code >= 500:
+                        span.status = "ERROR"
+                    headers = list(message.get("headers", []))
+                    headers.append((TRACE_ID_HEADER, span.context.trace_id.encode("ascii")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace_id)
+            finally:
+                route = self._routes(scope)
+                span.name = f"{scope['method']} {route}"
+                span.set_attribute("http.route", route)
+
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import re
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from backend.db.indexes import index
+from backend.db.manager import read_preference
+from backend.observability.mongo import instrument_repository
+from backend.services.common import current_timestamp, keyset_filter
+
+Month = Tuple[int, int]
+
+# Documents written before partitioning live in the unsuffixed collection; they sort
+# before every monthly partition.
+LEGACY_MONTH: Month = (0, 0)
+
+PARTITION_INDEXES: Dict[str, List[IndexModel]] = {
+    "activity_logs": [
+        IndexModel([("timestamp", DESCENDING), ("_id", DESCENDING)], name="timestamp_id"),
+        IndexModel([("performed_by", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)], name="performed_by_timestamp"),
+        IndexModel([("action", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)], name="action_timestamp"),
+        IndexModel([("payload.patient_id", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)], name="patient_timestamp"),
+    ],
+    "auth_logs": [
+        IndexModel([("timestamp", DESCENDING), ("_id", DESCENDING)], name="timestamp_id"),
+        IndexModel([("user_id", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)], name="user_id_timestamp"),
+        IndexModel([("email", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)], name="email_timestamp"),
+        IndexModel([("event", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)], name="event_timestamp"),
+    ],
+}
+
+# The unsuffixed legacy collections get the partition indexes through the startup registry.
+INDEXES = [
+    index(collection, *model.document["key"].items(), reason=f"legacy {collection} reads ({model.document['name']})")
+    for collection, models in PARTITION_INDEXES.items()
+    for model in models
+]
+
+# Partitions whose indexes this process has already ensured, as "<db>.<collection>".
+_indexed_partitions: Set[str] = set()
+# Newest timestamp in each legacy collection (None when empty) and when to look it up
+# again, keyed by "<db>.<collection>". Workers still on the pre-partitioning code keep
+# writing there during a rolling deploy, so the value is only trusted for a while.
+_legacy_cutovers: Dict[str, Tuple[Optional[datetime], float]] = {}
+LEGACY_CUTOVER_TTL_SECONDS = 60.0
+
+
+def partition_name(base: str, timestamp: datetime) -> str:
+    return f"{base}_{timestamp.year:04d}_{timestamp.month:02d}"
+
+
+def month_of(timestamp: datetime) -> Month:
+    return (timestamp.year, timestamp.month)
+
+
+@instrument_repository
+class AuditRepository:
+    """Audit storage split into one collection per calendar month.
+
+    Monthly partitions keep indexes small, make retention a cheap ``drop``/rename and
+    let range queries skip months they cannot match. Reads use the "audit" read
+    preference (secondaryPreferred by default) so compliance queries do not load the primary.
+    """
+
+    def __init__(self, database: AsyncIOMotorDatabase) -> None:
+        self._db = database
+
+    async def insert_many(self, collection: str, documents: List[Dict[str, Any]]) -> None:
+        partitions: Dict[str, List[Dict[str, Any]]] = {}
+        for document in documents:
+            timestamp = document.get("timestamp") or current_timestamp()
+            partitions.setdefault(partition_name(collection, timestamp), []).append(document)
+
+        for name, partition_documents in partitions.items():
+            await self._ensure_partition_indexes(collection, name)
+            await self._db[name].insert_many(partition_documents, ordered=False)
+
+    async def list_partitions(
+        self,
+        collection: str,
+        *,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[Tuple[Month, str]]:
+        pattern = re.compile(rf"^{re.escape(collection)}_(\d{{4}})_(\d{{2}})$")
+        names = await self._db.list_collection_names(
+            filter={"name": {"$regex": rf"^{re.escape(collection)}(_\d{{4}}_\d{{2}})?$"}}
+        )
+        partitions: List[Tuple[Month, str]] = []
+        for name in names:
+            if name == collection:
+                # Only read the legacy collection when it can hold matching documents.
+                cutover = await self._legacy_cutover(collection)
+                if cutover is not None and (since is None or since <= cutover):
+                    partitions.append((LEGACY_MONTH, name))
+                continue
+            match = pattern.match(name)
+            if not match:
+                continue
+            month = (int(match.group(1)), int(match.group(2)))
+            if since is not None and month < month_of(since):
+                continue
+            if until is not None and month > month_of(until):
+                continue
+            partitions.append((month, name))
+        return sorted(partitions)
+
+    async def iter_documents(
+        self,
+        collection: str,
+        query: Dict[str, Any],
+        *,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        after: Optional[Sequence[Any]] = None,
+        descending: bool = True,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield matching documents across partitions ordered by ``(timestamp, _id)``.
+
+        ``after`` is the ``(timestamp, _id)`` of the last document already seen; only
+        documents strictly beyond it in the requested direction are returned.
+        """
+
+        conditions: List[Dict[str, Any]] = [query] if query else []
+        time_range: Dict[str, Any] = {}
+        if since is not None:
+            time_range["$gte"] = since
+        if until is not None:
+            time_range["$lt"] = until
+        if time_range:
+            conditions.append({"timestamp": time_range})
+
+        partitions = await self.list_partitions(collection, since=since, until=until)
+        if after is not None:
+            conditions.append(keyset_filter(("timestamp", "_id"), after, descending))
+            after_month = month_of(after[0])
+            partitions = [
+                (month, name)
+                for month, name in partitions
+                if month == LEGACY_MONTH or (month <= after_month if descending else month >= after_month)
+            ]
+        if descending:
+            partitions.reverse()
+
+        filter_doc: Dict[str, Any] = {"$and": conditions} if len(conditions) > 1 else (conditions[0] if conditions else {})
+        direction = DESCENDING if descending else ASCENDING
+        for _, name in partitions:
+            cursor = (
+                self._reader(name)
+                .find(filter_doc)
+                .sort([("timestamp", direction), ("_id", direction)])
+                .batch_size(batch_size)
+            )
+            async for document in cursor:
+                yield document
+
+    async def apply_retention(self, collection: str, cutoff: Month, archive_db_name: str = "") -> List[str]:
+        """Archive (rename into ``archive_db_name``) or drop partitions older than ``cutoff``."""
+
+        expired = [
+            name
+            for month, name in await self.list_partitions(collection)
+            if month != LEGACY_MONTH and month < cutoff
+        ]
+        for name in expired:
+            if archive_db_name:
+                await self._db.client.admin.command(
+                    "renameCollection",
+                    f"{self._db.name}.{name}",
+                    to=f"{archive_db_name}.{name}",
+                )
+            else:
+                await self._db.drop_collection(name)
+            _indexed_partitions.discard(f"{self._db.name}.{name}")
+        return expired
+
+    async def _legacy_cutover(self, collection: str) -> Optional[datetime]:
+        key = f"{self._db.name}.{collection}"
+        cached = _legacy_cutovers.get(key)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        newest = await self._reader(collection).find_one({}, {"timestamp": 1}, sort=[("timestamp", DESCENDING)])
+        cutover = newest.get("timestamp") if newest else None
+        _legacy_cutovers[key] = (cutover, time.monotonic() + LEGACY_CUTOVER_TTL_SECONDS)
+        return cutover
+
+    def _reader(self, name: str):
+        return self._db.get_collection(name, read_preference=read_preference("audit"))
+
+    async def _ensure_partition_indexes(self, collection: str, name: str) -> None:
+        key = f"{self._db.name}.{name}"
+        if key in _indexed_partitions:
+            return
+        indexes = PARTITION_INDEXES.get(collection)
+        if indexes:
+            await self._db[name].create_indexes(indexes)
+        _indexed_partitions.add(key)
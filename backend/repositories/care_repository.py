@@ -1,56 +1,327 @@
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, CollectionInvalid, OperationFailure
 
+from backend.db.indexes import index
+from backend.db.manager import read_preference
 from backend.models import Contact
+from backend.observability.mongo import instrument_repository
+from backend.services.common import keyset_filter
 
+VITALS_SERIES_COLLECTION = "vitals_series"
+VITAL_METRICS = ("heart_rate", "systolic", "diastolic", "spo2")
 
+# Keyset-paginated collections index the equality field first, then the sort keys.
+INDEXES = [
+    index(
+        "tasks",
+        ("patient_id", 1), ("scope", 1), ("staff_name", 1), ("staff_role", 1),
+        reason="fetch_tasks by patient_id; upsert/patch filter",
+    ),
+    index("crew_assignments", ("patient_id", 1), reason="fetch_crew"),
+    index("timeline", ("patient_id", 1), reason="fetch_timeline"),
+    index("vitals", ("patient_id", 1), ("captured_at", -1), reason="legacy latest-vitals fallback"),
+    index(VITALS_SERIES_COLLECTION, ("patient_id", 1), ("captured_at", -1), reason="latest vitals and range reads"),
+    index("surgeries", ("doctor_id", 1), ("date", 1), ("_id", 1), reason="fetch_surgeries_for_doctor"),
+    index("published_plans", ("patient_id", 1), ("created_at", -1), ("_id", -1), reason="fetch_published_plans"),
+    index("contacts", ("email", 1), reason="upsert_contact"),
+]
+
+
+def _version_filter(expected_version: int) -> Dict[str, Any]:
+    # Documents written before versioning have no version field; they count as version 0.
+    return {"version": {"$in": [None, 0]}} if expected_version == 0 else {"version": expected_version}
+
+
+def _insert_at(array: Any, item: Any, position: Optional[int]) -> Dict[str, Any]:
+    if position is None:
+        return {"$concatArrays": [array, [item]]}
+    if position == 0:
+        return {"$concatArrays": [[item], array]}
+    return {
+        "$concatArrays": [
+            {"$slice": [array, position]},
+            [item],
+            {"$slice": [array, position, {"$max": [{"$size": array}, 1]}]},
+        ]
+    }
+
+
+def array_patch_pipeline(
+    field: str, key: str, operations: List[Dict[str, Any]], updated_at: datetime
+) -> List[Dict[str, Any]]:
+    """Compile patch operations into an update pipeline with one ``$set`` stage per operation.
+
+    Each operation is ``{"op", "target", "changes", "item", "position"}``; elements of
+    ``field`` are identified by their ``key``. Client values are wrapped in ``$literal``
+    so strings starting with ``$`` are never read as field paths.
+    """
+
+    array = f"${field}"
+    stages: List[Dict[str, Any]] = [{"$set": {field: {"$ifNull": [array, []]}}}]
+    for operation in operations:
+        op = operation["op"]
+        matches = {"$eq": [f"$$this.{key}", {"$literal": operation.get("target")}]}
+        if op == "set":
+            expression: Dict[str, Any] = {
+                "$map": {
+                    "input": array,
+                    "in": {"$cond": [matches, {"$mergeObjects": ["$$this", {"$literal": operation["changes"]}]}, "$$this"]},
+                }
+            }
+        elif op == "insert":
+            expression = _insert_at(array, {"$literal": operation["item"]}, operation.get("position"))
+        elif op == "remove":
+            expression = {"$filter": {"input": array, "cond": {"$not": [matches]}}}
+        elif op == "move":
+            expression = {
+                "$let": {
+                    "vars": {
+                        "moved": {"$arrayElemAt": [{"$filter": {"input": array, "cond": matches}}, 0]},
+                        "rest": {"$filter": {"input": array, "cond": {"$not": [matches]}}},
+                    },
+                    "in": _insert_at("$$rest", "$$moved", operation["position"]),
+                }
+            }
+        else:
+            raise ValueError(f"Unsupported patch operation: {op}")
+        stages.append({"$set": {field: expression}})
+    stages.append({"$set": {"version": {"$add": [{"$ifNull": ["$version", 0]}, 1]}, "updated_at": updated_at}})
+    return stages
+
+
+@instrument_repository
 class CareRepository:
     def __init__(self, database: AsyncIOMotorDatabase) -> None:
         self._db = database
 
-    async def fetch_tasks(self, patient_id: str) -> List[Dict[str, Any]]:
-        cursor = self._db.tasks.find({"patient_id": patient_id})
+    async def fetch_tasks(self, patient_id: str, projection: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        cursor = self._db.tasks.find({"patient_id": patient_id}, projection)
         return [doc async for doc in cursor]
 
-    async def fetch_crew(self, patient_id: str) -> Optional[Dict[str, Any]]:
-        return await self._db.crew_assignments.find_one({"patient_id": patient_id})
+    async def fetch_crew(self, patient_id: str, projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        return await self._db.crew_assignments.find_one({"patient_id": patient_id}, projection)
+
+    async def fetch_timeline(self, patient_id: str, projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        return await self._db.timeline.find_one({"patient_id": patient_id}, projection)
 
-    async def fetch_timeline(self, patient_id: str) -> Optional[Dict[str, Any]]:
-        return await self._db.timeline.find_one({"patient_id": patient_id})
+    async def ensure_vitals_series(self) -> None:
+        """Create the vitals time-series collection (``patient_id`` as metaField) if missing."""
 
-    async def fetch_latest_vitals(self, patient_id: str) -> Optional[Dict[str, Any]]:
+        if await self._db.list_collection_names(filter={"name": VITALS_SERIES_COLLECTION}):
+            return
+        try:
+            await self._db.create_collection(
+                VITALS_SERIES_COLLECTION,
+                timeseries={"timeField": "captured_at", "metaField": "patient_id", "granularity": "seconds"},
+            )
+        except (CollectionInvalid, OperationFailure):
+            # Another worker created it first.
+            return
+
+    async def fetch_latest_vitals(
+        self, patient_id: str, projection: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        docs = (
+            await self._db[VITALS_SERIES_COLLECTION]
+            .find({"patient_id": patient_id}, projection)
+            .sort("captured_at", -1)
+            .limit(1)
+            .to_list(length=1)
+        )
+        if docs:
+            return docs[0]
+        # Readings recorded before the time-series collection existed.
         docs = (
-            await self._db.vitals.find({"patient_id": patient_id}).sort("captured_at", -1).limit(1).to_list(length=1)
+            await self._db.vitals.find({"patient_id": patient_id}, projection)
+            .sort("captured_at", -1)
+            .limit(1)
+            .to_list(length=1)
         )
         return docs[0] if docs else None
 
     async def record_vitals(self, payload: Dict[str, Any]) -> Any:
-        return await self._db.vitals.insert_one(payload)
+        return await self._db[VITALS_SERIES_COLLECTION].insert_one(payload)
+
+    async def record_vitals_many(self, records: List[Dict[str, Any]]) -> Any:
+        return await self._db[VITALS_SERIES_COLLECTION].insert_many(records, ordered=False)
+
+    async def fetch_vitals_range(
+        self, patient_id: str, since: datetime, until: datetime, limit: int
+    ) -> List[Dict[str, Any]]:
+        cursor = (
+            self._db[VITALS_SERIES_COLLECTION]
+            .find(
+                {"patient_id": patient_id, "captured_at": {"$gte": since, "$lt": until}},
+                {"_id": 0, "captured_at": 1, "metrics": 1},
+            )
+            .sort("captured_at", 1)
+            .limit(limit)
+        )
+        return [doc async for doc in cursor]
+
+    async def aggregate_vitals_buckets(
+        self, patient_id: str, since: datetime, until: datetime, bucket_seconds: int, limit: int
+    ) -> List[Dict[str, Any]]:
+        """Return min/max/avg of every metric per ``bucket_seconds`` window, computed server-side."""
+
+        group: Dict[str, Any] = {
+            "_id": {"$dateTrunc": {"date": "$captured_at", "unit": "second", "binSize": bucket_seconds}},
+            "count": {"$sum": 1},
+        }
+        projection: Dict[str, Any] = {"_id": 0, "bucket_start": "$_id", "count": 1}
+        for metric in VITAL_METRICS:
+            for stat in ("min", "max", "avg"):
+                group[f"{metric}_{stat}"] = {f"${stat}": f"$metrics.{metric}"}
+            projection[metric] = {stat: f"${metric}_{stat}" for stat in ("min", "max", "avg")}
+
+        pipeline = [
+            {"$match": {"patient_id": patient_id, "captured_at": {"$gte": since, "$lt": until}}},
+            {"$group": group},
+            {"$sort": {"_id": 1}},
+            {"$limit": limit},
+            {"$project": projection},
+        ]
+        cursor = self._db[VITALS_SERIES_COLLECTION].aggregate(pipeline)
+        return [doc async for doc in cursor]
+
+    async def upsert_tasks(self, filter_doc: Dict[str, Any], update_doc: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._db.tasks.find_one_and_update(
+            filter_doc,
+            {"$set": update_doc, "$inc": {"version": 1}},
+            projection={"_id": 0, "version": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
 
-    async def upsert_tasks(self, filter_doc: Dict[str, Any], update_doc: Dict[str, Any]) -> Any:
-        return await self._db.tasks.update_one(filter_doc, {"$set": update_doc}, upsert=True)
+    async def patch_tasks(
+        self, filter_doc: Dict[str, Any], expected_version: int, operations: List[Dict[str, Any]], **guards: Any
+    ) -> Optional[Dict[str, Any]]:
+        return await self._patch_array(self._db.tasks, filter_doc, "tasks", "label", expected_version, operations, **guards)
 
     async def upsert_crew(self, filter_doc: Dict[str, Any], update_doc: Dict[str, Any]) -> Any:
         return await self._db.crew_assignments.update_one(filter_doc, {"$set": update_doc}, upsert=True)
 
-    async def upsert_timeline(self, filter_doc: Dict[str, Any], update_doc: Dict[str, Any]) -> Any:
-        return await self._db.timeline.update_one(filter_doc, {"$set": update_doc}, upsert=True)
+    async def upsert_timeline(self, filter_doc: Dict[str, Any], update_doc: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._db.timeline.find_one_and_update(
+            filter_doc,
+            {"$set": update_doc, "$inc": {"version": 1}},
+            projection={"_id": 0, "version": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def patch_timeline(
+        self, filter_doc: Dict[str, Any], expected_version: int, operations: List[Dict[str, Any]], **guards: Any
+    ) -> Optional[Dict[str, Any]]:
+        return await self._patch_array(self._db.timeline, filter_doc, "steps", "id", expected_version, operations, **guards)
+
+    async def fetch_patch_state(self, collection: str, filter_doc: Dict[str, Any], key_path: str) -> Optional[Dict[str, Any]]:
+        return await self._db[collection].find_one(filter_doc, {"version": 1, key_path: 1})
+
+    async def _patch_array(
+        self,
+        collection,
+        filter_doc: Dict[str, Any],
+        field: str,
+        key: str,
+        expected_version: int,
+        operations: List[Dict[str, Any]],
+        *,
+        present: List[str],
+        absent: List[str],
+        updated_at: datetime,
+    ) -> Optional[Dict[str, Any]]:
+        """Apply ``operations`` atomically if the document is still at ``expected_version``.
+
+        ``present``/``absent`` are element keys that must (not) exist beforehand. Returns
+        the new ``version``/``updated_at``, or ``None`` when any guard did not match.
+        """
+
+        guarded = {**filter_doc, **_version_filter(expected_version)}
+        key_path = f"{field}.{key}"
+        if present and absent:
+            guarded[key_path] = {"$all": present, "$nin": absent}
+        elif present:
+            guarded[key_path] = {"$all": present}
+        elif absent:
+            guarded[key_path] = {"$nin": absent}
+        return await collection.find_one_and_update(
+            guarded,
+            array_patch_pipeline(field, key, operations, updated_at),
+            projection={"_id": 0, "version": 1, "updated_at": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def fetch_surgeries_for_doctor(
+        self,
+        doctor_id: str,
+        *,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        after: Optional[List[Any]] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Return up to ``limit + 1`` surgeries ordered by ``(date, _id)`` after the ``after`` key."""
 
-    async def fetch_surgeries_for_doctor(self, doctor_id: str) -> List[Dict[str, Any]]:
-        cursor = self._db.surgeries.find({"doctor_id": doctor_id}).sort("date", 1)
+        query: Dict[str, Any] = {"doctor_id": doctor_id}
+        date_range: Dict[str, Any] = {}
+        if date_from:
+            date_range["$gte"] = date_from
+        if date_to:
+            date_range["$lte"] = date_to
+        if date_range:
+            query["date"] = date_range
+        if after is not None:
+            query = {"$and": [query, keyset_filter(("date", "_id"), after, descending=False)]}
+        cursor = self._history_reader("surgeries").find(query).sort([("date", ASCENDING), ("_id", ASCENDING)]).limit(limit + 1)
         return [doc async for doc in cursor]
 
-    async def update_surgery(self, surgery_id, updates: Dict[str, Any]) -> Any:
-        return await self._db.surgeries.update_one({"_id": surgery_id}, {"$set": updates})
+    async def update_surgery(self, surgery_id, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Apply ``updates`` and return the updated document in the same round trip."""
+
+        return await self._db.surgeries.find_one_and_update(
+            {"_id": surgery_id},
+            {"$set": updates},
+            return_document=ReturnDocument.AFTER,
+        )
 
     async def find_surgery(self, surgery_id) -> Optional[Dict[str, Any]]:
         return await self._db.surgeries.find_one({"_id": surgery_id})
 
-    async def fetch_published_plans(self, patient_id: str) -> List[Dict[str, Any]]:
-        cursor = self._db.published_plans.find({"patient_id": patient_id}).sort("created_at", -1)
+    async def fetch_published_plans(
+        self,
+        patient_id: str,
+        projection: Optional[Dict[str, Any]] = None,
+        *,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        after: Optional[List[Any]] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Return up to ``limit + 1`` plans, newest first by ``(created_at, _id)``, after the ``after`` key."""
+
+        query: Dict[str, Any] = {"patient_id": patient_id}
+        created_range: Dict[str, Any] = {}
+        if since is not None:
+            created_range["$gte"] = since
+        if until is not None:
+            created_range["$lt"] = until
+        if created_range:
+            query["created_at"] = created_range
+        if after is not None:
+            query = {"$and": [query, keyset_filter(("created_at", "_id"), after, descending=True)]}
+        cursor = (
+            self._history_reader("published_plans")
+            .find(query, projection)
+            .sort([("created_at", DESCENDING), ("_id", DESCENDING)])
+            .limit(limit + 1)
+        )
         return [doc async for doc in cursor]
 
     async def insert_published_plan(self, record: Dict[str, Any]) -> Any:
@@ -59,6 +330,37 @@ class CareRepository:
     async def find_published_plan(self, record_id) -> Optional[Dict[str, Any]]:
         return await self._db.published_plans.find_one({"_id": record_id})
 
+    async def find_published_plans_by_ids(self, record_ids: List[Any]) -> List[Dict[str, Any]]:
+        cursor = self._db.published_plans.find({"_id": {"$in": record_ids}})
+        return [doc async for doc in cursor]
+
+    async def store_plan_sections(self, blobs: Dict[str, Any], created_at: datetime) -> None:
+        """Insert section blobs keyed by content hash; blobs that already exist are left untouched."""
+
+        if not blobs:
+            return
+        operations = [
+            UpdateOne({"_id": digest}, {"$setOnInsert": {"data": data, "created_at": created_at}}, upsert=True)
+            for digest, data in blobs.items()
+        ]
+        try:
+            await self._db.plan_sections.bulk_write(operations, ordered=False)
+        except BulkWriteError as exc:
+            # Concurrent upserts of the same hash race on _id; the content is identical.
+            if any(error.get("code") != 11000 for error in exc.details.get("writeErrors", [])):
+                raise
+
+    async def fetch_plan_sections(self, digests: List[str]) -> Dict[str, Any]:
+        if not digests:
+            return {}
+        cursor = self._db.plan_sections.find({"_id": {"$in": digests}})
+        return {doc["_id"]: doc.get("data") async for doc in cursor}
+
+    def _history_reader(self, collection: str):
+        # History pages tolerate bounded staleness, so they may be routed to secondaries
+        # through MONGODB_READ_PREFERENCES (group name = collection name).
+        return self._db.get_collection(collection, read_preference=read_preference(collection))
+
     async def update_contact(self, contact_id, updates: Dict[str, Any]) -> Any:
         return await self._db.contacts.update_one({"_id": contact_id}, {"$set": updates})
 
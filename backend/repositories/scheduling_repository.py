@@ -6,10 +6,23 @@ from typing import List, Optional
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from backend.db.indexes import index
 from backend.models import Resource, TestScore
+from backend.observability.mongo import instrument_repository
 from backend.services.common import convert_date_to_datetime
 
+AVAILABILITY_COLLECTIONS = ("nurse_availability", "equipment_availability", "ot_availability")
 
+INDEXES = [
+    index("staff", ("role", 1), reason="find_staff"),
+    *(index(collection, ("date", 1), reason="find_generic_availability") for collection in AVAILABILITY_COLLECTIONS),
+    index("test_history", ("test_type", 1), ("date", -1), reason="get_latest_test_scores"),
+    index("optimization_snapshots", ("request_key", 1), reason="save_optimization_snapshot upsert"),
+    index("optimization_feedback", ("submitted_at", 1), reason="fetch_recent_feedback"),
+]
+
+
+@instrument_repository
 class SchedulingRepository:
     def __init__(self, database: AsyncIOMotorDatabase) -> None:
         self._db = database
@@ -5,7 +5,37 @@ from typing import Any, Dict, Iterable, Optional
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from backend.db.indexes import index
+from backend.db.migrations import run_once
+from backend.observability.mongo import instrument_repository
 
+INDEXES = [
+    index("users", ("email", 1), unique=True, reason="login lookup; enforces one account per email"),
+]
+
+# Server-side equivalent of ``role.strip().lower()`` over string roles, dropping blanks.
+_NORMALIZED_ROLES_EXPR: Dict[str, Any] = {
+    "$filter": {
+        "input": {
+            "$map": {
+                "input": "$roles",
+                "as": "role",
+                "in": {
+                    "$cond": [
+                        {"$eq": [{"$type": "$$role"}, "string"]},
+                        {"$toLower": {"$trim": {"input": "$$role"}}},
+                        "",
+                    ]
+                },
+            }
+        },
+        "as": "role",
+        "cond": {"$ne": ["$$role", ""]},
+    }
+}
+
+
+@instrument_repository
 class UserRepository:
     def __init__(self, database: AsyncIOMotorDatabase) -> None:
         self._db = database
@@ -22,19 +52,28 @@ class UserRepository:
     async def update_user(self, query: Dict[str, Any], update: Dict[str, Any]) -> Any:
         return await self._db.users.update_one(query, update)
 
-    async def ensure_default_roles(self, default_roles: Iterable[str]) -> None:
+    async def ensure_default_roles(self, default_roles: Iterable[str]) -> bool:
+        """Backfill and normalise roles once per deployment.
+
+        Both passes run server-side as single ``update_many`` calls, and the work is
+        guarded by a migration marker keyed on the default roles so parallel workers
+        (and later restarts) skip it. Returns ``True`` when this worker applied it.
+        """
+
         default_roles_list = list(default_roles)
-        await self._db.users.update_many(
-            {"$or": [{"roles": {"$exists": False}}, {"roles": []}]},
-            {"$set": {"roles": default_roles_list}},
-        )
+        migration_name = f"users.default_roles:{','.join(default_roles_list)}"
+
+        async def operation() -> None:
+            await self._db.users.update_many(
+                {"$or": [{"roles": {"$exists": False}}, {"roles": []}]},
+                {"$set": {"roles": default_roles_list}},
+            )
+            await self._db.users.update_many(
+                {"roles": {"$type": "array"}, "$expr": {"$ne": [_NORMALIZED_ROLES_EXPR, "$roles"]}},
+                [{"$set": {"roles": _NORMALIZED_ROLES_EXPR}}],
+            )
 
-        cursor = self._db.users.find({"roles": {"$exists": True}})
-        async for doc in cursor:
-            roles = doc.get("roles") or []
-            normalized = [role.strip().lower() for role in roles if isinstance(role, str) and role.strip()]
-            if normalized != roles:
-                await self._db.users.update_one({"_id": doc["_id"]}, {"$set": {"roles": normalized}})
+        return await run_once(self._db, migration_name, operation)
 
     async def touch_last_login(self, user_id: Any, timestamp: datetime) -> None:
         await self._db.users.update_one(
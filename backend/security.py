@@ -41,6 +41,13 @@ def _clean_active_sessions(sessions: Iterable[Dict[str, Any]]) -> Iterable[Dict[
             yield session
 
 
+def session_is_active(sessions: Iterable[Dict[str, Any]], session_id: str) -> bool:
+    """Whether ``session_id`` is among the unexpired ``active_sessions`` of a user."""
+
+    fingerprint = hash_session_identifier(session_id)
+    return any(session.get("fingerprint") == fingerprint for session in _clean_active_sessions(sessions))
+
+
 def _normalize_roles(roles: Optional[Iterable[str]]) -> List[str]:
     normalized: List[str] = []
     for role in roles or DEFAULT_USER_ROLES:
@@ -68,9 +75,8 @@ async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)
 
     hashed_session = hash_session_identifier(token_data["sid"])
     active_sessions = list(_clean_active_sessions(user.get("active_sessions", [])))
-    session_valid = any(session.get("fingerprint") == hashed_session for session in active_sessions)
 
-    if not session_valid:
+    if not session_is_active(active_sessions, token_data["sid"]):
         if active_sessions != user.get("active_sessions"):
             await db.users.update_one({"_id": user["_id"]}, {"$set": {"active_sessions": active_sessions}})
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Session expired or invalid")
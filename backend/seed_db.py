@@ -1,9 +1,49 @@
+"""Seed MongoDB with the demo data, or with a large synthetic dataset for capacity testing.
+
+    python -m backend.seed_db
+    python -m backend.seed_db --synthetic --seed 7 --days 30 --scale 0.1
+
+``--synthetic`` replaces the collections it writes with reproducible Faker data: the
+same ``--seed`` and sizes give the same documents. Batches go out as parallel
+``insert_many(ordered=False)`` calls and insert throughput is reported per collection.
+The default sizes come to roughly a million documents.
+"""
+
+import argparse
+import calendar
 import os
-from datetime import datetime
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, fields
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple
 from urllib.parse import quote_plus, urlparse, urlunparse
 
+from bson import ObjectId
 from dotenv import load_dotenv
+from faker import Faker
 from pymongo import MongoClient
+from pymongo.collection import Collection
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError, CollectionInvalid, OperationFailure
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from backend.config import (  # noqa: E402
+    SESSION_TTL_MINUTES,
+    SYNTHETIC_DOCTOR_ID_FORMAT,
+    SYNTHETIC_PATIENT_ID_FORMAT,
+    SYNTHETIC_START_DATE,
+)
+from backend.repositories.audit_repository import PARTITION_INDEXES, partition_name  # noqa: E402
+from backend.repositories.care_repository import VITALS_SERIES_COLLECTION  # noqa: E402
+from backend.security import hash_session_identifier  # noqa: E402
+from backend.services.auth import pwd_context  # noqa: E402
 
 
 def _url_quote_plus(url: str) -> str:
@@ -169,7 +209,396 @@ def seed_test_history() -> None:
     db.test_history.insert_many(tests)
 
 
-def main() -> None:
+# Synthetic capacity-testing dataset.
+
+SYNTHETIC_EMAIL_DOMAIN = "synthetic.example"
+SYNTHETIC_PASSWORD = "password"
+EQUIPMENT = ("MRI Scanner", "CT Scanner", "Anesthesia Machine", "Ventilator", "Ultrasound")
+TEST_TYPES = ("MRI", "CT", "X-Ray", "Ultrasound")
+PROCEDURES = ("Appendectomy", "Cholecystectomy", "Hip Replacement", "Knee Arthroscopy", "CABG", "Hernia Repair")
+SURGERY_STATUSES = ("scheduled", "scheduled", "in_progress", "completed", "completed", "cancelled")
+ACTIVITY_ACTIONS = ("tasks.update", "tasks.patch", "crew.update", "timeline.update", "vitals.record", "surgeries.update", "publish_plan")
+AUTH_EVENTS = ("login", "login", "login", "logout", "login_failed", "password_change")
+# Share of audit events that are auth events; the rest are activity.
+AUTH_EVENT_SHARE = 0.2
+
+
+@dataclass
+class SyntheticScale:
+    staff: int = 500
+    nurses_per_day: int = 200
+    days: int = 30
+    patients: int = 5_000
+    doctors: int = 200
+    operating_rooms: int = 20
+    surgeries_per_day: int = 300
+    tests_per_patient: int = 3
+    vitals_per_patient: int = 120
+    users: int = 2_000
+    sessions_per_user: int = 3
+    audit_events: int = 400_000
+    start_date: date = SYNTHETIC_START_DATE
+
+    def scaled(self, factor: float) -> "SyntheticScale":
+        """Multiply every count except ``days``, keeping at least one of each."""
+
+        counts = {
+            field.name: max(1, round(getattr(self, field.name) * factor))
+            for field in fields(self)
+            if isinstance(getattr(self, field.name), int) and field.name != "days"
+        }
+        return SyntheticScale(**{**self.__dict__, **counts})
+
+    def dates(self) -> List[datetime]:
+        return [datetime.combine(self.start_date + timedelta(days=offset), datetime.min.time()) for offset in range(self.days)]
+
+
+def _random(seed: int, name: str) -> Tuple[random.Random, Faker]:
+    # One stream per collection, so resizing one collection leaves the others unchanged.
+    rng = random.Random(f"{seed}:{name}")
+    fake = Faker()
+    fake.seed_instance(f"{seed}:{name}")
+    return rng, fake
+
+
+def _epoch_bytes(when: datetime) -> bytes:
+    # Naive datetimes are UTC here; datetime.timestamp() would apply the local zone.
+    return calendar.timegm(when.utctimetuple()).to_bytes(4, "big")
+
+
+def _object_id(rng: random.Random, when: datetime) -> ObjectId:
+    return ObjectId(_epoch_bytes(when) + rng.getrandbits(64).to_bytes(8, "big"))
+
+
+def _user_id(index: int) -> ObjectId:
+    return ObjectId(_epoch_bytes(datetime(2024, 1, 1)) + index.to_bytes(8, "big"))
+
+
+def _user_email(index: int) -> str:
+    return f"user{index}@{SYNTHETIC_EMAIL_DOMAIN}"
+
+
+def _shift(rng: random.Random) -> Dict[str, str]:
+    start = rng.randrange(6, 14)
+    return {"start": f"{start:02d}:00", "end": f"{min(start + rng.choice((6, 8, 10)), 23):02d}:00"}
+
+
+def staff_documents(scale: SyntheticScale, seed: int) -> Iterator[Dict[str, Any]]:
+    rng, fake = _random(seed, "staff")
+    for index in range(scale.staff):
+        working_days = sorted(rng.sample(range(7), rng.randint(3, 6)))
+        yield {
+            "_id": f"staff-{index:06d}",
+            "name": f"Dr. {fake.name()}",
+            "role": "radiologist" if index % 2 == 0 else "assistant_doctor",
+            "email": f"staff{index}@{SYNTHETIC_EMAIL_DOMAIN}",
+            "working_hours": [{"day_of_week": day, **_shift(rng)} for day in working_days],
+        }
+
+
+def nurse_documents(scale: SyntheticScale, seed: int) -> Iterator[Dict[str, Any]]:
+    rng, fake = _random(seed, "nurse_availability")
+    # A larger pool than is on shift each day, so rosters vary from day to day.
+    pool = [(f"N-{index:06d}", fake.name()) for index in range(scale.nurses_per_day * 5 // 4)]
+    for day in scale.dates():
+        for nurse_id, name in rng.sample(pool, scale.nurses_per_day):
+            yield {
+                "nurse_id": nurse_id,
+                "nurse_name": name,
+                "nurse_email": f"{nurse_id.lower()}@{SYNTHETIC_EMAIL_DOMAIN}",
+                "date": day,
+                **_shift(rng),
+            }
+
+
+def equipment_documents(scale: SyntheticScale, seed: int) -> Iterator[Dict[str, Any]]:
+    rng, _ = _random(seed, "equipment_availability")
+    for day in scale.dates():
+        for name in EQUIPMENT:
+            yield {"equipment_name": name, "date": day, **_shift(rng)}
+
+
+def ot_documents(scale: SyntheticScale, seed: int) -> Iterator[Dict[str, Any]]:
+    rng, _ = _random(seed, "ot_availability")
+    for day in scale.dates():
+        for index in range(scale.operating_rooms):
+            yield {"ot_id": f"OT-{index + 1:02d}", "date": day, **_shift(rng)}
+
+
+def test_history_documents(scale: SyntheticScale, seed: int) -> Iterator[Dict[str, Any]]:
+    rng, _ = _random(seed, "test_history")
+    first_day = scale.dates()[0]
+    for patient in range(scale.patients):
+        for _ in range(scale.tests_per_patient):
+            yield {
+                "patient_id": SYNTHETIC_PATIENT_ID_FORMAT.format(patient),
+                "test_type": rng.choice(TEST_TYPES),
+                "score": round(rng.uniform(50, 100), 1),
+                "date": first_day - timedelta(days=rng.randrange(1, 365)),
+            }
+
+
+def surgery_documents(scale: SyntheticScale, seed: int) -> Iterator[Dict[str, Any]]:
+    rng, fake = _random(seed, "surgeries")
+    patient_names = [fake.name() for _ in range(scale.patients)]
+    for day in scale.dates():
+        for _ in range(scale.surgeries_per_day):
+            patient = rng.randrange(scale.patients)
+            start = rng.randrange(7, 18)
+            yield {
+                "_id": _object_id(rng, day),
+                "patient_id": SYNTHETIC_PATIENT_ID_FORMAT.format(patient),
+                "patient_name": patient_names[patient],
+                "procedure": rng.choice(PROCEDURES),
+                "date": day.date().isoformat(),
+                "start": f"{start:02d}:00",
+                "end": f"{start + rng.randint(1, 4):02d}:00",
+                "operating_room": f"OT-{rng.randrange(scale.operating_rooms) + 1:02d}",
+                "status": rng.choice(SURGERY_STATUSES),
+                "doctor_id": SYNTHETIC_DOCTOR_ID_FORMAT.format(rng.randrange(scale.doctors)),
+            }
+
+
+def vitals_documents(scale: SyntheticScale, seed: int) -> Iterator[Dict[str, Any]]:
+    """Readings spread evenly over the date range per patient, in ``CareService`` record shape."""
+
+    rng, _ = _random(seed, VITALS_SERIES_COLLECTION)
+    first_day = scale.dates()[0]
+    spacing = scale.days * 86_400 / scale.vitals_per_patient
+    for patient in range(scale.patients):
+        patient_id = SYNTHETIC_PATIENT_ID_FORMAT.format(patient)
+        heart_rate, systolic, diastolic, spo2 = rng.randint(60, 95), rng.randint(105, 140), rng.randint(65, 90), rng.randint(94, 99)
+        for reading in range(scale.vitals_per_patient):
+            captured_at = first_day + timedelta(seconds=int(reading * spacing + rng.uniform(0, spacing / 2)))
+            metrics = {
+                "heart_rate": float(heart_rate + rng.randint(-8, 8)),
+                "systolic": float(systolic + rng.randint(-10, 10)),
+                "diastolic": float(diastolic + rng.randint(-6, 6)),
+                "spo2": float(min(spo2 + rng.randint(-2, 2), 100)),
+            }
+            yield {
+                "patient_id": patient_id,
+                "heart_rate": str(int(metrics["heart_rate"])),
+                "blood_pressure": f"{int(metrics['systolic'])}/{int(metrics['diastolic'])}",
+                "spo2": str(int(metrics["spo2"])),
+                "captured_at": captured_at,
+                "performed_by": None,
+                "recorded_at": captured_at + timedelta(seconds=rng.randint(1, 30)),
+                "recorded_by": _user_email(rng.randrange(scale.users)),
+                "metrics": metrics,
+            }
+
+
+def _user_roles(index: int) -> List[str]:
+    # user0 is an admin, so it can drive every route in the load generator.
+    if index % 10 == 0:
+        return ["admin"]
+    return ["scheduler"] if index % 5 == 1 else ["clinician"]
+
+
+def user_documents(scale: SyntheticScale, seed: int) -> Iterator[Dict[str, Any]]:
+    """Accounts ``user<N>@synthetic.example`` with the same password and live sessions.
+
+    Session times are relative to now rather than the seed, so the sessions are still
+    active whenever the dataset is loaded.
+    """
+
+    rng, fake = _random(seed, "users")
+    hashed_password = pwd_context.hash(SYNTHETIC_PASSWORD)
+    now = datetime.utcnow()
+    for index in range(scale.users):
+        created_at = datetime.combine(scale.start_date, datetime.min.time()) - timedelta(days=rng.randrange(1, 365))
+        sessions = []
+        for _ in range(rng.randint(0, scale.sessions_per_user)):
+            started = now - timedelta(minutes=rng.randrange(SESSION_TTL_MINUTES))
+            sessions.append(
+                {
+                    "fingerprint": hash_session_identifier(f"{rng.getrandbits(128):032x}"),
+                    "created_at": started,
+                    "expires_at": started + timedelta(minutes=SESSION_TTL_MINUTES),
+                }
+            )
+        yield {
+            "_id": _user_id(index),
+            "email": _user_email(index),
+            "full_name": fake.name(),
+            "hashed_password": hashed_password,
+            "created_at": created_at,
+            "updated_at": created_at,
+            "last_login": max((session["created_at"] for session in sessions), default=None),
+            "roles": _user_roles(index),
+            "active_sessions": sessions,
+        }
+
+
+def _audit_document(collection: str, rng: random.Random, timestamp: datetime, scale: SyntheticScale) -> Dict[str, Any]:
+    user = rng.randrange(scale.users)
+    if collection == "auth_logs":
+        event = rng.choice(AUTH_EVENTS)
+        return {
+            "_id": _object_id(rng, timestamp),
+            "user_id": None if event == "login_failed" else str(_user_id(user)),
+            "email": _user_email(user),
+            "event": event,
+            "metadata": {},
+            "timestamp": timestamp,
+        }
+    return {
+        "_id": _object_id(rng, timestamp),
+        "action": rng.choice(ACTIVITY_ACTIONS),
+        "performed_by": _user_email(user),
+        "payload": {"patient_id": SYNTHETIC_PATIENT_ID_FORMAT.format(rng.randrange(scale.patients))},
+        "timestamp": timestamp,
+    }
+
+
+def audit_partitions(scale: SyntheticScale, seed: int) -> Dict[str, Tuple[str, Callable[[], Iterator[Dict[str, Any]]]]]:
+    """Monthly partition name -> (base collection, document factory) for the audit history."""
+
+    partitions: Dict[str, Tuple[str, List[Tuple[int, datetime]]]] = {}
+    for collection in ("auth_logs", "activity_logs"):
+        for offset, day in enumerate(scale.dates()):
+            partitions.setdefault(partition_name(collection, day), (collection, []))[1].append((offset, day))
+
+    def factory(name: str, collection: str, days: List[Tuple[int, datetime]]) -> Callable[[], Iterator[Dict[str, Any]]]:
+        share = AUTH_EVENT_SHARE if collection == "auth_logs" else 1 - AUTH_EVENT_SHARE
+        per_day = scale.audit_events * share / scale.days
+
+        def documents() -> Iterator[Dict[str, Any]]:
+            rng, _ = _random(seed, name)
+            for offset, day in days:
+                # Cumulative rounding keeps the total exact across days.
+                for _ in range(round((offset + 1) * per_day) - round(offset * per_day)):
+                    yield _audit_document(collection, rng, day + timedelta(seconds=rng.randrange(86_400)), scale)
+
+        return documents
+
+    return {name: (collection, factory(name, collection, days)) for name, (collection, days) in partitions.items()}
+
+
+def synthetic_collections(scale: SyntheticScale, seed: int) -> Dict[str, Callable[[], Iterator[Dict[str, Any]]]]:
+    """Collection name -> document factory, smallest collections first."""
+
+    generators: Dict[str, Callable[[SyntheticScale, int], Iterator[Dict[str, Any]]]] = {
+        "staff": staff_documents,
+        "equipment_availability": equipment_documents,
+        "ot_availability": ot_documents,
+        "nurse_availability": nurse_documents,
+        "users": user_documents,
+        "surgeries": surgery_documents,
+        "test_history": test_history_documents,
+        VITALS_SERIES_COLLECTION: vitals_documents,
+    }
+    collections = {name: (lambda generator=generator: generator(scale, seed)) for name, generator in generators.items()}
+    collections.update({name: factory for name, (_, factory) in audit_partitions(scale, seed).items()})
+    return collections
+
+
+@dataclass
+class InsertStats:
+    collection: str
+    documents: int
+    errors: int
+    seconds: float
+
+    @property
+    def rate(self) -> float:
+        return self.documents / self.seconds if self.seconds else 0.0
+
+
+def _batches(documents: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert_batch(collection: Collection, batch: List[Dict[str, Any]]) -> Tuple[int, int]:
+    try:
+        collection.insert_many(batch, ordered=False)
+    except BulkWriteError as exc:
+        # Unordered: everything except the failed documents was written.
+        return exc.details.get("nInserted", 0), len(exc.details.get("writeErrors", []))
+    return len(batch), 0
+
+
+class BulkLoader:
+    """Inserts generated documents as parallel unordered ``insert_many`` batches.
+
+    The main thread keeps generating the next batches while ``workers`` threads wait on
+    the server; at most ``2 * workers`` batches are held in memory at once.
+    """
+
+    def __init__(self, database: Database, batch_size: int = 1_000, workers: int = 4) -> None:
+        self._db = database
+        self.batch_size = batch_size
+        self.workers = workers
+
+    def load(self, name: str, documents: Iterable[Dict[str, Any]]) -> InsertStats:
+        collection = self._db[name]
+        inserted = errors = 0
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"seed-{name}") as executor:
+            pending: Set[Future] = set()
+            for batch in _batches(documents, self.batch_size):
+                if len(pending) >= 2 * self.workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        written, failed = future.result()
+                        inserted, errors = inserted + written, errors + failed
+                pending.add(executor.submit(_insert_batch, collection, batch))
+            for future in wait(pending).done:
+                written, failed = future.result()
+                inserted, errors = inserted + written, errors + failed
+        return InsertStats(name, inserted, errors, time.perf_counter() - started)
+
+
+def _reset_collections(database: Database, names: Iterable[str]) -> None:
+    for name in names:
+        if name == "users":
+            # Keep real accounts (including the demo login); only replace synthetic ones.
+            database.users.delete_many({"email": {"$regex": f"@{SYNTHETIC_EMAIL_DOMAIN.replace('.', '[.]')}$"}})
+        else:
+            database.drop_collection(name)
+    try:
+        database.create_collection(
+            VITALS_SERIES_COLLECTION,
+            timeseries={"timeField": "captured_at", "metaField": "patient_id", "granularity": "seconds"},
+        )
+    except (CollectionInvalid, OperationFailure):
+        # Servers before 5.0 have no time-series collections; a plain one still works.
+        pass
+
+
+def seed_synthetic(
+    database: Database, scale: SyntheticScale, seed: int, batch_size: int = 1_000, workers: int = 4
+) -> List[InsertStats]:
+    """Replace the generated collections with the dataset for ``scale`` and ``seed``.
+
+    Registry indexes are left to the app's startup migration, which builds them faster
+    over existing data than they could be maintained during the load; audit partitions
+    get theirs here, since the app only indexes partitions it writes to.
+    """
+
+    collections = synthetic_collections(scale, seed)
+    partitions = audit_partitions(scale, seed)
+    _reset_collections(database, collections)
+    loader = BulkLoader(database, batch_size, workers)
+    report: List[InsertStats] = []
+    for name, documents in collections.items():
+        stats = loader.load(name, documents())
+        report.append(stats)
+        print(f"{name:<28}{stats.documents:>12,}{stats.errors:>8}{stats.seconds:>10.1f}{stats.rate:>14,.0f}", flush=True)
+    for name, (collection, _) in partitions.items():
+        database[name].create_indexes(PARTITION_INDEXES[collection])
+    return report
+
+
+def seed_demo() -> None:
     target_date = datetime(2025, 4, 2)
     seed_staff()
     seed_nurse_availability(target_date)
@@ -179,5 +608,36 @@ def main() -> None:
     print("✅ Database seeded with sample data.")
 
 
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--synthetic", action="store_true", help="generate the capacity-testing dataset")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every count except --days")
+    defaults = SyntheticScale()
+    for field in fields(SyntheticScale):
+        if field.name != "start_date":
+            parser.add_argument(f"--{field.name.replace('_', '-')}", type=int, default=getattr(defaults, field.name))
+    parser.add_argument("--start-date", default=SYNTHETIC_START_DATE.isoformat())
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    parser.add_argument("--workers", type=int, default=4, help="concurrent insert_many calls")
+    args = parser.parse_args()
+
+    if not args.synthetic:
+        seed_demo()
+        return
+
+    scale = SyntheticScale(
+        **{field.name: getattr(args, field.name) for field in fields(SyntheticScale) if field.name != "start_date"},
+        start_date=date.fromisoformat(args.start_date),
+    ).scaled(args.scale)
+    print(f"{'collection':<28}{'documents':>12}{'errors':>8}{'seconds':>10}{'docs/s':>14}")
+    started = time.perf_counter()
+    report = seed_synthetic(db, scale, args.seed, args.batch_size, args.workers)
+    elapsed = time.perf_counter() - started
+    total = sum(stats.documents for stats in report)
+    print(f"{'total':<28}{total:>12,}{sum(stats.errors for stats in report):>8}{elapsed:>10.1f}{total / elapsed:>14,.0f}")
+    print(f"Log in as {_user_email(0)} / {SYNTHETIC_PASSWORD} (admin).")
+
+
 if __name__ == "__main__":
     main()
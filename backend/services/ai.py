@@ -4,6 +4,7 @@ import asyncio
 import hashlib
 import json
 import logging
+import time
 from datetime import timedelta
 from typing import List, Optional, Sequence
 
@@ -16,6 +17,8 @@ from backend.models import (
     Resource,
     ScenarioFeedbackPayload,
 )
+from backend.observability.metrics import SCHEDULER_RUN_SECONDS
+from backend.observability.tracing import trace_methods
 from backend.repositories.scheduling_repository import SchedulingRepository
 from backend.services.availability import AvailabilityService, TTLCache
 from backend.services.audit import AuditService
@@ -29,6 +32,7 @@ def _hash_payload(payload: Sequence[str]) -> str:
     return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
 
 
+@trace_methods
 class AIOptimizationService:
     """Heuristic optimisation engine for availability planning."""
 
@@ -219,6 +223,7 @@ class AIOptimizationService:
         self._last_retrained = current_timestamp()
 
 
+@trace_methods
 class OptimizedAvailabilityService:
     def __init__(
         self,
@@ -233,7 +238,7 @@ class OptimizedAvailabilityService:
         self._ai_service = ai_service
         self._repository = repository
         self._audit = audit_service
-        self._cache = TTLCache(ttl_seconds=cache_ttl_seconds)
+        self._cache = TTLCache(ttl_seconds=cache_ttl_seconds, name="optimized_availability")
         self._cache_ttl = cache_ttl_seconds
 
     async def optimized_availability(self, req: AvailabilityRequest) -> OptimizedAvailabilityResponse:
@@ -325,10 +330,14 @@ class OptimizationScheduler:
     async def _run(self) -> None:
         assert self._stop_event is not None
         while not self._stop_event.is_set():
+            started = time.perf_counter()
+            outcome = "success"
             try:
                 await self._ai_service.refresh_model()
             except Exception as exc:  # pragma: no cover - defensive logging
+                outcome = "error"
                 LOGGER.error("Failed to refresh optimisation model: %s", exc)
+            SCHEDULER_RUN_SECONDS.observe(time.perf_counter() - started, "optimization", outcome)
             try:
                 await asyncio.wait_for(self._stop_event.wait(), timeout=self._interval)
             except asyncio.TimeoutError:
@@ -1,15 +1,207 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+import asyncio
+import csv
+import io
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
 
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from backend.services.common import current_timestamp
+from backend.db.migrations import MIGRATIONS_COLLECTION, run_once
+from backend.observability.metrics import SCHEDULER_RUN_SECONDS
+from backend.observability.tracing import trace_methods
+from backend.repositories.audit_repository import AuditRepository
+from backend.services.common import current_timestamp, decode_cursor, encode_cursor, json_default, serialize_doc
 
+try:  # pragma: no cover - support package/script usage
+    from config import (
+        AUDIT_ARCHIVE_DB_NAME,
+        AUDIT_BATCH_SIZE,
+        AUDIT_DURABILITY,
+        AUDIT_FLUSH_INTERVAL_SECONDS,
+        AUDIT_QUEUE_MAX_SIZE,
+        AUDIT_RETENTION_MONTHS,
+        AUDIT_SYNC_EVENTS,
+    )
+except ImportError:  # pragma: no cover - fallback for package imports
+    from backend.config import (  # type: ignore
+        AUDIT_ARCHIVE_DB_NAME,
+        AUDIT_BATCH_SIZE,
+        AUDIT_DURABILITY,
+        AUDIT_FLUSH_INTERVAL_SECONDS,
+        AUDIT_QUEUE_MAX_SIZE,
+        AUDIT_RETENTION_MONTHS,
+        AUDIT_SYNC_EVENTS,
+    )
 
+LOGGER = logging.getLogger(__name__)
+
+AUTH_LOGS = "auth_logs"
+ACTIVITY_LOGS = "activity_logs"
+
+EXPORT_FORMATS = ("ndjson", "csv")
+# Audit cursors are (timestamp, _id); anything else would fail deep in partition routing.
+CURSOR_TYPES = (datetime, ObjectId)
+RETENTION_MARKER_PREFIX = "audit.retention:"
+ACTIVITY_CSV_COLUMNS = ("_id", "timestamp", "action", "performed_by", "patient_id", "payload", "cursor")
+
+
+@dataclass
+class AuditRecord:
+    collection: str
+    document: Dict[str, Any]
+    flushed: Optional[asyncio.Future] = None
+
+
+_STOP = object()
+
+
+class AuditWriter:
+    """Buffers audit documents in memory and writes them in ``insert_many`` batches.
+
+    A batch is flushed once it reaches ``batch_size`` documents or ``flush_interval``
+    seconds after its first document was queued, or as soon as it holds a document a
+    caller is waiting on (``wait=True``). The queue is bounded, so producers
+    wait when the database falls behind instead of growing memory without limit.
+    """
+
+    def __init__(
+        self,
+        repository: AuditRepository,
+        *,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL_SECONDS,
+        max_queue_size: int = AUDIT_QUEUE_MAX_SIZE,
+    ) -> None:
+        self._repository = repository
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = flush_interval
+        self._max_queue_size = max_queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done() and not self._closing
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._closing = False
+        self._queue = asyncio.Queue(maxsize=self._max_queue_size)
+        loop = asyncio.get_event_loop()
+        self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush everything queued so far and stop the background task."""
+
+        if not self._task:
+            return
+        if self.running and self._queue is not None:
+            self._closing = True
+            await self._queue.put(_STOP)
+        try:
+            await self._task
+        except Exception as exc:  # pragma: no cover - logged and suppressed
+            LOGGER.error("Audit writer terminated with error: %s", exc)
+        finally:
+            self._task = None
+            self._queue = None
+
+    async def write(self, collection: str, document: Dict[str, Any], *, wait: bool = False) -> None:
+        if not self.running or self._queue is None:
+            # Not started (scripts, tests) or already stopped: write through.
+            await self._repository.insert_many(collection, [document])
+            return
+
+        flushed = asyncio.get_running_loop().create_future() if wait else None
+        await self._queue.put(AuditRecord(collection=collection, document=document, flushed=flushed))
+        if flushed is not None:
+            await flushed
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        stopping = False
+        while not stopping:
+            item = await queue.get()
+            if item is _STOP:
+                break
+            batch: List[AuditRecord] = [item]
+            waited_on = item.flushed is not None
+            deadline = asyncio.get_running_loop().time() + self._flush_interval
+            while len(batch) < self._batch_size:
+                if waited_on:
+                    # A request is blocked on this batch: take only what is already queued.
+                    if queue.empty():
+                        break
+                    item = queue.get_nowait()
+                else:
+                    remaining = deadline - asyncio.get_running_loop().time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                waited_on = waited_on or item.flushed is not None
+            await self._flush(batch)
+
+        # Producers that were blocked on a full queue may have enqueued behind the sentinel.
+        leftovers: List[AuditRecord] = []
+        while not queue.empty():
+            item = queue.get_nowait()
+            if item is not _STOP:
+                leftovers.append(item)
+        if leftovers:
+            await self._flush(leftovers)
+
+    async def _flush(self, batch: Iterable[AuditRecord]) -> None:
+        grouped: Dict[str, List[AuditRecord]] = {}
+        for record in batch:
+            grouped.setdefault(record.collection, []).append(record)
+
+        for collection, records in grouped.items():
+            try:
+                await self._repository.insert_many(collection, [record.document for record in records])
+            except Exception as exc:
+                LOGGER.error("Failed to flush %d audit events to %s: %s", len(records), collection, exc)
+                for record in records:
+                    if record.flushed is not None and not record.flushed.done():
+                        record.flushed.set_exception(exc)
+                continue
+            for record in records:
+                if record.flushed is not None and not record.flushed.done():
+                    record.flushed.set_result(None)
+
+
+@trace_methods
 class AuditService:
-    def __init__(self, database: AsyncIOMotorDatabase) -> None:
+    def __init__(
+        self,
+        database: AsyncIOMotorDatabase,
+        writer: Optional[AuditWriter] = None,
+        *,
+        durability: str = AUDIT_DURABILITY,
+        sync_events: Iterable[str] = AUDIT_SYNC_EVENTS,
+    ) -> None:
         self._db = database
+        self._repository = AuditRepository(database)
+        self._writer = writer or AuditWriter(self._repository)
+        self._durability = durability
+        self._sync_events = frozenset(sync_events)
 
     async def log_auth_event(self, user_id: Optional[str], email: Optional[str], event: str, metadata: Optional[Dict[str, Any]] = None) -> None:
         doc = {
@@ -19,7 +211,7 @@ class AuditService:
             "metadata": metadata or {},
             "timestamp": current_timestamp(),
         }
-        await self._db.auth_logs.insert_one(doc)
+        await self._writer.write(AUTH_LOGS, doc, wait=self._must_wait(event))
 
     async def log_activity(self, action: str, performed_by: Optional[str], payload: Dict[str, Any]) -> None:
         doc = {
@@ -28,4 +220,229 @@ class AuditService:
             "payload": payload,
             "timestamp": current_timestamp(),
         }
-        await self._db.activity_logs.insert_one(doc)
+        await self._writer.write(ACTIVITY_LOGS, doc, wait=self._must_wait(action))
+
+    def _must_wait(self, event: str) -> bool:
+        return self._durability == "sync" or event in self._sync_events
+
+    async def query_activity(
+        self,
+        *,
+        performed_by: Optional[str] = None,
+        action: Optional[str] = None,
+        patient_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        query: Dict[str, Any] = {}
+        if performed_by:
+            query["performed_by"] = performed_by
+        if action:
+            query["action"] = action
+        if patient_id:
+            query["payload.patient_id"] = patient_id
+        return await self._query_page(ACTIVITY_LOGS, query, since, until, cursor, limit)
+
+    async def query_auth_events(
+        self,
+        *,
+        user_id: Optional[str] = None,
+        email: Optional[str] = None,
+        event: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        query: Dict[str, Any] = {}
+        if user_id:
+            query["user_id"] = user_id
+        if email:
+            query["email"] = email.lower()
+        if event:
+            query["event"] = event
+        return await self._query_page(AUTH_LOGS, query, since, until, cursor, limit)
+
+    async def export_activity(
+        self,
+        export_format: str = "ndjson",
+        *,
+        performed_by: Optional[str] = None,
+        action: Optional[str] = None,
+        patient_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        chunk_size: int = 500,
+    ) -> AsyncIterator[str]:
+        """Stream activity records oldest first as NDJSON lines or CSV rows.
+
+        Records are read straight off the database cursor in ``chunk_size`` batches, so
+        memory stays flat whatever the range. Every record carries the ``cursor`` token
+        that resumes the export right after it.
+        """
+
+        query: Dict[str, Any] = {}
+        if performed_by:
+            query["performed_by"] = performed_by
+        if action:
+            query["action"] = action
+        if patient_id:
+            query["payload.patient_id"] = patient_id
+        after = decode_cursor(cursor, types=CURSOR_TYPES) if cursor else None
+
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(ACTIVITY_CSV_COLUMNS)
+            yield buffer.getvalue()
+
+        documents = self._repository.iter_documents(
+            ACTIVITY_LOGS,
+            query,
+            since=since,
+            until=until,
+            after=after,
+            descending=False,
+            batch_size=chunk_size,
+        )
+        lines: List[str] = []
+        try:
+            async for doc in documents:
+                resume_token = encode_cursor([doc["timestamp"], doc["_id"]])
+                record = serialize_doc(doc)
+                if export_format == "csv":
+                    buffer = io.StringIO()
+                    csv.writer(buffer).writerow(
+                        [
+                            record["_id"],
+                            record["timestamp"],
+                            record.get("action"),
+                            record.get("performed_by"),
+                            (record.get("payload") or {}).get("patient_id"),
+                            json.dumps(record.get("payload") or {}, default=json_default, sort_keys=True),
+                            resume_token,
+                        ]
+                    )
+                    lines.append(buffer.getvalue())
+                else:
+                    record["cursor"] = resume_token
+                    lines.append(json.dumps(record, default=json_default) + "\n")
+                if len(lines) >= chunk_size:
+                    yield "".join(lines)
+                    lines = []
+            if lines:
+                yield "".join(lines)
+        finally:
+            await documents.aclose()
+
+    async def enforce_retention(
+        self,
+        retention_months: int = AUDIT_RETENTION_MONTHS,
+        archive_db_name: str = AUDIT_ARCHIVE_DB_NAME,
+    ) -> List[str]:
+        """Archive or drop monthly partitions older than ``retention_months``."""
+
+        if retention_months <= 0:
+            return []
+        now = current_timestamp()
+        month_index = now.year * 12 + (now.month - 1) - retention_months
+        cutoff = (month_index // 12, month_index % 12 + 1)
+        expired: List[str] = []
+        # Partitions expire a month at a time, so one pass per cutoff month is enough;
+        # markers of earlier cutoffs are pruned so they do not pile up.
+        marker = f"{RETENTION_MARKER_PREFIX}{cutoff[0]:04d}-{cutoff[1]:02d}"
+
+        async def operation() -> None:
+            for collection in (AUTH_LOGS, ACTIVITY_LOGS):
+                expired.extend(await self._repository.apply_retention(collection, cutoff, archive_db_name))
+            await self._db[MIGRATIONS_COLLECTION].delete_many(
+                {"_id": {"$regex": f"^{re.escape(RETENTION_MARKER_PREFIX)}", "$ne": marker}}
+            )
+
+        await run_once(self._db, marker, operation)
+        return expired
+
+    async def _query_page(
+        self,
+        collection: str,
+        query: Dict[str, Any],
+        since: Optional[datetime],
+        until: Optional[datetime],
+        cursor: Optional[str],
+        limit: int,
+    ) -> Dict[str, Any]:
+        after = decode_cursor(cursor, types=CURSOR_TYPES) if cursor else None
+        items: List[Dict[str, Any]] = []
+        next_cursor: Optional[str] = None
+        documents = self._repository.iter_documents(
+            collection,
+            query,
+            since=since,
+            until=until,
+            after=after,
+            batch_size=limit + 1,
+        )
+        try:
+            async for doc in documents:
+                if len(items) == limit:
+                    last = items[-1]
+                    next_cursor = encode_cursor([last["timestamp"], last["_id"]])
+                    break
+                items.append(doc)
+        finally:
+            await documents.aclose()
+        return {"items": [serialize_doc(doc) for doc in items], "next_cursor": next_cursor}
+
+
+class AuditRetentionScheduler:
+    def __init__(
+        self,
+        audit_service: AuditService,
+        *,
+        interval_seconds: int = 60 * 60 * 24,
+    ) -> None:
+        self._audit_service = audit_service
+        self._interval = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._stop_event: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        if self._task and not self._task.done():
+            return
+        self._stop_event = asyncio.Event()
+        loop = asyncio.get_event_loop()
+        self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+        if self._stop_event:
+            self._stop_event.set()
+        try:
+            await self._task
+        except Exception as exc:  # pragma: no cover - logged and suppressed
+            LOGGER.error("Audit retention scheduler terminated with error: %s", exc)
+        finally:
+            self._task = None
+            self._stop_event = None
+
+    async def _run(self) -> None:
+        assert self._stop_event is not None
+        while not self._stop_event.is_set():
+            started = time.perf_counter()
+            outcome = "success"
+            try:
+                expired = await self._audit_service.enforce_retention()
+                if expired:
+                    LOGGER.info("Audit retention expired partitions: %s", ", ".join(expired))
+            except Exception as exc:  # pragma: no cover - defensive logging
+                outcome = "error"
+                LOGGER.error("Failed to enforce audit retention: %s", exc)
+            SCHEDULER_RUN_SECONDS.observe(time.perf_counter() - started, "audit_retention", outcome)
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self._interval)
+            except asyncio.TimeoutError:
+                continue
@@ -213,8 +213,8 @@ class AuthService:
         await self._audit.log_auth_event(str(user_doc["_id"]), email, "password_change", {})
         return {"detail": "Password updated"}
 
-    async def ensure_default_roles(self) -> None:
-        await self._users.ensure_default_roles(DEFAULT_USER_ROLES)
+    async def ensure_default_roles(self) -> bool:
+        return await self._users.ensure_default_roles(DEFAULT_USER_ROLES)
 
     def _hash_password(self, password: str) -> str:
         if len(password.encode("utf-8")) > 72:
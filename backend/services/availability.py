@@ -4,11 +4,14 @@ import asyncio
 import time
 from dataclasses import dataclass
 from datetime import date, datetime
-from typing import Awaitable, Callable, Dict, List, Optional
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 
 from fastapi import HTTPException, status
 
 from backend.models import AvailabilityRequest, AvailabilityResponse, Resource
+from backend.observability.memory import register_cache
+from backend.observability.metrics import CACHE_EVENTS
+from backend.observability.tracing import add_span_event, set_span_attribute, trace_methods, traced
 from backend.repositories.scheduling_repository import SchedulingRepository
 
 
@@ -19,23 +22,38 @@ class CacheEntry:
 
 
 class TTLCache:
-    def __init__(self, ttl_seconds: float = 60.0) -> None:
+    def __init__(self, ttl_seconds: float = 60.0, *, name: str = "default") -> None:
         self._ttl = ttl_seconds
         self._store: Dict[str, CacheEntry] = {}
+        self.name = name
+        register_cache(self)
 
     def get(self, key: str) -> Optional[object]:
         entry = self._store.get(key)
         if not entry:
+            CACHE_EVENTS.inc(self.name, "miss")
+            add_span_event("cache.miss", cache=self.name)
             return None
         if entry.expires_at < time.monotonic():
             self._store.pop(key, None)
+            CACHE_EVENTS.inc(self.name, "eviction")
+            CACHE_EVENTS.inc(self.name, "miss")
+            add_span_event("cache.miss", cache=self.name, expired=True)
             return None
+        CACHE_EVENTS.inc(self.name, "hit")
+        add_span_event("cache.hit", cache=self.name)
         return entry.value
 
     def set(self, key: str, value: object) -> None:
         self._store[key] = CacheEntry(value=value, expires_at=time.monotonic() + self._ttl)
 
+    def memory_items(self) -> List[Tuple[str, object, float]]:
+        """``(key, value, expires_at)`` for every stored entry, expired ones included."""
 
+        return [(key, entry.value, entry.expires_at) for key, entry in list(self._store.items())]
+
+
+@trace_methods
 class AvailabilityService:
     def __init__(
         self,
@@ -46,7 +64,7 @@ class AvailabilityService:
         base_delay: float = 0.05,
     ) -> None:
         self._repository = repository
-        self._cache = cache or TTLCache()
+        self._cache = cache or TTLCache(name="availability")
         self._max_attempts = max_attempts
         self._base_delay = base_delay
 
@@ -123,6 +141,7 @@ class AvailabilityService:
             match_status="Requirements matched" if match else "Requirements not met",
         )
 
+    @traced("AvailabilityService.fetch_staff")
     async def _fetch_staff(
         self,
         role: str,
@@ -131,6 +150,7 @@ class AvailabilityService:
         end: str,
         constraint: str,
     ) -> List[Resource]:
+        set_span_attribute("availability.resource", role)
         cache_key = f"staff:{role}:{target_date.isoformat()}:{start}:{end}:{constraint}"
         cached = self._cache.get(cache_key)
         if cached is not None:
@@ -152,6 +172,7 @@ class AvailabilityService:
         self._cache.set(cache_key, resources)
         return resources
 
+    @traced("AvailabilityService.fetch_generic")
     async def _fetch_generic(
         self,
         collection: str,
@@ -163,6 +184,7 @@ class AvailabilityService:
         name_field: str,
         email_field: Optional[str] = None,
     ) -> List[Resource]:
+        set_span_attribute("availability.resource", collection)
         cache_key = f"generic:{collection}:{target_date.isoformat()}:{start}:{end}:{constraint}:{identifier}:{name_field}:{email_field or '-'}"
         cached = self._cache.get(cache_key)
         if cached is not None:
@@ -223,7 +245,9 @@ class AvailabilityService:
             attempt += 1
             try:
                 return await operation()
-            except Exception:
+            except Exception as exc:
                 if attempt >= self._max_attempts:
                     raise
-                await asyncio.sleep(self._base_delay * (2 ** (attempt - 1)))
+                delay = self._base_delay * (2 ** (attempt - 1))
+                add_span_event("retry", attempt=attempt, delay_seconds=delay, **{"exception.type": type(exc).__name__})
+                await asyncio.sleep(delay)
@@ -1,28 +1,124 @@
 from __future__ import annotations
 
-from typing import Dict, List
+import asyncio
+import hashlib
+import json
+import re
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterable, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
+from bson import ObjectId
 from fastapi import HTTPException, status
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
 
 from backend.models import (
     PublishPayload,
     SurgeryUpdatePayload,
+    TaskPatchPayload,
     TaskUpdatePayload,
+    TimelinePatchPayload,
     TimelineUpdatePayload,
     CrewUpdatePayload,
     VitalsPayload,
 )
 from backend.repositories.care_repository import CareRepository
 from backend.services.audit import AuditService
-from backend.services.common import current_timestamp, serialize_doc, to_object_id
+from backend.services.common import (
+    ResourceVersion,
+    current_timestamp,
+    decode_cursor,
+    json_default,
+    keyset_page,
+    resource_version,
+    serialize_doc,
+    to_naive_utc,
+    to_object_id,
+)
+from backend.services.events import EventBroker, doctor_topic, patient_topic
+
+try:  # pragma: no cover - support package/script usage
+    from config import VITALS_INGEST_BATCH_SIZE
+except ImportError:  # pragma: no cover - fallback for package imports
+    from backend.config import VITALS_INGEST_BATCH_SIZE  # type: ignore
+
+DASHBOARD_SECTIONS = ("tasks", "crew", "timeline", "vitals", "published")
+VITALS_MAX_POINTS = 20000
+DEFAULT_PAGE_SIZE = 50
+# Keyset cursor value types; a token decoding to anything else (e.g. an operator
+# document) is rejected before it reaches the query.
+SURGERY_CURSOR_TYPES = (str, ObjectId)  # (date, _id)
+PLAN_CURSOR_TYPES = (datetime, ObjectId)  # (created_at, _id)
+# Fields that make up a document's ETag; see ``resource_version``.
+VERSION_PROJECTION = {"updated_at": 1, "version": 1}
+# Per-item errors echoed back from a bulk ingest; the rejected count is always exact.
+VITALS_INGEST_MAX_REPORTED_ERRORS = 1000
+
+# Published plan parts stored once per distinct content in ``plan_sections``.
+PLAN_SECTIONS = ("timeline", "crew", "tasks", "vitals", "optimization_insights")
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def section_hash(value: Any) -> Optional[str]:
+    """Content address of a plan section: SHA-256 of its canonical JSON form."""
+
+    if value is None:
+        return None
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), default=json_default)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def patch_guards(operations: List[Dict[str, Any]]) -> Tuple[List[str], List[str]]:
+    """Return the element keys that must already exist / must not exist for ``operations``.
+
+    Keys inserted or removed earlier in the same patch are tracked so that, for example,
+    inserting a step and then moving it is valid. Inconsistent patches raise 422.
+    """
+
+    present: List[str] = []
+    absent: List[str] = []
+    exists: Dict[str, bool] = {}
+    for operation in operations:
+        target = operation["target"]
+        if operation["op"] == "insert":
+            if exists.get(target):
+                raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Duplicate item: {target}")
+            if target not in exists:
+                absent.append(target)
+            exists[target] = True
+            continue
+        if exists.get(target) is False:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Unknown item: {target}")
+        if target not in exists:
+            present.append(target)
+        exists[target] = operation["op"] != "remove"
+    return present, absent
+
+
+def parse_vital_metrics(heart_rate: Optional[str], blood_pressure: Optional[str], spo2: Optional[str]) -> Dict[str, Optional[float]]:
+    """Extract numeric readings from the free-text vitals fields ("72 bpm", "120/80", "98%")."""
+
+    def first_number(value: Optional[str]) -> Optional[float]:
+        match = _NUMBER.search(value or "")
+        return float(match.group()) if match else None
+
+    pressures = _NUMBER.findall(blood_pressure or "")
+    return {
+        "heart_rate": first_number(heart_rate),
+        "systolic": float(pressures[0]) if len(pressures) > 0 else None,
+        "diastolic": float(pressures[1]) if len(pressures) > 1 else None,
+        "spo2": first_number(spo2),
+    }
 
 
 class CareService:
-    def __init__(self, repository: CareRepository, audit: AuditService) -> None:
+    def __init__(self, repository: CareRepository, audit: AuditService, events: Optional[EventBroker] = None) -> None:
         self._repository = repository
         self._audit = audit
+        self._events = events
 
-    async def update_tasks(self, payload: TaskUpdatePayload, performed_by: str) -> Dict[str, str]:
+    async def update_tasks(self, payload: TaskUpdatePayload, performed_by: str) -> Dict[str, Any]:
         now = current_timestamp()
         filter_doc = {
             "patient_id": payload.patient_id,
@@ -31,7 +127,7 @@ class CareService:
             "staff_role": payload.staff_role,
         }
         task_docs = [task.model_dump(exclude_none=True) for task in payload.tasks]
-        await self._repository.upsert_tasks(
+        saved = await self._repository.upsert_tasks(
             filter_doc,
             {
                 **filter_doc,
@@ -39,12 +135,51 @@ class CareService:
                 "updated_at": now,
             },
         )
-        await self._audit.log_activity(
+        await self._after_write(
             "tasks.update",
             performed_by,
             {"patient_id": payload.patient_id, "scope": payload.scope, "updated_at": now},
+            "tasks.updated",
+            [patient_topic(payload.patient_id)],
+            {**filter_doc, "updated_at": now},
+        )
+        return {"detail": "Tasks updated", "version": saved["version"]}
+
+    async def patch_tasks(self, payload: TaskPatchPayload, performed_by: str) -> Dict[str, Any]:
+        filter_doc = {
+            "patient_id": payload.patient_id,
+            "scope": payload.scope,
+            "staff_name": payload.staff_name,
+            "staff_role": payload.staff_role,
+        }
+        operations = [
+            {
+                "op": operation.op,
+                "target": operation.task.label if operation.op == "insert" else operation.label,
+                "changes": operation.changes.model_dump(exclude_none=True) if operation.changes else None,
+                "item": operation.task.model_dump(exclude_none=True) if operation.task else None,
+                "position": operation.position,
+            }
+            for operation in payload.operations
+        ]
+        result = await self._apply_patch(
+            self._repository.patch_tasks, "tasks", "tasks.label", filter_doc, payload.expected_version, operations
+        )
+        await self._after_write(
+            "tasks.patch",
+            performed_by,
+            {
+                "patient_id": payload.patient_id,
+                "scope": payload.scope,
+                "operations": [{"op": op["op"], "target": op["target"]} for op in operations],
+                "version": result["version"],
+                "updated_at": result["updated_at"],
+            },
+            "tasks.updated",
+            [patient_topic(payload.patient_id)],
+            {**filter_doc, **result},
         )
-        return {"detail": "Tasks updated"}
+        return {"detail": "Tasks updated", **result}
 
     async def update_crew(self, payload: CrewUpdatePayload, performed_by: str) -> Dict[str, str]:
         now = current_timestamp()
@@ -57,16 +192,19 @@ class CareService:
                 "updated_at": now,
             },
         )
-        await self._audit.log_activity(
+        await self._after_write(
             "crew.update",
             performed_by,
             {"patient_id": payload.patient_id, "updated_at": now},
+            "crew.updated",
+            [patient_topic(payload.patient_id)],
+            {"patient_id": payload.patient_id, "updated_at": now},
         )
         return {"detail": "Crew updated"}
 
-    async def update_timeline(self, payload: TimelineUpdatePayload, performed_by: str) -> Dict[str, str]:
+    async def update_timeline(self, payload: TimelineUpdatePayload, performed_by: str) -> Dict[str, Any]:
         now = current_timestamp()
-        await self._repository.upsert_timeline(
+        saved = await self._repository.upsert_timeline(
             {"patient_id": payload.patient_id},
             {
                 "patient_id": payload.patient_id,
@@ -74,52 +212,321 @@ class CareService:
                 "updated_at": now,
             },
         )
-        await self._audit.log_activity(
+        await self._after_write(
             "timeline.update",
             performed_by,
             {"patient_id": payload.patient_id, "updated_at": now},
+            "timeline.updated",
+            [patient_topic(payload.patient_id)],
+            {"patient_id": payload.patient_id, "updated_at": now},
+        )
+        return {"detail": "Timeline updated", "version": saved["version"]}
+
+    async def patch_timeline(self, payload: TimelinePatchPayload, performed_by: str) -> Dict[str, Any]:
+        filter_doc = {"patient_id": payload.patient_id}
+        operations = [
+            {
+                "op": operation.op,
+                "target": operation.step.id if operation.op == "insert" else operation.step_id,
+                "changes": operation.changes.model_dump(exclude_none=True) if operation.changes else None,
+                "item": operation.step.model_dump() if operation.step else None,
+                "position": operation.position,
+            }
+            for operation in payload.operations
+        ]
+        result = await self._apply_patch(
+            self._repository.patch_timeline, "timeline", "steps.id", filter_doc, payload.expected_version, operations
+        )
+        await self._after_write(
+            "timeline.patch",
+            performed_by,
+            {
+                "patient_id": payload.patient_id,
+                "operations": [{"op": op["op"], "target": op["target"]} for op in operations],
+                "version": result["version"],
+                "updated_at": result["updated_at"],
+            },
+            "timeline.updated",
+            [patient_topic(payload.patient_id)],
+            {**filter_doc, **result},
+        )
+        return {"detail": "Timeline updated", **result}
+
+    async def _apply_patch(
+        self,
+        patch: Callable[..., Any],
+        collection: str,
+        key_path: str,
+        filter_doc: Dict[str, Any],
+        expected_version: int,
+        operations: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        present, absent = patch_guards(operations)
+        result = await patch(
+            filter_doc,
+            expected_version,
+            operations,
+            present=present,
+            absent=absent,
+            updated_at=current_timestamp(),
+        )
+        if result is not None:
+            return result
+
+        # The guarded update matched nothing; read the current state to say why.
+        current = await self._repository.fetch_patch_state(collection, filter_doc, key_path)
+        if current is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No {collection} found to patch")
+        current_version = current.get("version") or 0
+        if current_version != expected_version:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={"message": "Version conflict", "current_version": current_version},
+            )
+        field, key = key_path.split(".")
+        keys = {item.get(key) for item in current.get(field) or []}
+        missing = [target for target in present if target not in keys]
+        if missing:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Unknown item: {missing[0]}")
+        duplicate = next((target for target in absent if target in keys), None)
+        if duplicate is not None:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Duplicate item: {duplicate}")
+        # Changed and changed back between the update and this read.
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "Version conflict", "current_version": current_version},
         )
-        return {"detail": "Timeline updated"}
 
     async def record_vitals(self, payload: VitalsPayload, performed_by: str) -> Dict[str, str]:
-        now = payload.captured_at or current_timestamp()
-        record = payload.model_dump()
-        record["captured_at"] = now
-        record["recorded_at"] = current_timestamp()
-        record["recorded_by"] = performed_by
+        record = self._vitals_record(payload, performed_by)
         await self._repository.record_vitals(record)
-        await self._audit.log_activity(
+        await self._after_write(
             "vitals.record",
             performed_by,
-            {"patient_id": payload.patient_id, "captured_at": now},
+            {"patient_id": payload.patient_id, "captured_at": record["captured_at"]},
+            "vitals.recorded",
+            [patient_topic(payload.patient_id)],
+            {"patient_id": payload.patient_id, "captured_at": record["captured_at"], "metrics": record["metrics"]},
         )
         return {"detail": "Vitals recorded"}
 
+    async def ingest_vitals(
+        self,
+        readings: AsyncIterable[Union[VitalsPayload, Dict[str, Any], str, bytes]],
+        performed_by: str,
+        *,
+        batch_size: int = VITALS_INGEST_BATCH_SIZE,
+    ) -> Dict[str, Any]:
+        """Validate and store a stream of readings in unordered ``insert_many`` batches.
+
+        Readings are pulled from ``readings`` only as fast as batches are written, so a
+        streaming request body is consumed with bounded memory. Invalid or rejected
+        readings are reported by their position in the input.
+        """
+
+        accepted = 0
+        rejected = 0
+        errors: List[Dict[str, Any]] = []
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+
+        def reject(index: int, message: str) -> None:
+            nonlocal rejected
+            rejected += 1
+            if len(errors) < VITALS_INGEST_MAX_REPORTED_ERRORS:
+                errors.append({"index": index, "error": message})
+
+        index = -1
+        async for item in readings:
+            index += 1
+            try:
+                if isinstance(item, VitalsPayload):
+                    payload = item
+                elif isinstance(item, (str, bytes)):
+                    payload = VitalsPayload.model_validate_json(item)
+                else:
+                    payload = VitalsPayload.model_validate(item)
+            except ValidationError as exc:
+                reject(
+                    index,
+                    "; ".join(
+                        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" if error["loc"] else error["msg"]
+                        for error in exc.errors()
+                    ),
+                )
+                continue
+            batch.append((index, self._vitals_record(payload, performed_by)))
+            if len(batch) >= batch_size:
+                accepted += await self._write_vitals_batch(batch, performed_by, reject)
+                batch = []
+        if batch:
+            accepted += await self._write_vitals_batch(batch, performed_by, reject)
+
+        return {"accepted": accepted, "rejected": rejected, "errors": errors}
+
+    async def _write_vitals_batch(self, batch: List[Tuple[int, Dict[str, Any]]], performed_by: str, reject: Callable[[int, str], None]) -> int:
+        records = [record for _, record in batch]
+        failed: set = set()
+        try:
+            await self._repository.record_vitals_many(records)
+        except BulkWriteError as exc:
+            for error in exc.details.get("writeErrors", []):
+                failed.add(error["index"])
+                reject(batch[error["index"]][0], error.get("errmsg", "Write failed"))
+        records = [record for position, record in enumerate(records) if position not in failed]
+        inserted = len(records)
+
+        if inserted:
+            patient_ids = sorted({record["patient_id"] for record in records})
+            await self._after_write(
+                "vitals.bulk_record",
+                performed_by,
+                {
+                    # A list keeps the batch findable through the payload.patient_id index.
+                    "patient_id": patient_ids,
+                    "count": inserted,
+                    "captured_from": min(record["captured_at"] for record in records),
+                    "captured_to": max(record["captured_at"] for record in records),
+                },
+                "vitals.recorded",
+                [patient_topic(patient_id) for patient_id in patient_ids],
+                {"patient_ids": patient_ids, "count": inserted},
+            )
+        return inserted
+
+    @staticmethod
+    def _vitals_record(payload: VitalsPayload, performed_by: str) -> Dict[str, Any]:
+        record = payload.model_dump()
+        record["captured_at"] = to_naive_utc(payload.captured_at) if payload.captured_at else current_timestamp()
+        record["recorded_at"] = current_timestamp()
+        record["recorded_by"] = performed_by
+        record["metrics"] = parse_vital_metrics(payload.heart_rate, payload.blood_pressure, payload.spo2)
+        return record
+
     async def fetch_tasks(self, patient_id: str) -> Dict[str, List[Dict]]:
-        items = [serialize_doc(doc) for doc in await self._repository.fetch_tasks(patient_id)]
-        return {"tasks": items}
+        return (await self.fetch_tasks_versioned(patient_id))[0]
+
+    async def fetch_tasks_versioned(self, patient_id: str) -> Tuple[Dict[str, List[Dict]], ResourceVersion]:
+        docs = await self._repository.fetch_tasks(patient_id)
+        items = [serialize_doc(doc) for doc in docs]
+        return {"tasks": items}, resource_version("tasks", patient_id, docs, "updated_at")
+
+    async def tasks_version(self, patient_id: str) -> ResourceVersion:
+        docs = await self._repository.fetch_tasks(patient_id, VERSION_PROJECTION)
+        return resource_version("tasks", patient_id, docs, "updated_at")
 
     async def fetch_crew(self, patient_id: str) -> Dict:
+        return (await self.fetch_crew_versioned(patient_id))[0]
+
+    async def fetch_crew_versioned(self, patient_id: str) -> Tuple[Dict, ResourceVersion]:
         doc = await self._repository.fetch_crew(patient_id)
+        version = resource_version("crew", patient_id, [doc], "updated_at")
         if not doc:
-            return {"patient_id": patient_id, "doctors": [], "nurses": []}
-        return serialize_doc(doc)  # type: ignore[return-value]
+            return {"patient_id": patient_id, "doctors": [], "nurses": []}, version
+        return serialize_doc(doc), version  # type: ignore[return-value]
+
+    async def crew_version(self, patient_id: str) -> ResourceVersion:
+        doc = await self._repository.fetch_crew(patient_id, VERSION_PROJECTION)
+        return resource_version("crew", patient_id, [doc], "updated_at")
 
     async def fetch_timeline(self, patient_id: str) -> Dict:
+        return (await self.fetch_timeline_versioned(patient_id))[0]
+
+    async def fetch_timeline_versioned(self, patient_id: str) -> Tuple[Dict, ResourceVersion]:
         doc = await self._repository.fetch_timeline(patient_id)
+        version = resource_version("timeline", patient_id, [doc], "updated_at")
         if not doc:
-            return {"patient_id": patient_id, "steps": []}
-        return serialize_doc(doc)  # type: ignore[return-value]
+            return {"patient_id": patient_id, "steps": []}, version
+        return serialize_doc(doc), version  # type: ignore[return-value]
+
+    async def timeline_version(self, patient_id: str) -> ResourceVersion:
+        doc = await self._repository.fetch_timeline(patient_id, VERSION_PROJECTION)
+        return resource_version("timeline", patient_id, [doc], "updated_at")
 
     async def fetch_latest_vitals(self, patient_id: str) -> Dict:
+        return (await self.fetch_latest_vitals_versioned(patient_id))[0]
+
+    async def fetch_latest_vitals_versioned(self, patient_id: str) -> Tuple[Dict, ResourceVersion]:
         doc = await self._repository.fetch_latest_vitals(patient_id)
+        version = resource_version("vitals", patient_id, [doc], "captured_at")
         if not doc:
-            return {"patient_id": patient_id, "heart_rate": None, "blood_pressure": None, "spo2": None}
-        return serialize_doc(doc)  # type: ignore[return-value]
+            return {"patient_id": patient_id, "heart_rate": None, "blood_pressure": None, "spo2": None}, version
+        return serialize_doc(doc), version  # type: ignore[return-value]
 
-    async def fetch_surgeries_for_doctor(self, doctor_id: str) -> Dict[str, List[Dict]]:
-        surgeries = [serialize_doc(doc) for doc in await self._repository.fetch_surgeries_for_doctor(doctor_id)]
-        return {"surgeries": surgeries}
+    async def latest_vitals_version(self, patient_id: str) -> ResourceVersion:
+        doc = await self._repository.fetch_latest_vitals(patient_id, {"captured_at": 1})
+        return resource_version("vitals", patient_id, [doc], "captured_at")
+
+    async def fetch_vitals_series(
+        self,
+        patient_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        bucket_seconds: Optional[int] = None,
+        limit: int = VITALS_MAX_POINTS,
+    ) -> Dict:
+        # Stored times are naive UTC; ``?from=...Z`` parses to an aware datetime.
+        until = to_naive_utc(until) if until else current_timestamp()
+        since = to_naive_utc(since) if since else until - timedelta(hours=24)
+        if since >= until:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'from' must be earlier than 'to'")
+        limit = min(limit, VITALS_MAX_POINTS)
+        if bucket_seconds:
+            points = await self._repository.aggregate_vitals_buckets(patient_id, since, until, bucket_seconds, limit)
+        else:
+            points = await self._repository.fetch_vitals_range(patient_id, since, until, limit)
+        return {
+            "patient_id": patient_id,
+            "from": since,
+            "to": until,
+            "bucket_seconds": bucket_seconds,
+            "points": points,
+        }
+
+    async def fetch_dashboard(self, patient_id: str, sections: Optional[Sequence[str]] = None) -> Dict:
+        """Fetch the requested patient sections concurrently into one document."""
+
+        requested = list(dict.fromkeys(sections or DASHBOARD_SECTIONS))
+        unknown = [section for section in requested if section not in DASHBOARD_SECTIONS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown dashboard sections: {', '.join(unknown)}",
+            )
+
+        loaders = {
+            "tasks": self._dashboard_tasks,
+            "crew": self.fetch_crew,
+            "timeline": self.fetch_timeline,
+            "vitals": self.fetch_latest_vitals,
+            "published": self._dashboard_published,
+        }
+        results = await asyncio.gather(*(loaders[section](patient_id) for section in requested))
+        return {"patient_id": patient_id, **dict(zip(requested, results))}
+
+    async def _dashboard_tasks(self, patient_id: str) -> List[Dict]:
+        return (await self.fetch_tasks(patient_id))["tasks"]
+
+    async def _dashboard_published(self, patient_id: str) -> List[Dict]:
+        return (await self.fetch_published_plans(patient_id))["plans"]
+
+    async def fetch_surgeries_for_doctor(
+        self,
+        doctor_id: str,
+        *,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Dict[str, Any]:
+        docs = await self._repository.fetch_surgeries_for_doctor(
+            doctor_id,
+            date_from=date_from,
+            date_to=date_to,
+            after=decode_cursor(cursor, types=SURGERY_CURSOR_TYPES) if cursor else None,
+            limit=limit,
+        )
+        page, next_cursor = keyset_page(docs, limit, ("date", "_id"))
+        return {"surgeries": [serialize_doc(doc) for doc in page], "next_cursor": next_cursor}
 
     async def update_surgery(self, surgery_id: str, payload: SurgeryUpdatePayload, performed_by: str) -> Dict:
         updates = payload.model_dump(exclude_unset=True, exclude_none=True)
@@ -128,37 +535,91 @@ class CareService:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No updates provided.")
         updates["updated_at"] = current_timestamp()
         object_id = to_object_id(surgery_id)
-        result = await self._repository.update_surgery(object_id, updates)
-        if result.matched_count == 0:
+        record = await self._repository.update_surgery(object_id, updates)
+        if record is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Surgery not found.")
-        record = await self._repository.find_surgery(object_id)
-        await self._audit.log_activity(
+        doctor_id = record.get("doctor_id")
+        await self._after_write(
             "surgeries.update",
             performed_by,
             {"surgery_id": surgery_id, "fields": list(updates.keys())},
+            "surgery.updated",
+            [doctor_topic(str(doctor_id))] if doctor_id else [],
+            {"surgery_id": surgery_id, "doctor_id": doctor_id, "fields": list(updates.keys())},
         )
-        if not record:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Surgery not found.")
         return serialize_doc(record)  # type: ignore[return-value]
 
-    async def fetch_published_plans(self, patient_id: str) -> Dict[str, List[Dict]]:
-        items = [serialize_doc(doc) for doc in await self._repository.fetch_published_plans(patient_id)]
-        return {"plans": items}
+    async def fetch_published_plans(self, patient_id: str, **page: Any) -> Dict[str, Any]:
+        return (await self.fetch_published_plans_versioned(patient_id, **page))[0]
+
+    async def fetch_published_plans_versioned(
+        self,
+        patient_id: str,
+        *,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Tuple[Dict[str, Any], ResourceVersion]:
+        docs = await self._repository.fetch_published_plans(
+            patient_id,
+            since=since,
+            until=until,
+            after=decode_cursor(cursor, types=PLAN_CURSOR_TYPES) if cursor else None,
+            limit=limit,
+        )
+        page, next_cursor = keyset_page(docs, limit, ("created_at", "_id"))
+        await self._hydrate_plans(page)
+        # The look-ahead document is part of the version because it decides next_cursor.
+        version = resource_version("published", patient_id, docs, "created_at")
+        return {"plans": [serialize_doc(doc) for doc in page], "next_cursor": next_cursor}, version
+
+    async def published_plans_version(
+        self,
+        patient_id: str,
+        *,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> ResourceVersion:
+        docs = await self._repository.fetch_published_plans(
+            patient_id,
+            {"created_at": 1},
+            since=since,
+            until=until,
+            after=decode_cursor(cursor, types=PLAN_CURSOR_TYPES) if cursor else None,
+            limit=limit,
+        )
+        return resource_version("published", patient_id, docs, "created_at")
 
     async def publish_plan(self, payload: PublishPayload, performed_by: str) -> Dict:
-        record = payload.model_dump()
+        record = payload.model_dump(exclude=set(PLAN_SECTIONS))
         now = current_timestamp()
         record["created_at"] = now
         record["status"] = "Published"
         record["tab"] = record.get("tab") or "preop"
         record["published_by"] = performed_by
+
+        section_values = {name: getattr(payload, name) for name in PLAN_SECTIONS}
+        record["sections"] = {name: section_hash(value) for name, value in section_values.items()}
+        blobs = {
+            digest: section_values[name]
+            for name, digest in record["sections"].items()
+            if digest is not None
+        }
+        # Sections first, then the record: a published record never references sections
+        # that do not exist yet. Sections are idempotent upserts shared by content, so a
+        # failed insert only leaves unreferenced blobs behind.
         try:
+            await self._repository.store_plan_sections(blobs, now)
             insert_result = await self._repository.insert_published_plan(record)
-            saved = await self._repository.find_published_plan(insert_result.inserted_id)
         except HTTPException:
             raise
         except Exception as exc:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Publish failed") from exc
+        # insert_one set record["_id"]; the response is built locally instead of re-reading it.
+        saved = {**record, **section_values}
 
         audit_payload = {
             "plan_id": payload.plan_id,
@@ -169,10 +630,23 @@ class CareService:
         if payload.optimization_insights:
             audit_payload["optimization"] = payload.optimization_insights
 
-        await self._audit.log_activity(
+        topics = [doctor_topic(payload.doctor_id)]
+        if payload.patient_id:
+            topics.append(patient_topic(payload.patient_id))
+        await self._after_write(
             "publish_plan",
             performed_by,
             audit_payload,
+            "plan.published",
+            topics,
+            {
+                "record_id": str(insert_result.inserted_id),
+                "plan_id": payload.plan_id,
+                "doctor_id": payload.doctor_id,
+                "patient_id": payload.patient_id,
+                "tab": record["tab"],
+                "published_at": now,
+            },
         )
         return {
             "message": "Plan published successfully",
@@ -180,14 +654,85 @@ class CareService:
             "plan": serialize_doc(saved),
         }
 
+    async def _after_write(
+        self,
+        action: str,
+        performed_by: str,
+        audit_payload: Dict[str, Any],
+        event_type: str,
+        topics: List[str],
+        data: Dict[str, Any],
+    ) -> None:
+        """Audit a committed write and push its change event concurrently.
+
+        With the default ``AUDIT_DURABILITY=async`` the audit entry is only queued for the
+        background writer, so neither step adds a database round trip to the response.
+        """
+
+        await asyncio.gather(
+            self._audit.log_activity(action, performed_by, audit_payload),
+            self._notify(event_type, topics, data),
+        )
+
+    async def _notify(self, event_type: str, topics: List[str], data: Dict[str, Any]) -> None:
+        if self._events is not None and topics:
+            await self._events.publish(event_type, topics, data)
+
     async def fetch_published_plan(self, record_id: str) -> Dict:
+        object_id = self._plan_object_id(record_id)
+        doc = await self._repository.find_published_plan(object_id)
+        if not doc:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plan not found")
+        await self._hydrate_plans([doc])
+        return serialize_doc(doc)  # type: ignore[return-value]
+
+    async def diff_published_plans(self, base_id: str, other_id: str) -> Dict[str, Any]:
+        """Compare two plan revisions section by section using their content hashes."""
+
+        base_oid, other_oid = self._plan_object_id(base_id), self._plan_object_id(other_id)
+        docs = {doc["_id"]: doc for doc in await self._repository.find_published_plans_by_ids([base_oid, other_oid])}
+        if base_oid not in docs or other_oid not in docs:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plan not found")
+        base, other = docs[base_oid], docs[other_oid]
+
+        base_hashes, other_hashes = self._section_hashes(base), self._section_hashes(other)
+        changed = [name for name in PLAN_SECTIONS if base_hashes.get(name) != other_hashes.get(name)]
+        if changed:
+            await self._hydrate_plans([base, other])
+        return {
+            "base": base_id,
+            "other": other_id,
+            "changed": changed,
+            "unchanged": [name for name in PLAN_SECTIONS if name not in changed],
+            "sections": {name: {"base": base.get(name), "other": other.get(name)} for name in changed},
+        }
+
+    async def _hydrate_plans(self, docs: List[Dict[str, Any]]) -> None:
+        """Replace section hashes with their content, using one lookup for all ``docs``."""
+
+        digests = {
+            digest
+            for doc in docs
+            for digest in (doc.get("sections") or {}).values()
+            if digest is not None
+        }
+        blobs = await self._repository.fetch_plan_sections(sorted(digests))
+        for doc in docs:
+            for name, digest in (doc.get("sections") or {}).items():
+                doc[name] = blobs.get(digest) if digest is not None else None
+
+    @staticmethod
+    def _section_hashes(doc: Dict[str, Any]) -> Dict[str, Optional[str]]:
+        if doc.get("sections"):
+            return doc["sections"]
+        # Plans published before sections were content-addressed store them inline.
+        return {name: section_hash(doc.get(name)) for name in PLAN_SECTIONS}
+
+    @staticmethod
+    def _plan_object_id(record_id: str):
         try:
-            object_id = to_object_id(record_id)
+            return to_object_id(record_id)
         except HTTPException as exc:
             if exc.status_code == status.HTTP_400_BAD_REQUEST:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid plan identifier") from exc
             raise
-        doc = await self._repository.find_published_plan(object_id)
-        if not doc:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plan not found")
-        return serialize_doc(doc)  # type: ignore[return-value]
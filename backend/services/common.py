@@ -1,9 +1,13 @@
 from __future__ import annotations
 
-from datetime import datetime, date
-from typing import Any, Dict, Iterable, List, Optional, Union
-
-from bson import ObjectId
+import base64
+import binascii
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, date, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from bson import ObjectId, json_util
 from fastapi import HTTPException, status
 
 DEFAULT_TIME_KEYS = (
@@ -16,12 +20,26 @@ DEFAULT_TIME_KEYS = (
 )
 
 
+@dataclass(frozen=True)
+class ResourceVersion:
+    etag: str
+    last_modified: Optional[datetime]
+
+
 def current_timestamp() -> datetime:
     """Return a timezone-naive UTC timestamp."""
 
     return datetime.utcnow()
 
 
+def to_naive_utc(value: datetime) -> datetime:
+    """Convert an aware datetime to naive UTC, as stored; naive values are taken as UTC."""
+
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
 def normalize_roles(roles: Optional[Iterable[str]], fallback: Iterable[str]) -> List[str]:
     normalized: List[str] = []
     for role in roles or fallback:
@@ -50,6 +68,14 @@ def serialize_doc(doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     return serialized
 
 
+def json_default(value: Any) -> str:
+    """``json.dumps`` fallback for values stored in Mongo documents (datetimes, ObjectIds)."""
+
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
 def convert_date_to_datetime(date_input: Union[str, date]) -> datetime:
     if isinstance(date_input, date):
         return datetime(date_input.year, date_input.month, date_input.day)
@@ -64,3 +90,74 @@ def to_object_id(value: str) -> ObjectId:
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid identifier: {value}",
         ) from exc
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode keyset pagination values (datetimes, ObjectIds, ...) as an opaque token."""
+
+    return base64.urlsafe_b64encode(json_util.dumps(list(values)).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(token: str, size: int = 2, types: Optional[Sequence[type]] = None) -> List[Any]:
+    """Decode a token from ``encode_cursor``; ``types`` checks each value's type, in order."""
+
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except (binascii.Error, ValueError, UnicodeError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if types is not None and not all(isinstance(value, kind) for value, kind in zip(values, types)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+
+def resource_version(
+    resource: str,
+    key: str,
+    docs: Iterable[Optional[Dict[str, Any]]],
+    time_field: str,
+) -> ResourceVersion:
+    """Derive a strong ETag and ``Last-Modified`` from the ``_id``/timestamp/version of ``docs``.
+
+    Only those fields are read, so the same version can be computed from a
+    projection-only query or from the fully loaded documents.
+    """
+
+    parts = [resource, key]
+    last_modified: Optional[datetime] = None
+    for doc in docs:
+        if not doc:
+            continue
+        stamp = doc.get(time_field)
+        if isinstance(stamp, datetime):
+            if last_modified is None or stamp > last_modified:
+                last_modified = stamp
+            stamp = stamp.isoformat()
+        parts.append(f"{doc.get('_id')}:{stamp}:{doc.get('version', '')}")
+    digest = hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()[:32]
+    return ResourceVersion(etag=f'"{digest}"', last_modified=last_modified)
+
+
+def keyset_page(
+    docs: List[Dict[str, Any]], limit: int, key_fields: Sequence[str]
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Trim a ``limit + 1`` result to ``limit`` and build the cursor for the next page."""
+
+    if len(docs) <= limit:
+        return docs, None
+    page = docs[:limit]
+    return page, encode_cursor([page[-1].get(field) for field in key_fields])
+
+
+def keyset_filter(key_fields: Sequence[str], after: Sequence[Any], descending: bool) -> Dict[str, Any]:
+    """Match documents strictly after ``after`` in ``key_fields`` sort order."""
+
+    (primary, secondary), (primary_value, secondary_value) = key_fields, after
+    beyond = "$lt" if descending else "$gt"
+    return {
+        "$or": [
+            {primary: {beyond: primary_value}},
+            {primary: primary_value, secondary: {beyond: secondary_value}},
+        ]
+    }
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+from backend.services.common import current_timestamp
+
+try:  # pragma: no cover - support package/script usage
+    from config import EVENT_BUS, EVENT_BUS_CAPPED_SIZE_BYTES, EVENT_SUBSCRIBER_QUEUE_SIZE
+except ImportError:  # pragma: no cover - fallback for package imports
+    from backend.config import (  # type: ignore
+        EVENT_BUS,
+        EVENT_BUS_CAPPED_SIZE_BYTES,
+        EVENT_SUBSCRIBER_QUEUE_SIZE,
+    )
+
+LOGGER = logging.getLogger(__name__)
+
+EVENTS_COLLECTION = "care_events"
+
+Deliver = Callable[[Dict[str, Any]], None]
+
+
+def patient_topic(patient_id: str) -> str:
+    return f"patient:{patient_id}"
+
+
+def doctor_topic(doctor_id: str) -> str:
+    return f"doctor:{doctor_id}"
+
+
+class EventBus(ABC):
+    """Transport that carries published events to every worker's broker (including our own)."""
+
+    _deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        return None
+
+    @abstractmethod
+    async def publish(self, event: Dict[str, Any]) -> None:
+        """Send ``event`` to the brokers of all workers."""
+
+
+class LocalEventBus(EventBus):
+    """Single-process bus: events only reach subscribers connected to this worker."""
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        if self._deliver is not None:
+            self._deliver(event)
+
+
+class MongoEventBus(EventBus):
+    """Cross-worker bus backed by a capped collection followed with a tailable cursor."""
+
+    def __init__(self, database: AsyncIOMotorDatabase, *, size_bytes: int = EVENT_BUS_CAPPED_SIZE_BYTES) -> None:
+        self._db = database
+        self._size_bytes = size_bytes
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        await super().start(deliver)
+        if not await self._db.list_collection_names(filter={"name": EVENTS_COLLECTION}):
+            try:
+                await self._db.create_collection(EVENTS_COLLECTION, capped=True, size=self._size_bytes)
+            except (CollectionInvalid, OperationFailure):
+                pass  # created concurrently by another worker
+        latest = await self._db[EVENTS_COLLECTION].find_one({}, sort=[("$natural", -1)])
+        loop = asyncio.get_event_loop()
+        self._task = loop.create_task(self._tail(latest["_id"] if latest else None))
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._task = None
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        await self._db[EVENTS_COLLECTION].insert_one(dict(event))
+
+    async def _tail(self, last_id: Any) -> None:
+        while True:
+            query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+            cursor = self._db[EVENTS_COLLECTION].find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+            try:
+                while cursor.alive:
+                    async for doc in cursor:
+                        last_id = doc.pop("_id")
+                        if self._deliver is not None:
+                            self._deliver(doc)
+                    await asyncio.sleep(0.1)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # pragma: no cover - defensive logging
+                LOGGER.error("Event bus cursor failed: %s", exc)
+            await asyncio.sleep(1.0)
+
+
+class Subscription:
+    """Bounded per-connection queue; the oldest events are dropped when a client falls behind."""
+
+    def __init__(self, topics: Iterable[str], max_queue_size: int) -> None:
+        self.topics: Set[str] = set(topics)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.dropped = 0
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class EventBroker:
+    """Fans care change events out to the subscriptions of the current worker."""
+
+    def __init__(self, bus: Optional[EventBus] = None, *, max_queue_size: int = EVENT_SUBSCRIBER_QUEUE_SIZE) -> None:
+        self._bus = bus or LocalEventBus()
+        self._max_queue_size = max_queue_size
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._sequence = itertools.count(1)
+
+    async def start(self) -> None:
+        await self._bus.start(self._dispatch)
+
+    async def stop(self) -> None:
+        await self._bus.stop()
+
+    async def publish(self, event_type: str, topics: Iterable[str], data: Dict[str, Any]) -> None:
+        event = {
+            "type": event_type,
+            "topics": sorted(set(topics)),
+            "data": data,
+            "timestamp": current_timestamp(),
+        }
+        try:
+            await self._bus.publish(event)
+        except Exception as exc:  # pragma: no cover - push is best effort, the write already succeeded
+            LOGGER.error("Failed to publish %s event: %s", event_type, exc)
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        subscription = Subscription(topics, self._max_queue_size)
+        for topic in subscription.topics:
+            self._subscriptions.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for topic in subscription.topics:
+            subscribers = self._subscriptions.get(topic)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                self._subscriptions.pop(topic, None)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len({subscription for subscribers in self._subscriptions.values() for subscription in subscribers})
+
+    def _dispatch(self, event: Dict[str, Any]) -> None:
+        recipients: List[Subscription] = []
+        seen: Set[int] = set()
+        for topic in event.get("topics", []):
+            for subscription in self._subscriptions.get(topic, ()):
+                if id(subscription) not in seen:
+                    seen.add(id(subscription))
+                    recipients.append(subscription)
+        if not recipients:
+            return
+        delivered = {**event, "id": next(self._sequence)}
+        for subscription in recipients:
+            subscription.offer(delivered)
+
+
+def build_event_bus(database: AsyncIOMotorDatabase, kind: str = EVENT_BUS) -> EventBus:
+    if kind == "mongo":
+        return MongoEventBus(database)
+    return LocalEventBus()
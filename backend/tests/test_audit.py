@@ -0,0 +1,319 @@
+import asyncio
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import sys
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from backend.repositories import audit_repository
+from backend.repositories.audit_repository import AuditRepository
+from backend.services.audit import ACTIVITY_LOGS, AUTH_LOGS, AuditService, AuditWriter
+from backend.services.common import encode_cursor
+
+
+class FakeAuditRepository:
+    def __init__(self):
+        self.batches = []
+
+    async def insert_many(self, collection, documents):
+        self.batches.append((collection, list(documents)))
+
+
+def test_audit_writer_batches_and_drains_on_stop():
+    repository = FakeAuditRepository()
+
+    async def scenario():
+        writer = AuditWriter(repository, batch_size=3, flush_interval=10.0, max_queue_size=10)
+        writer.start()
+        service = AuditService(None, writer, durability="async", sync_events=())
+        for index in range(4):
+            await service.log_activity("tasks.update", "nurse@example.com", {"index": index})
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+    assert [len(documents) for _, documents in repository.batches] == [3, 1]
+    assert all(collection == ACTIVITY_LOGS for collection, _ in repository.batches)
+
+
+def test_sensitive_events_wait_for_flush():
+    repository = FakeAuditRepository()
+
+    async def scenario():
+        writer = AuditWriter(repository, batch_size=50, flush_interval=0.01, max_queue_size=10)
+        writer.start()
+        service = AuditService(None, writer, durability="async", sync_events=("password_change",))
+        await service.log_auth_event("user-1", "user@example.com", "password_change")
+        flushed_before_stop = list(repository.batches)
+        await writer.stop()
+        return flushed_before_stop
+
+    flushed = asyncio.run(scenario())
+
+    assert flushed and flushed[0][0] == AUTH_LOGS
+    assert flushed[0][1][0]["event"] == "password_change"
+
+
+def test_sync_event_flushes_without_waiting_for_the_interval():
+    repository = FakeAuditRepository()
+
+    async def scenario():
+        writer = AuditWriter(repository, batch_size=50, flush_interval=5.0, max_queue_size=10)
+        writer.start()
+        service = AuditService(None, writer, durability="sync", sync_events=())
+        started = asyncio.get_running_loop().time()
+        await service.log_activity("tasks.update", "nurse@example.com", {"index": 0})
+        elapsed = asyncio.get_running_loop().time() - started
+        await writer.stop()
+        return elapsed
+
+    elapsed = asyncio.run(scenario())
+
+    assert elapsed < 0.5
+    assert [len(documents) for _, documents in repository.batches] == [1]
+
+
+def _value(doc, path):
+    for part in path.split("."):
+        doc = (doc or {}).get(part)
+    return doc
+
+
+def _matches(doc, filter_doc):
+    for key, condition in filter_doc.items():
+        if key == "$and":
+            if not all(_matches(doc, part) for part in condition):
+                return False
+        elif key == "$or":
+            if not any(_matches(doc, part) for part in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = _value(doc, key)
+            checks = {"$gt": lambda a, b: a > b, "$gte": lambda a, b: a >= b, "$lt": lambda a, b: a < b}
+            if not all(checks[op](value, operand) for op, operand in condition.items()):
+                return False
+        elif _value(doc, key) != condition:
+            return False
+    return True
+
+
+class PartitionCursor:
+    def __init__(self, documents):
+        self._documents = documents
+
+    def sort(self, keys):
+        for key, direction in reversed(keys):
+            self._documents.sort(key=lambda doc: doc[key], reverse=direction < 0)
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    def __aiter__(self):
+        self._iterator = iter(self._documents)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+class PartitionCollection:
+    def __init__(self, database, name):
+        self.database, self.name, self.documents, self.indexes = database, name, [], []
+
+    def find(self, filter_doc):
+        self.database.reads.append(self.name)
+        return PartitionCursor([doc for doc in self.documents if _matches(doc, filter_doc)])
+
+    async def find_one(self, filter_doc, projection=None, sort=None):
+        matching = [doc for doc in self.documents if _matches(doc, filter_doc)]
+        for key, direction in reversed(sort or []):
+            matching.sort(key=lambda doc: doc[key], reverse=direction < 0)
+        return matching[0] if matching else None
+
+    async def insert_many(self, documents, ordered=True):
+        self.documents.extend(documents)
+
+    async def create_indexes(self, models):
+        self.indexes.extend(model.document["name"] for model in models)
+
+
+class PartitionDatabase:
+    name = "hospital"
+
+    def __init__(self):
+        self.collections = {}
+        self.reads = []
+        self.renamed = []
+        self.client = SimpleNamespace(admin=SimpleNamespace(command=self._command))
+
+    async def _command(self, command, source, to):
+        self.renamed.append((source, to))
+        self.collections.pop(source.split(".", 1)[1])
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, PartitionCollection(self, name))
+
+    def get_collection(self, name, read_preference=None):
+        return self[name]
+
+    async def list_collection_names(self, filter):
+        pattern = re.compile(filter["name"]["$regex"])
+        return [name for name in self.collections if pattern.match(name)]
+
+    async def drop_collection(self, name):
+        self.collections.pop(name, None)
+
+
+def _activity(timestamp, **fields):
+    return {"_id": ObjectId(), "action": "tasks.update", "performed_by": "nurse@example.com", "timestamp": timestamp, **fields}
+
+
+def _seeded_database():
+    database = PartitionDatabase()
+    # Legacy (pre-partitioning) documents end in January 2025.
+    database[ACTIVITY_LOGS].documents.extend([_activity(datetime(2024, 12, 30)), _activity(datetime(2025, 1, 10))])
+    database["activity_logs_2025_02"].documents.extend(
+        [_activity(datetime(2025, 2, day), payload={"patient_id": f"P-{day}"}) for day in (1, 2, 3)]
+    )
+    database["activity_logs_2025_03"].documents.append(_activity(datetime(2025, 3, 1)))
+    return database
+
+
+def test_query_pages_across_partitions_and_skips_legacy_after_cutover():
+    audit_repository._legacy_cutovers.clear()
+    database = _seeded_database()
+    service = AuditService(database, AuditWriter(AuditRepository(database)))
+
+    async def pages():
+        seen, cursor = [], None
+        while True:
+            page = await service.query_activity(limit=2, cursor=cursor)
+            seen.extend(item["timestamp"] for item in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return seen
+
+    timestamps = asyncio.run(pages())
+    assert timestamps == sorted(timestamps, reverse=True) and len(timestamps) == 6
+
+    database.reads.clear()
+    recent = asyncio.run(service.query_activity(since=datetime(2025, 2, 2), limit=10))
+    assert [item["timestamp"][:10] for item in recent["items"]] == ["2025-03-01", "2025-02-03", "2025-02-02"]
+    assert ACTIVITY_LOGS not in database.reads
+
+    by_patient = asyncio.run(service.query_activity(patient_id="P-2"))
+    assert [item["payload"]["patient_id"] for item in by_patient["items"]] == ["P-2"]
+
+
+def test_legacy_cutover_is_looked_up_again_after_its_ttl(monkeypatch):
+    audit_repository._legacy_cutovers.clear()
+    database = PartitionDatabase()
+    database[ACTIVITY_LOGS]
+    database["activity_logs_2025_03"].documents.append(_activity(datetime(2025, 3, 1)))
+    repository = AuditRepository(database)
+    clock = [1000.0]
+    monkeypatch.setattr(audit_repository.time, "monotonic", lambda: clock[0])
+
+    async def partitions():
+        return [name for _, name in await repository.list_partitions(ACTIVITY_LOGS)]
+
+    # An empty legacy collection is skipped, but only until the cached lookup expires.
+    assert asyncio.run(partitions()) == ["activity_logs_2025_03"]
+    database[ACTIVITY_LOGS].documents.append(_activity(datetime(2025, 3, 2)))
+    assert asyncio.run(partitions()) == ["activity_logs_2025_03"]
+    clock[0] += audit_repository.LEGACY_CUTOVER_TTL_SECONDS + 1
+    assert asyncio.run(partitions()) == [ACTIVITY_LOGS, "activity_logs_2025_03"]
+
+
+def test_tampered_cursor_is_rejected_with_400():
+    database = _seeded_database()
+    service = AuditService(database, AuditWriter(AuditRepository(database)))
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(service.query_activity(cursor=encode_cursor(["2025-02-01", "not-an-id"])))
+    assert exc.value.status_code == 400
+
+
+def test_export_streams_oldest_first_and_resumes_from_a_record_cursor():
+    audit_repository._legacy_cutovers.clear()
+    database = _seeded_database()
+    service = AuditService(database, AuditWriter(AuditRepository(database)))
+
+    async def export(**kwargs):
+        return "".join([chunk async for chunk in service.export_activity(chunk_size=2, **kwargs)])
+
+    records = [json.loads(line) for line in asyncio.run(export()).splitlines()]
+    assert [record["timestamp"][:10] for record in records] == [
+        "2024-12-30", "2025-01-10", "2025-02-01", "2025-02-02", "2025-02-03", "2025-03-01"
+    ]
+    resumed = [json.loads(line) for line in asyncio.run(export(cursor=records[2]["cursor"])).splitlines()]
+    assert [record["_id"] for record in resumed] == [record["_id"] for record in records[3:]]
+
+    csv_rows = asyncio.run(export(export_format="csv", since=datetime(2025, 3, 1))).splitlines()
+    assert csv_rows[0].startswith("_id,timestamp,action") and len(csv_rows) == 2
+
+
+def test_retention_drops_or_archives_old_partitions_but_keeps_legacy():
+    audit_repository._legacy_cutovers.clear()
+    database = _seeded_database()
+    repository = AuditRepository(database)
+
+    dropped = asyncio.run(repository.apply_retention(ACTIVITY_LOGS, (2025, 3)))
+    assert dropped == ["activity_logs_2025_02"]
+    assert set(database.collections) == {ACTIVITY_LOGS, "activity_logs_2025_03"}
+
+    archived = asyncio.run(repository.apply_retention(ACTIVITY_LOGS, (2025, 4), archive_db_name="archive"))
+    assert archived == ["activity_logs_2025_03"]
+    assert database.renamed == [("hospital.activity_logs_2025_03", "archive.activity_logs_2025_03")]
+
+
+class MarkerCollection:
+    def __init__(self, *names):
+        self.docs = {name: {"_id": name, "status": "done"} for name in names}
+
+    async def insert_one(self, doc):
+        if doc["_id"] in self.docs:
+            raise DuplicateKeyError("duplicate key")
+        self.docs[doc["_id"]] = dict(doc)
+
+    async def find_one_and_update(self, query, update, return_document=None):
+        return None
+
+    async def update_one(self, query, update):
+        self.docs[query["_id"]].update(update["$set"])
+
+    async def delete_many(self, query):
+        pattern, keep = re.compile(query["_id"]["$regex"]), query["_id"]["$ne"]
+        for name in [name for name in self.docs if pattern.match(name) and name != keep]:
+            del self.docs[name]
+
+
+def test_retention_runs_once_per_cutoff_month_and_prunes_old_markers(monkeypatch):
+    from backend.services import audit
+
+    audit_repository._legacy_cutovers.clear()
+    database = _seeded_database()
+    markers = database.collections["migrations"] = MarkerCollection("audit.retention:2025-01", "audit.retention:2025-02-14", "indexes:v1")
+    service = AuditService(database, AuditWriter(AuditRepository(database)))
+    monkeypatch.setattr(audit, "current_timestamp", lambda: datetime(2025, 4, 14, 3, 0))
+
+    assert asyncio.run(service.enforce_retention(retention_months=1, archive_db_name="")) == ["activity_logs_2025_02"]
+    assert set(markers.docs) == {"audit.retention:2025-03", "indexes:v1"}
+
+    # Later passes in the same month find the marker and do nothing.
+    monkeypatch.setattr(audit, "current_timestamp", lambda: datetime(2025, 4, 28, 3, 0))
+    assert asyncio.run(service.enforce_retention(retention_months=1, archive_db_name="")) == []
+    assert set(markers.docs) == {"audit.retention:2025-03", "indexes:v1"}
@@ -0,0 +1,76 @@
+import asyncio
+import random
+from pathlib import Path
+
+import httpx
+import pytest
+import sys
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from backend.benchmarks.load import LoadContext, parse_mix, percentile, run_stage, slo_violations
+from backend.benchmarks.suite import compare, run
+
+
+def test_suite_runs_offline_and_flags_regressions_against_a_baseline():
+    baseline = run(sizes=[10], repeats=1, min_time=0.001, pattern=r"^(fetch_staff|get_current_user)")
+    assert set(baseline["results"]) == {"fetch_staff[10]", "get_current_user"}
+
+    slower = {
+        "results": {
+            name: {**result, "median_us": result["median_us"] * 1.5} for name, result in baseline["results"].items()
+        }
+    }
+    rows = {row["case"]: row for row in compare(baseline, slower, threshold=0.2)}
+    assert all(row["regression"] for row in rows.values())
+    assert not any(row["regression"] for row in compare(baseline, baseline, threshold=0.2))
+
+
+def test_load_stage_reports_route_percentiles_and_slo_breaches():
+    assert percentile([1, 2, 3, 4], 0.5) == 2 and percentile([1, 2, 3, 4], 0.99) == 4
+    with pytest.raises(ValueError):
+        parse_mix("dashboard=1,unknown=2")
+
+    app = FastAPI()
+
+    @app.get("/patients/{patient_id}/dashboard")
+    async def dashboard(patient_id: str):
+        return {"patient_id": patient_id}
+
+    @app.post("/vitals/update")
+    async def vitals():
+        return JSONResponse({"error": "down"}, status_code=503)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load") as client:
+            return await run_stage(
+                client, LoadContext(token="t"), parse_mix("dashboard=3,vitals=1"), 200, 0.3, rng=random.Random(7)
+            )
+
+    stage = asyncio.run(scenario())
+    assert stage["routes"]["dashboard"]["requests"] > 0 and stage["routes"]["dashboard"]["errors"] == 0
+    assert stage["routes"]["vitals"]["errors"] == stage["routes"]["vitals"]["requests"] > 0
+    assert any("error rate" in violation for violation in slo_violations(stage, p99_ms=1_000, max_error_rate=0.01))
+
+
+def test_load_stage_counts_app_exceptions_as_errors():
+    app = FastAPI()
+
+    @app.get("/patients/{patient_id}/dashboard")
+    async def dashboard(patient_id: str):
+        raise RuntimeError("boom")
+
+    async def scenario():
+        # ASGITransport re-raises app exceptions by default; they must still be recorded.
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load") as client:
+            return await run_stage(client, LoadContext(token="t"), parse_mix("dashboard=1"), 100, 0.2, rng=random.Random(3))
+
+    stage = asyncio.run(scenario())
+    route = stage["routes"]["dashboard"]
+    assert route["requests"] > 0 and route["errors"] == route["requests"]
+    assert stage["error_rate"] == 1.0
+    assert slo_violations(stage, p99_ms=1_000, max_error_rate=0.01)
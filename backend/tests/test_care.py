@@ -0,0 +1,299 @@
+import asyncio
+from copy import deepcopy
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo.errors import BulkWriteError
+
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from backend.models import PublishPayload
+from backend.repositories.care_repository import array_patch_pipeline
+from backend.services.care import CareService, patch_guards, section_hash
+
+
+def _op(op, target, **extra):
+    return {"op": op, "target": target, "changes": None, "item": None, "position": None, **extra}
+
+
+def test_patch_guards_track_items_touched_earlier_in_the_patch():
+    present, absent = patch_guards(
+        [
+            _op("set", "Consent", changes={"status": "completed"}),
+            _op("insert", "Fasting", item={"label": "Fasting", "status": "pending"}),
+            _op("move", "Fasting", position=0),
+            _op("remove", "Consent"),
+        ]
+    )
+
+    assert present == ["Consent"]
+    assert absent == ["Fasting"]
+
+    with pytest.raises(HTTPException) as exc:
+        patch_guards([_op("remove", "Consent"), _op("set", "Consent", changes={"note": "x"})])
+    assert exc.value.status_code == 422
+
+
+def test_array_patch_pipeline_wraps_client_values_in_literal():
+    updated_at = datetime(2025, 4, 2, 9, 0)
+    pipeline = array_patch_pipeline(
+        "steps",
+        "id",
+        [_op("set", "$steps", changes={"title": "$where"})],
+        updated_at,
+    )
+
+    assert len(pipeline) == 3
+    set_stage = pipeline[1]["$set"]["steps"]["$map"]["in"]["$cond"]
+    assert set_stage[0] == {"$eq": ["$$this.id", {"$literal": "$steps"}]}
+    assert set_stage[1]["$mergeObjects"][1] == {"$literal": {"title": "$where"}}
+    assert pipeline[-1]["$set"]["updated_at"] == updated_at
+
+
+class VitalsSeriesRepository:
+    def __init__(self):
+        self.calls = []
+
+    async def fetch_vitals_range(self, patient_id, since, until, limit):
+        self.calls.append(("range", since, until, limit))
+        return [{"captured_at": since, "metrics": {"heart_rate": 70.0}}]
+
+    async def aggregate_vitals_buckets(self, patient_id, since, until, bucket_seconds, limit):
+        self.calls.append(("buckets", since, until, bucket_seconds))
+        return [{"bucket_start": since, "count": 3}]
+
+
+def test_vitals_series_range_accepts_aware_bounds_as_naive_utc():
+    repository = VitalsSeriesRepository()
+    service = CareService(repository, audit=None)
+    since = datetime(2026, 10, 18, 2, 0, tzinfo=timezone(timedelta(hours=2)))
+
+    result = asyncio.run(service.fetch_vitals_series("P-1", since=since))
+
+    kind, queried_since, queried_until, _ = repository.calls[0]
+    assert kind == "range"
+    assert queried_since == datetime(2026, 10, 18, 0, 0) and queried_since.tzinfo is None
+    assert queried_until.tzinfo is None and queried_until > queried_since
+    assert result["points"][0]["metrics"] == {"heart_rate": 70.0}
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(service.fetch_vitals_series("P-1", since=since, until=datetime(2026, 10, 17)))
+    assert exc.value.status_code == 400
+
+
+def test_vitals_series_buckets_defaults_to_the_last_day():
+    repository = VitalsSeriesRepository()
+    service = CareService(repository, audit=None)
+    until = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+    result = asyncio.run(service.fetch_vitals_series("P-1", until=until, bucket_seconds=300))
+
+    assert repository.calls == [("buckets", datetime(2026, 10, 17, 12, 0), datetime(2026, 10, 18, 12, 0), 300)]
+    assert result["bucket_seconds"] == 300 and result["points"][0]["count"] == 3
+
+
+class NullAudit:
+    async def log_activity(self, action, performed_by, payload):
+        return None
+
+
+class PlanRepository:
+    def __init__(self, fail_sections=False):
+        self.sections = {}
+        self.plans = {}
+        self.calls = []
+        self.fail_sections = fail_sections
+
+    async def store_plan_sections(self, blobs, created_at):
+        self.calls.append("sections")
+        if self.fail_sections:
+            raise RuntimeError("write concern timeout")
+        for digest, data in blobs.items():
+            self.sections.setdefault(digest, deepcopy(data))
+
+    async def insert_published_plan(self, record):
+        self.calls.append("record")
+        record["_id"] = ObjectId()
+        self.plans[record["_id"]] = deepcopy(record)
+        return SimpleNamespace(inserted_id=record["_id"])
+
+    async def fetch_plan_sections(self, digests):
+        self.calls.append("fetch")
+        return {digest: deepcopy(self.sections[digest]) for digest in digests if digest in self.sections}
+
+    async def find_published_plan(self, record_id):
+        return deepcopy(self.plans.get(record_id))
+
+    async def find_published_plans_by_ids(self, record_ids):
+        return [deepcopy(self.plans[record_id]) for record_id in record_ids if record_id in self.plans]
+
+
+def _plan(**overrides):
+    values = {
+        "plan_id": "PLAN-1",
+        "doctor_id": "D-1",
+        "patient_id": "P-1",
+        "timeline": [{"id": "prep", "time": "08:00", "status": "done"}],
+        "crew": [{"name": "Dr. Rao", "role": "surgeon"}],
+        "tasks": [{"label": "Consent", "status": "completed"}],
+        "vitals": {"heart_rate": "72 bpm"},
+        "timestamp": datetime(2025, 4, 2, 8, 0),
+        **overrides,
+    }
+    return PublishPayload(**values)
+
+
+def test_publish_writes_sections_before_the_record():
+    repository = PlanRepository()
+    asyncio.run(CareService(repository, NullAudit()).publish_plan(_plan(), "nurse@example.com"))
+    assert repository.calls == ["sections", "record"]
+
+    failing = PlanRepository(fail_sections=True)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(CareService(failing, NullAudit()).publish_plan(_plan(), "nurse@example.com"))
+    assert exc.value.status_code == 500
+    assert failing.calls == ["sections"] and not failing.plans
+
+
+def test_section_hash_is_canonical_and_skips_missing_sections():
+    assert section_hash(None) is None
+    assert section_hash({"a": 1, "b": [1, 2]}) == section_hash({"b": [1, 2], "a": 1})
+    assert section_hash({"a": 1}) != section_hash({"a": 2})
+
+
+def test_published_plans_share_identical_sections_and_hydrate_on_read():
+    repository = PlanRepository()
+    service = CareService(repository, NullAudit())
+    first = asyncio.run(service.publish_plan(_plan(), "nurse@example.com"))
+    second = asyncio.run(service.publish_plan(_plan(crew=[{"name": "Dr. Sen", "role": "surgeon"}]), "nurse@example.com"))
+
+    # Four sections of the first plan plus the second plan's new crew; insights were empty.
+    assert len(repository.sections) == 5
+    records = list(repository.plans.values())
+    assert records[0]["sections"]["timeline"] == records[1]["sections"]["timeline"]
+    assert records[0]["sections"]["optimization_insights"] is None
+    assert all(name not in records[0] for name in ("timeline", "crew", "tasks", "vitals"))
+
+    plan = asyncio.run(service.fetch_published_plan(second["plan_id"]))
+    assert plan["crew"] == [{"name": "Dr. Sen", "role": "surgeon"}]
+    assert plan["timeline"] == first["plan"]["timeline"]
+    assert plan["optimization_insights"] is None
+
+
+def test_diff_compares_hashes_and_hydrates_legacy_inline_plans_in_one_lookup():
+    repository = PlanRepository()
+    service = CareService(repository, NullAudit())
+    published = asyncio.run(service.publish_plan(_plan(), "nurse@example.com"))
+    legacy_id = ObjectId()
+    repository.plans[legacy_id] = {
+        "_id": legacy_id,
+        "plan_id": "PLAN-1",
+        "timeline": [{"id": "prep", "time": "08:00", "status": "done"}],
+        "crew": [{"name": "Dr. Rao", "role": "surgeon"}],
+        "tasks": [{"label": "Consent", "status": "pending"}],
+        "vitals": {"heart_rate": "72 bpm"},
+        "optimization_insights": None,
+    }
+
+    legacy = asyncio.run(service.fetch_published_plan(str(legacy_id)))
+    assert legacy["tasks"] == [{"label": "Consent", "status": "pending"}]
+
+    repository.calls.clear()
+    diff = asyncio.run(service.diff_published_plans(str(legacy_id), published["plan_id"]))
+    assert diff["changed"] == ["tasks"]
+    assert diff["unchanged"] == ["timeline", "crew", "vitals", "optimization_insights"]
+    assert diff["sections"] == {
+        "tasks": {"base": [{"label": "Consent", "status": "pending"}], "other": [{"label": "Consent", "status": "completed"}]}
+    }
+    assert repository.calls == ["fetch"]
+
+    repository.calls.clear()
+    same = asyncio.run(service.diff_published_plans(published["plan_id"], published["plan_id"]))
+    assert same["changed"] == [] and same["sections"] == {}
+    assert repository.calls == []
+
+
+def test_dashboard_rejects_unknown_sections_before_loading():
+    service = CareService(SimpleNamespace(), NullAudit())
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(service.fetch_dashboard("P-1", ["tasks", "billing", "x-rays"]))
+    assert exc.value.status_code == 400
+    assert exc.value.detail == "Unknown dashboard sections: billing, x-rays"
+
+
+class VitalsIngestRepository:
+    def __init__(self, rejected_positions):
+        # Positions rejected by the server in each insert_many call, in call order.
+        self.rejected_positions = list(rejected_positions)
+        self.stored = []
+
+    async def record_vitals_many(self, records):
+        rejected = self.rejected_positions.pop(0)
+        self.stored.extend(record for position, record in enumerate(records) if position not in rejected)
+        if rejected:
+            raise BulkWriteError(
+                {"writeErrors": [{"index": position, "errmsg": "document failed validation"} for position in rejected]}
+            )
+
+
+def test_ingest_vitals_reports_write_errors_by_input_position():
+    async def readings():
+        yield {"patient_id": "P-1", "heart_rate": "72 bpm", "blood_pressure": "120/80", "spo2": "98%"}
+        yield {"patient_id": "P-1", "heart_rate": "74 bpm"}
+        yield {"patient_id": "P-2", "heart_rate": "80 bpm", "blood_pressure": "118/76", "spo2": "97%"}
+        yield '{"patient_id": "P-2", "heart_rate": "81 bpm", "blood_pressure": "119/77", "spo2": "96%"}'
+        yield {"patient_id": "P-3", "heart_rate": "66 bpm", "blood_pressure": "110/70", "spo2": "99%"}
+
+    # Batches hold inputs [0, 2] and [3, 4]; the server rejects input 2 and input 4.
+    repository = VitalsIngestRepository([{1}, {1}])
+    result = asyncio.run(CareService(repository, NullAudit()).ingest_vitals(readings(), "nurse@example.com", batch_size=2))
+
+    assert result["accepted"] == 2 and result["rejected"] == 3
+    assert [error["index"] for error in result["errors"]] == [1, 2, 4]
+    assert result["errors"][1]["error"] == "document failed validation"
+    assert result["errors"][0]["error"].startswith("blood_pressure: ")
+    assert [record["patient_id"] for record in repository.stored] == ["P-1", "P-2"]
+
+
+def test_tampered_page_cursors_are_rejected_before_the_query():
+    from backend.services.common import encode_cursor
+
+    calls = []
+
+    async def fetch(*args, **kwargs):
+        calls.append(kwargs["after"])
+        return []
+
+    async def fetch_plan_sections(digests):
+        return {}
+
+    repository = SimpleNamespace(
+        fetch_surgeries_for_doctor=fetch, fetch_published_plans=fetch, fetch_plan_sections=fetch_plan_sections
+    )
+    service = CareService(repository, NullAudit())
+    operator = encode_cursor([{"$ne": None}, ObjectId()])
+    pages = (
+        lambda cursor: service.fetch_surgeries_for_doctor("D-1", cursor=cursor),
+        lambda cursor: service.fetch_published_plans("P-1", cursor=cursor),
+        lambda cursor: service.published_plans_version("P-1", cursor=cursor),
+    )
+    for page in pages:
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(page(operator))
+        assert exc.value.status_code == 400
+    assert calls == []
+
+    surgery_id, plan_id = ObjectId(), ObjectId()
+    asyncio.run(pages[0](encode_cursor(["2025-04-02", surgery_id])))
+    asyncio.run(pages[1](encode_cursor([datetime(2025, 4, 2, 8, 0), plan_id])))
+    with pytest.raises(HTTPException):
+        asyncio.run(pages[2](encode_cursor(["2025-04-02", plan_id])))
+    assert calls == [["2025-04-02", surgery_id], [datetime(2025, 4, 2, 8, 0), plan_id]]
@@ -0,0 +1,64 @@
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from backend.services.common import decode_cursor, encode_cursor, keyset_filter, keyset_page, resource_version
+
+
+def test_cursor_round_trips_bson_values():
+    created_at = datetime(2025, 4, 2, 10, 30, 0, 250000)
+    record_id = ObjectId()
+
+    assert decode_cursor(encode_cursor([created_at, record_id])) == [created_at, record_id]
+
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor")
+    assert exc.value.status_code == 400
+
+
+def test_keyset_page_returns_next_cursor_only_when_more_results():
+    docs = [{"_id": ObjectId(), "date": f"2025-04-0{day}"} for day in range(1, 4)]
+
+    page, next_cursor = keyset_page(docs, 2, ("date", "_id"))
+    assert page == docs[:2]
+    assert decode_cursor(next_cursor) == ["2025-04-02", docs[1]["_id"]]
+
+    page, next_cursor = keyset_page(docs[:2], 2, ("date", "_id"))
+    assert page == docs[:2]
+    assert next_cursor is None
+
+
+def test_keyset_filter_breaks_ties_on_secondary_key():
+    record_id = ObjectId()
+    created_at = datetime(2025, 4, 2)
+
+    assert keyset_filter(("created_at", "_id"), [created_at, record_id], descending=True) == {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": record_id}},
+        ]
+    }
+
+
+def test_resource_version_changes_with_any_document_version():
+    plan_id = ObjectId()
+    older, newer = datetime(2025, 4, 1, 9, 0), datetime(2025, 4, 2, 9, 0)
+    docs = [{"_id": plan_id, "updated_at": newer, "version": 2}, {"_id": ObjectId(), "updated_at": older}, None]
+
+    version = resource_version("plans", "P-1", docs, "updated_at")
+    assert version.last_modified == newer
+    assert version.etag.startswith('"') and version.etag.endswith('"')
+    # A projection of the same fields gives the same tag.
+    assert resource_version("plans", "P-1", [dict(doc) for doc in docs if doc], "updated_at") == version
+    assert resource_version("plans", "P-2", docs, "updated_at").etag != version.etag
+    bumped = [{**docs[0], "version": 3}, docs[1]]
+    assert resource_version("plans", "P-1", bumped, "updated_at").etag != version.etag
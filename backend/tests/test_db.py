@@ -0,0 +1,77 @@
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from pymongo.read_preferences import Primary, SecondaryPreferred
+
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from backend.db import manager
+from backend.db.monitoring import PoolMonitor
+
+
+def test_client_options_only_set_configured_limits(monkeypatch):
+    options = manager.client_options()
+    assert options["maxPoolSize"] == manager.MONGODB_MAX_POOL_SIZE
+    assert "maxIdleTimeMS" not in options and "waitQueueTimeoutMS" not in options and "compressors" not in options
+
+    monkeypatch.setattr(manager, "MONGODB_MAX_IDLE_TIME_MS", 60000)
+    monkeypatch.setattr(manager, "MONGODB_WAIT_QUEUE_TIMEOUT_MS", 2000)
+    monkeypatch.setattr(manager, "MONGODB_COMPRESSORS", ("zstd", "zlib"))
+    options = manager.client_options()
+    assert options["maxIdleTimeMS"] == 60000
+    assert options["waitQueueTimeoutMS"] == 2000
+    assert options["compressors"] == "zstd,zlib"
+
+
+def test_read_preference_bounds_secondary_reads_by_staleness(monkeypatch):
+    monkeypatch.setattr(manager, "MONGODB_READ_PREFERENCES", {"audit": "secondary_preferred"})
+
+    audit = manager.read_preference("audit")
+    assert isinstance(audit, SecondaryPreferred) and audit.max_staleness == manager.MONGODB_MAX_STALENESS_SECONDS
+    assert isinstance(manager.read_preference("patients"), Primary)
+
+    monkeypatch.setattr(manager, "MONGODB_MAX_STALENESS_SECONDS", 0)
+    assert manager.read_preference("audit").max_staleness == -1
+
+
+def test_invalid_read_preferences_fail_before_connecting(monkeypatch):
+    created = []
+    monkeypatch.setattr(manager, "AsyncIOMotorClient", lambda *args, **kwargs: created.append(args))
+
+    monkeypatch.setattr(manager, "MONGODB_READ_PREFERENCES", {"audit": "secundary"})
+    with pytest.raises(ValueError, match="secundary"):
+        asyncio.run(manager.MongoConnectionManager().connect())
+
+    monkeypatch.setattr(manager, "MONGODB_READ_PREFERENCES", {"audit": "nearest"})
+    monkeypatch.setattr(manager, "MONGODB_MAX_STALENESS_SECONDS", 30)
+    with pytest.raises(ValueError, match="MONGODB_MAX_STALENESS_SECONDS"):
+        asyncio.run(manager.MongoConnectionManager().connect())
+    assert created == []
+
+
+def test_pool_monitor_buckets_checkout_waits_and_counts_failures():
+    monitor = PoolMonitor()
+    event = SimpleNamespace(reason="timeout")
+
+    monitor.connection_check_out_started(event)
+    monitor.connection_checked_out(event)
+    monitor.connection_check_out_started(event)
+    monitor.connection_check_out_failed(event)
+    # A checkout whose start was not seen on this thread counts as no wait.
+    monitor.connection_checked_out(event)
+    monitor.connection_checked_in(event)
+    monitor.pool_cleared(event)
+
+    snapshot = monitor.snapshot()
+    assert snapshot["checkouts"] == 2
+    assert snapshot["checked_out"] == 1
+    assert snapshot["failures"] == {"timeout": 1}
+    assert snapshot["pools_cleared"] == 1
+    assert snapshot["wait_seconds_buckets"]["0.001"] == 2
+    assert snapshot["wait_seconds_buckets"]["+Inf"] == 2
@@ -0,0 +1,68 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from backend.api.routes.events import _event_stream
+from backend.services.events import EventBroker, EventBus, doctor_topic, patient_topic
+
+
+def test_event_bus_requires_publish():
+    with pytest.raises(TypeError):
+        EventBus()
+
+
+def test_broker_fans_out_by_topic_once_per_subscription_and_drops_oldest():
+    async def scenario():
+        broker = EventBroker(max_queue_size=2)
+        await broker.start()
+        both = broker.subscribe([patient_topic("P-1"), doctor_topic("D-1")])
+        other = broker.subscribe([patient_topic("P-2")])
+
+        await broker.publish("plan.published", [patient_topic("P-1"), doctor_topic("D-1")], {"n": 1})
+        assert both.queue.qsize() == 1 and other.queue.empty()
+
+        for n in (2, 3):
+            await broker.publish("vitals.recorded", [patient_topic("P-1")], {"n": n})
+        received = [both.queue.get_nowait()["data"]["n"] for _ in range(both.queue.qsize())]
+
+        broker.unsubscribe(both)
+        await broker.publish("vitals.recorded", [patient_topic("P-1")], {"n": 4})
+        return received, both.dropped, broker.subscriber_count, both.queue.qsize()
+
+    received, dropped, subscribers, left = asyncio.run(scenario())
+    assert received == [2, 3] and dropped == 1
+    assert subscribers == 1 and left == 0
+
+
+class _Request:
+    async def is_disconnected(self):
+        return False
+
+
+def test_sse_stream_formats_events_and_unsubscribes_on_close():
+    async def scenario():
+        broker = EventBroker()
+        await broker.start()
+        subscription = broker.subscribe([patient_topic("P-1")])
+        stream = _event_stream(_Request(), broker, subscription)
+        chunks = [await stream.__anext__()]
+        await broker.publish("vitals.recorded", [patient_topic("P-1")], {"heart_rate": 72})
+        chunks.append(await stream.__anext__())
+        await stream.aclose()
+        return chunks, broker.subscriber_count
+
+    (retry, event), subscribers = asyncio.run(scenario())
+    assert retry == "retry: 3000\n\n"
+    lines = event.rstrip("\n").split("\n")
+    assert lines[0] == "id: 1" and lines[1] == "event: vitals.recorded"
+    payload = json.loads(lines[2][len("data: "):])
+    assert payload["data"] == {"heart_rate": 72} and payload["dropped"] == 0
+    assert subscribers == 0
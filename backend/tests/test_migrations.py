@@ -0,0 +1,128 @@
+import asyncio
+from copy import deepcopy
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from backend.db.indexes import index, registry_fingerprint
+from backend.db.migrations import MIGRATIONS_COLLECTION, ensure_constraints, ensure_indexes, run_once
+
+
+class FakeMigrationsCollection:
+    def __init__(self):
+        self.docs = {}
+
+    async def insert_one(self, doc):
+        if doc["_id"] in self.docs:
+            raise DuplicateKeyError("duplicate key")
+        self.docs[doc["_id"]] = deepcopy(doc)
+
+    async def find_one_and_update(self, query, update, return_document=None):
+        doc = self.docs.get(query["_id"])
+        if doc is None:
+            return None
+        now = query["$or"][1]["lease_expires_at"]["$lt"]
+        claimable = doc["status"] == "failed" or (doc["status"] == "running" and doc["lease_expires_at"] < now)
+        if not claimable:
+            return None
+        doc.update(update["$set"])
+        return deepcopy(doc)
+
+    async def update_one(self, query, update):
+        doc = self.docs[query["_id"]]
+        doc.update(update.get("$set", {}))
+        for key in update.get("$unset", {}):
+            doc.pop(key, None)
+
+
+class FakeIndexedCollection:
+    def __init__(self):
+        self.created = []
+
+    async def create_indexes(self, models):
+        self.created.extend(model.document["name"] for model in models)
+
+
+class FakeDB(dict):
+    def __init__(self):
+        super().__init__({MIGRATIONS_COLLECTION: FakeMigrationsCollection()})
+
+    def __missing__(self, name):
+        self[name] = FakeIndexedCollection()
+        return self[name]
+
+
+def test_run_once_skips_completed_migration():
+    db = FakeDB()
+    calls = []
+
+    async def operation():
+        calls.append(1)
+
+    assert asyncio.run(run_once(db, "users.default_roles:clinician", operation)) is True
+    assert asyncio.run(run_once(db, "users.default_roles:clinician", operation)) is False
+    assert calls == [1]
+    assert db[MIGRATIONS_COLLECTION].docs["users.default_roles:clinician"]["status"] == "done"
+
+
+def test_run_once_reclaims_failed_or_stale_migration():
+    db = FakeDB()
+
+    async def failing():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run_once(db, "example", failing))
+    assert db[MIGRATIONS_COLLECTION].docs["example"]["status"] == "failed"
+
+    async def succeeding():
+        return None
+
+    assert asyncio.run(run_once(db, "example", succeeding)) is True
+
+    db[MIGRATIONS_COLLECTION].docs["stale"] = {
+        "_id": "stale",
+        "status": "running",
+        "lease_expires_at": datetime.utcnow() - timedelta(minutes=1),
+    }
+    assert asyncio.run(run_once(db, "stale", succeeding)) is True
+
+
+def test_ensure_indexes_builds_registry_once_per_version():
+    db = FakeDB()
+    specs = [index("surgeries", ("doctor_id", 1), ("date", 1), ("_id", 1)), index("users", ("email", 1), unique=True)]
+
+    assert asyncio.run(ensure_indexes(db, specs)) is True
+    assert asyncio.run(ensure_indexes(db, specs)) is False
+    # Names match pymongo's defaults so indexes created before the registry are reused.
+    assert db["surgeries"].created == ["doctor_id_1_date_1__id_1"]
+    assert db["users"].created == ["email_1"]
+
+    extended = [*specs, index("staff", ("role", 1))]
+    assert registry_fingerprint(extended) != registry_fingerprint(specs)
+    assert asyncio.run(ensure_indexes(db, extended)) is True
+
+
+def test_ensure_constraints_builds_unique_indexes_in_foreground_and_raises_on_failure():
+    db = FakeDB()
+    specs = [index("surgeries", ("doctor_id", 1)), index("users", ("email", 1), unique=True)]
+
+    asyncio.run(ensure_constraints(db, specs))
+    assert db["users"].created == ["email_1"]
+    assert "surgeries" not in db
+
+    class DuplicatesCollection:
+        async def create_indexes(self, models):
+            raise DuplicateKeyError("E11000 duplicate key error")
+
+    db["users"] = DuplicatesCollection()
+    with pytest.raises(DuplicateKeyError):
+        asyncio.run(ensure_constraints(db, specs))
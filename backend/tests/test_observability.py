@@ -0,0 +1,390 @@
+import asyncio
+import time
+from pathlib import Path
+
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from backend.observability.metrics import Counter, Histogram, Registry
+from backend.observability.mongo import current_operation, instrument_repository
+
+
+def test_registry_renders_cumulative_histogram_and_counter():
+    registry = Registry()
+    latency = registry.register(Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)))
+    hits = registry.register(Counter("hits_total", "Hits.", ("cache",)))
+
+    latency.observe(0.05, "/tasks/{patient_id}")
+    latency.observe(0.5, "/tasks/{patient_id}")
+    latency.observe(3.0, "/tasks/{patient_id}")
+    hits.inc("availability")
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{route="/tasks/{patient_id}",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/tasks/{patient_id}",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/tasks/{patient_id}",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/tasks/{patient_id}"} 3' in lines
+    assert 'hits_total{cache="availability"} 1' in lines
+
+
+def test_instrumented_repository_labels_commands_with_method():
+    @instrument_repository
+    class ExampleRepository:
+        async def fetch(self):
+            return current_operation.get()
+
+        async def stream(self):
+            for _ in range(2):
+                yield current_operation.get()
+
+    async def run():
+        repository = ExampleRepository()
+        fetched = await repository.fetch()
+        streamed = [label async for label in repository.stream()]
+        return fetched, streamed, current_operation.get()
+
+    fetched, streamed, after = asyncio.run(run())
+    assert fetched == "ExampleRepository.fetch"
+    assert streamed == ["ExampleRepository.stream", "ExampleRepository.stream"]
+    assert after == "unknown"
+
+
+class SessionUsers:
+    def __init__(self, user):
+        self.user = user
+
+    async def find_one(self, query, projection=None):
+        return self.user if query["_id"] == self.user["_id"] else None
+
+
+def _profiled_app(roles=("Admin",)):
+    from datetime import datetime, timedelta
+    from types import SimpleNamespace
+
+    from bson import ObjectId
+    from fastapi import FastAPI, Request
+
+    from backend.observability.profiler import ProfileStore, ProfilingMiddleware
+    from backend.security import hash_session_identifier
+
+    def busy(seconds):
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            pass
+
+    user_id = ObjectId()
+    session = {"fingerprint": hash_session_identifier("S-1"), "expires_at": datetime.utcnow() + timedelta(hours=1)}
+    app = FastAPI()
+    app.state.db = SimpleNamespace(users=SessionUsers({"_id": user_id, "roles": list(roles), "active_sessions": [session]}))
+    store = ProfileStore(capacity=5)
+    app.add_middleware(ProfilingMiddleware, store=store)
+
+    @app.get("/slow")
+    async def slow(request: Request, role: str = "admin"):
+        request.state.current_user = {"_id": str(user_id), "roles": [role]}
+        busy(0.05)
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    return app, store, str(user_id)
+
+
+def test_profiler_keeps_collapsed_cpu_and_await_stacks_for_admin_requests():
+    from fastapi.testclient import TestClient
+
+    from backend.services.auth import create_access_token
+
+    app, store, user_id = _profiled_app()
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token(user_id, 'S-1')}"}
+    logged_out = {"Authorization": f"Bearer {create_access_token(user_id, 'S-2')}", "X-Profile": "1"}
+
+    assert "x-profile-id" not in client.get("/slow", headers=headers).headers
+    assert "x-profile-id" not in client.get("/slow", headers={**headers, "X-Profile": "1"}, params={"role": "nurse"}).headers
+    assert "x-profile-id" not in client.get("/slow", headers=logged_out).headers
+    assert store.list() == []
+
+    response = client.get("/slow", headers={**headers, "X-Profile": "1"})
+    profile = store.get(response.headers["x-profile-id"])
+    assert profile is not None and profile.user_id == user_id
+
+    cpu = profile.collapsed("cpu").splitlines()
+    waiting = profile.collapsed("await").splitlines()
+    assert any(".<locals>.slow;" in line and line.split(" ")[0].endswith(".<locals>.busy") for line in cpu)
+    assert any(".<locals>.slow;asyncio.tasks:sleep;" in line for line in waiting)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in cpu + waiting)
+
+
+def test_profiler_never_samples_a_non_admin_token(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from backend.observability import profiler
+    from backend.services.auth import create_access_token
+
+    started = []
+    monkeypatch.setattr(profiler.TaskSampler, "start", lambda sampler: started.append(sampler))
+    app, store, user_id = _profiled_app(roles=("nurse",))
+    headers = {"Authorization": f"Bearer {create_access_token(user_id, 'S-1')}", "X-Profile": "1"}
+
+    # The route claims an admin; the gate still goes by the stored roles.
+    response = TestClient(app).get("/slow", headers=headers)
+    assert response.status_code == 200 and "x-profile-id" not in response.headers
+    assert started == [] and store.list() == []
+
+
+def test_running_task_is_read_across_threads_and_disabled_without_asyncio_support(monkeypatch):
+    import threading
+
+    from backend.observability import tasks
+    from backend.observability.tasks import running_task, task_attribution_available
+
+    seen = {}
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        reader = threading.Thread(target=lambda: seen.update(task=running_task(loop)))
+        reader.start()
+        reader.join()
+        return asyncio.current_task()
+
+    current = asyncio.run(run())
+    assert task_attribution_available() and seen["task"] is current
+
+    monkeypatch.setattr(tasks, "_current_tasks", None)
+    seen.clear()
+    asyncio.run(run())
+    assert not task_attribution_available() and seen["task"] is None
+
+
+def test_profiler_tells_cpu_from_await_without_task_attribution(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from backend.observability import tasks
+    from backend.services.auth import create_access_token
+
+    monkeypatch.setattr(tasks, "_current_tasks", None)
+    app, store, user_id = _profiled_app()
+    headers = {"Authorization": f"Bearer {create_access_token(user_id, 'S-1')}", "X-Profile": "1"}
+
+    response = TestClient(app).get("/slow", headers=headers)
+    profile = store.get(response.headers["x-profile-id"])
+    assert any(line.split(" ")[0].endswith(".<locals>.busy") for line in profile.collapsed("cpu").splitlines())
+    assert any("asyncio.tasks:sleep" in line for line in profile.collapsed("await").splitlines())
+
+
+def test_slow_queries_are_grouped_by_redacted_shape_and_explained():
+    from types import SimpleNamespace
+
+    from backend.observability.mongo import CommandMetrics
+    from backend.observability.slow_queries import SlowQueryLog
+
+    class FakeDatabase:
+        name = "hospital1"
+
+        def __init__(self):
+            self.commands = []
+
+        async def command(self, command):
+            self.commands.append(command)
+            return {
+                "queryPlanner": {
+                    "winningPlan": {"stage": "COLLSCAN"},
+                    "rejectedPlans": [{"stage": "IXSCAN", "indexName": "name_1"}],
+                }
+            }
+
+    def run_command(listener, request_id, command, micros):
+        event = SimpleNamespace(
+            command_name="find",
+            command=command,
+            database_name="hospital1",
+            request_id=request_id,
+            connection_id=("localhost", 27017),
+            duration_micros=micros,
+        )
+        listener.started(event)
+        listener.succeeded(event)
+
+    async def run():
+        log = SlowQueryLog(threshold_ms=50, explain_verbosity="queryPlanner", explain_interval=60)
+        listener = CommandMetrics(log)
+        database = FakeDatabase()
+        log.start(database)
+        token = current_operation.set("SchedulingRepository.find_staff")
+        try:
+            for request_id, name in enumerate(["Asha", "Ben"]):
+                command = {
+                    "find": "staff",
+                    "filter": {"name": name, "role": {"$in": ["nurse", "surgeon"]}},
+                    "lsid": {"id": 1},
+                    "$db": "hospital1",
+                }
+                run_command(listener, request_id, command, 120_000)
+            run_command(listener, 3, {"find": "staff", "filter": {"name": "Fast"}}, 2_000)
+        finally:
+            current_operation.reset(token)
+        for _ in range(5):
+            await asyncio.sleep(0)
+        await log.stop()
+        return log.snapshot(), database.commands
+
+    shapes, explained = asyncio.run(run())
+    assert len(shapes) == 1
+    shape = shapes[0]
+    assert shape["operation"] == "SchedulingRepository.find_staff"
+    assert shape["shape"] == {"filter": {"name": "?", "role": {"$in": ["?"]}}}
+    assert (shape["count"], shape["total_ms"]) == (2, 240.0)
+    assert shape["plan"]["collection_scan"] is True and shape["plan"]["indexes"] == []
+    assert explained == [
+        {
+            "explain": {"find": "staff", "filter": {"name": "Asha", "role": {"$in": ["nurse", "surgeon"]}}},
+            "verbosity": "queryPlanner",
+        }
+    ]
+
+
+def test_traces_fan_out_with_retry_events_under_incoming_parent(monkeypatch):
+    from backend.models import AvailabilityRequest
+    from backend.observability import tracing
+    from backend.services.availability import AvailabilityService
+
+    ring = tracing.RingBufferExporter(max_traces=5)
+    monkeypatch.setattr(tracing, "tracer", tracing.Tracer([ring]))
+
+    @instrument_repository
+    class FlakyRepository:
+        def __init__(self):
+            self.failed = False
+
+        async def find_staff(self, role, target_date, start, end):
+            if role == "radiologist" and not self.failed:
+                self.failed = True
+                raise ConnectionError("primary stepped down")
+            return []
+
+        async def find_generic_availability(self, collection, target_date, start, end, constraint):
+            return []
+
+        async def get_latest_test_scores(self, test_type, limit=2):
+            return []
+
+    request = AvailabilityRequest(
+        requested_date="2025-04-02",
+        requested_start="08:00",
+        requested_end="10:00",
+        required_test_type="MRI",
+        required_radiologists=0,
+        required_assistant_doctors=0,
+        required_nurses=0,
+        required_operation_rooms=0,
+    )
+    parent = tracing.SpanContext.from_traceparent("00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01")
+
+    async def run():
+        service = AvailabilityService(FlakyRepository(), base_delay=0)
+        with tracing.get_tracer().span("GET /availability", kind="SERVER", parent=parent):
+            await service.check_availability(request)
+
+    asyncio.run(run())
+    spans = ring.trace(parent.trace_id)
+    by_id = {span["spanId"]: span for span in spans}
+    root = spans[0]
+    assert root["parentSpanId"] == parent.span_id
+    check = next(span for span in spans if span["name"] == "AvailabilityService.check_availability")
+    assert check["parentSpanId"] == root["spanId"]
+
+    fetches = [span for span in spans if span["name"] == "AvailabilityService.fetch_staff"]
+    assert {span["attributes"]["availability.resource"] for span in fetches} == {"radiologist", "assistant_doctor"}
+    assert all(span["parentSpanId"] == check["spanId"] for span in fetches)
+    radiologist = next(span for span in fetches if span["attributes"]["availability.resource"] == "radiologist")
+    assert [event["name"] for event in radiologist["events"]] == ["cache.miss", "retry"]
+    assert radiologist["events"][1]["attributes"] == {"attempt": 1, "delay_seconds": 0, "exception.type": "ConnectionError"}
+
+    attempts = [
+        span
+        for span in spans
+        if span["name"] == "FlakyRepository.find_staff" and by_id[span["parentSpanId"]] is radiologist
+    ]
+    assert [span["status"]["code"] for span in attempts] == ["STATUS_CODE_ERROR", "STATUS_CODE_UNSET"]
+    assert attempts[0]["events"][0]["attributes"] == {"exception.type": "ConnectionError"}
+
+
+def test_file_exporter_writes_from_its_own_thread_and_flushes_on_shutdown(tmp_path, monkeypatch):
+    import json
+    import threading
+
+    from backend.observability import tracing
+
+    path = tmp_path / "spans.jsonl"
+    exporter = tracing.FileExporter(str(path))
+    writers = set()
+    to_dict = tracing.Span.to_dict
+
+    def recording_to_dict(span):
+        writers.add(threading.current_thread().name)
+        return to_dict(span)
+
+    monkeypatch.setattr(tracing.Span, "to_dict", recording_to_dict)
+    tracer = tracing.Tracer([exporter])
+    for name in ("first", "second", "third"):
+        with tracer.span(name):
+            pass
+    tracer.shutdown()
+
+    assert [json.loads(line)["name"] for line in path.read_text().splitlines()] == ["first", "second", "third"]
+    assert writers == {"span-file-exporter"}
+    assert exporter.dropped == 0
+
+
+def test_loop_monitor_captures_the_blocking_stack():
+    from backend.observability.loop_monitor import LoopMonitor
+
+    def hash_password_synchronously():
+        time.sleep(0.3)
+
+    async def run():
+        monitor = LoopMonitor(interval=0.02, threshold=0.1, debug=False)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        hash_password_synchronously()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor.snapshot()
+
+    snapshot = asyncio.run(run())
+    assert len(snapshot["stalls"]) == 1
+    stall = snapshot["stalls"][0]
+    assert any("hash_password_synchronously" in line for line in stall["stack"])
+    assert stall["coroutine"].endswith("run")
+    assert stall["blocked_ms"] >= 250
+    assert snapshot["max_lag_ms"] >= 250
+
+
+def test_memory_report_sizes_named_caches_and_diffs_snapshots():
+    from backend.models import Resource
+    from backend.observability.memory import AllocationTracker, cache_items, cache_report
+    from backend.services.availability import TTLCache
+
+    small = TTLCache(name="test_small")
+    large = TTLCache(name="test_large")
+    small.set("one", [Resource(id="1", name="Nurse Patel")])
+    large.set("many", [Resource(id=str(index), name=f"Nurse {index}" * 10) for index in range(200)])
+
+    report = {entry["name"]: entry for entry in cache_report(cache_items())}
+    assert report["test_small"]["entries"] == 1
+    assert report["test_large"]["approx_bytes"] > 20 * report["test_small"]["approx_bytes"]
+
+    tracker = AllocationTracker(frames=1)
+    tracker.start()
+    try:
+        before = tracker.take_snapshot()
+        retained = [bytearray(1024) for _ in range(500)]
+        after = tracker.take_snapshot()
+        growth = tracker.diff(before, after, limit=5)
+    finally:
+        tracker.stop()
+    assert retained
+    assert any(site["size_diff_bytes"] >= 500 * 1024 and "test_observability.py" in site["site"][0] for site in growth)
@@ -0,0 +1,83 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+from bson import Decimal128, ObjectId
+
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from backend.api.conditional import conditional_response
+from backend.api.responses import BSONJSONResponse
+from backend.services.common import ResourceVersion
+
+
+def test_bson_response_encodes_nested_bson_values():
+    record_id = ObjectId()
+    body = {
+        "plan": {
+            "_id": record_id,
+            "timeline": [{"step_id": ObjectId(record_id), "at": datetime(2025, 4, 2, 8, 30)}],
+            "dose": Decimal128(Decimal("2.5")),
+            "note": "Überwachung",
+        }
+    }
+
+    decoded = json.loads(BSONJSONResponse(body).body)
+
+    assert decoded["plan"]["_id"] == str(record_id)
+    assert decoded["plan"]["timeline"][0] == {"step_id": str(record_id), "at": "2025-04-02T08:30:00"}
+    assert decoded["plan"]["dose"] == 2.5
+    assert decoded["plan"]["note"] == "Überwachung"
+
+
+def _conditional_client():
+    from fastapi import FastAPI, Request
+    from fastapi.testclient import TestClient
+
+    version = ResourceVersion(etag='"v1"', last_modified=datetime(2025, 4, 2, 8, 30, 15, 500000))
+    loads = []
+    app = FastAPI()
+
+    async def probe():
+        return version
+
+    async def load():
+        loads.append(1)
+        return {"plan": "P-1"}, version
+
+    @app.get("/plan")
+    async def plan(request: Request):
+        return await conditional_response(request, probe, load)
+
+    return TestClient(app), loads
+
+
+def test_conditional_response_returns_304_for_a_matching_tag_without_loading():
+    client, loads = _conditional_client()
+
+    for tag in ('"v1"', 'W/"v1"', '"v0", "v1"', "*"):
+        response = client.get("/plan", headers={"If-None-Match": tag})
+        assert response.status_code == 304 and response.content == b""
+        assert response.headers["etag"] == '"v1"'
+    assert loads == []
+
+    response = client.get("/plan", headers={"If-Modified-Since": "Wed, 02 Apr 2025 08:30:15 GMT"})
+    assert response.status_code == 304
+
+
+def test_conditional_response_returns_the_body_with_validators_when_changed():
+    client, loads = _conditional_client()
+
+    for headers in ({}, {"If-None-Match": '"v0"'}, {"If-None-Match": 'W/"v0"'}, {"If-Modified-Since": "Wed, 02 Apr 2025 08:30:14 GMT"}):
+        response = client.get("/plan", headers=headers)
+        assert response.status_code == 200
+        assert response.json() == {"plan": "P-1"}
+        assert response.headers["etag"] == '"v1"'
+        assert response.headers["last-modified"] == "Wed, 02 Apr 2025 08:30:15 GMT"
+        assert response.headers["cache-control"] == "no-cache"
+    assert len(loads) == 4
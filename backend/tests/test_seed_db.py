@@ -0,0 +1,45 @@
+from pathlib import Path
+
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from backend.seed_db import BulkLoader, SyntheticScale, synthetic_collections
+
+
+class _Collection:
+    def __init__(self) -> None:
+        self.documents = []
+
+    def insert_many(self, documents, ordered=True):
+        assert ordered is False
+        self.documents.extend(documents)
+
+
+def test_synthetic_dataset_is_reproducible_and_sized_by_scale():
+    scale = SyntheticScale(
+        staff=4, nurses_per_day=3, days=40, patients=5, doctors=2, operating_rooms=2, surgeries_per_day=2,
+        tests_per_patient=1, vitals_per_patient=6, users=3, sessions_per_user=2, audit_events=100,
+    )
+    first = {name: list(documents()) for name, documents in synthetic_collections(scale, seed=7).items()}
+    again = {name: list(documents()) for name, documents in synthetic_collections(scale, seed=7).items()}
+    other = {name: list(documents()) for name, documents in synthetic_collections(scale, seed=8).items()}
+
+    for name in first:
+        if name != "users":  # session times follow the clock
+            assert first[name] == again[name], name
+    assert first["staff"] != other["staff"]
+    assert len(first["nurse_availability"]) == 3 * 40 and len(first["vitals_series"]) == 5 * 6
+    # 40 days from 2 April span April and May partitions; counts add up exactly.
+    assert {name for name in first if "_logs_" in name} == {
+        "auth_logs_2025_04", "auth_logs_2025_05", "activity_logs_2025_04", "activity_logs_2025_05"
+    }
+    assert sum(len(docs) for name, docs in first.items() if "_logs_" in name) == 100
+    assert first["users"][0]["roles"] == ["admin"]
+    assert SyntheticScale().scaled(0.01).days == 30 and SyntheticScale().scaled(0.01).staff == 5
+
+    collection = _Collection()
+    stats = BulkLoader({"staff": collection}, batch_size=3, workers=2).load("staff", iter(first["staff"] * 3))
+    assert stats.documents == len(collection.documents) == 12 and stats.errors == 0